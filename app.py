@@ -1,21 +1,45 @@
 import streamlit as st
+import importlib
 import os
 import sys
+import time
 from pathlib import Path
 
 # Add the parent directory to sys.path
 sys.path.append(str(Path(__file__).parent / "my_pages"))
 
 # Import utility modules
-from utils.file_manager import list_files
+from utils import perf
 
-# Import all pages at the top to avoid conditional imports
-from my_pages.signup import show_signup_page
-from my_pages.login import show_login_page
-from my_pages.upload import show_upload_page
-from my_pages.files_dashboard import show_files_dashboard
-from my_pages.evaluation import show_evaluation_page
-from my_pages.change_password import show_change_password_page
+# Pages are imported on first navigation, so the login screen does not pay for
+# pandas/matplotlib-heavy pages: page name -> (module, render function)
+LOGIN_PAGE = ("my_pages.login", "show_login_page")
+PAGES = {
+    "Upload Files": ("my_pages.upload", "show_upload_page"),
+    "Files Dashboard": ("my_pages.files_dashboard", "show_files_dashboard"),
+    "RAG Evaluation": ("my_pages.evaluation", "show_evaluation_page"),
+    "Create Admin User": ("my_pages.signup", "show_signup_page"),
+    "Change Password": ("my_pages.change_password", "show_change_password_page"),
+}
+PERFORMANCE_PANEL = ("my_pages.performance", "show_performance_panel")
+
+# Import every page at startup instead, e.g. to warm up a server before users arrive
+PRELOAD_PAGES = os.getenv("ADMIN_PRELOAD_PAGES", "false").lower() == "true"
+
+# Polling pages wait for their next rerun in slices of this many seconds
+POLL_SLICE_SECONDS = 0.1
+
+def load_page(name, target):
+    """Return a page's render function, importing its module the first time"""
+    module_name, function_name = target
+    if module_name not in sys.modules:
+        with perf.timed("page", f"{name} (import)"):
+            importlib.import_module(module_name)
+    return getattr(sys.modules[module_name], function_name)
+
+if PRELOAD_PAGES:
+    for name, target in [("Login", LOGIN_PAGE), *PAGES.items(), ("Performance", PERFORMANCE_PANEL)]:
+        load_page(name, target)
 
 # Configuration and session state initialization
 def init_session_state():
@@ -45,9 +69,14 @@ def main():
         initial_sidebar_state="expanded"
     )
     
+    # Prometheus endpoint, if PERF_METRICS_PORT is set
+    perf.start_metrics_server()
+    
     # Authentication check
     if not st.session_state.logged_in:
-        show_login_page()
+        show_login_page = load_page("Login", LOGIN_PAGE)
+        with perf.timed("page", "Login"):
+            show_login_page()
         return
     
     # Sidebar navigation for logged-in users
@@ -57,7 +86,7 @@ def main():
         st.subheader("Navigation")
 
         # List of pages
-        pages = ["Upload Files", "Files Dashboard", "RAG Evaluation", "Create Admin User", "Change Password"]
+        pages = list(PAGES)
 
         # Validate active_page
         if "active_page" not in st.session_state or st.session_state.active_page not in pages:
@@ -80,17 +109,26 @@ def main():
         if st.sidebar.button("Logout"):
             logout()
 
-    # Page routing using pre-imported modules
-    if st.session_state.active_page == "Upload Files":
-        show_upload_page()
-    elif st.session_state.active_page == "Files Dashboard":
-        show_files_dashboard()
-    elif st.session_state.active_page == "RAG Evaluation":
-        show_evaluation_page()
-    elif st.session_state.active_page == "Create Admin User":
-        show_signup_page()
-    elif st.session_state.active_page == "Change Password":
-        show_change_password_page()
+    # Page routing; the page module is imported on first use
+    show_page = load_page(st.session_state.active_page, PAGES[st.session_state.active_page])
+    with perf.timed("page", st.session_state.active_page):
+        show_page()
+
+    # Rendered last so it includes the page that was just shown
+    with st.sidebar:
+        load_page("Performance", PERFORMANCE_PANEL)()
+
+    # Pages that poll (e.g. running evaluation jobs) ask for a delayed rerun. Every
+    # Streamlit call lets a pending click interrupt the script, so the wait touches an
+    # empty placeholder between short sleeps and the page stays responsive meanwhile.
+    rerun_after = st.session_state.pop("rerun_after", None)
+    if rerun_after:
+        placeholder = st.empty()
+        deadline = time.monotonic() + rerun_after
+        while time.monotonic() < deadline:
+            time.sleep(POLL_SLICE_SECONDS)
+            placeholder.empty()
+        st.rerun()
 
 if __name__ == "__main__":
     main()
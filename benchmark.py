@@ -0,0 +1,306 @@
+"""Load-testing and latency benchmark for the admin/RAG backend.
+
+Replays the testset questions from data/testset_generation/ against
+/admin/get_queries_response and exercises the file endpoints, then reports
+p50/p95/p99 latency, throughput and error rate per endpoint. Every run is saved
+as a JSON report under benchmarks/ so runs against different backend releases
+can be compared with --compare.
+
+Examples:
+    python benchmark.py --stub --scenario queries --concurrency 8 --requests 500
+    python benchmark.py --base-url http://10.0.0.5:8000 --scenario mixed --rate 20 --duration 60
+    python benchmark.py --stub --compare benchmarks/bench_20250323_090000_queries.json
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+import requests
+from requests.adapters import HTTPAdapter
+
+TESTSET_GLOB = str(Path(__file__).parent / "data" / "testset_generation" / "*.csv")
+REPORTS_DIR = Path(__file__).parent / "benchmarks"
+
+SCENARIOS = ["queries", "files", "mixed"]
+
+# Paced runs that achieve less than this share of --rate get a warning
+RATE_SHORTFALL = 0.95
+
+def load_questions(pattern):
+    """Questions from the testset CSVs (the "question" column, else the first one)"""
+    questions = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            column = "question" if "question" in (reader.fieldnames or []) else (reader.fieldnames or [None])[0]
+            questions.extend(row[column] for row in reader if column and row.get(column))
+    return questions
+
+def percentile(sorted_values, q):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+class Workload:
+    """Produces (name, method, path, request kwargs) tuples for a scenario"""
+
+    def __init__(self, scenario, questions, batch_size, file_ids, seed=0):
+        self.scenario = scenario
+        self.questions = questions or ["What is RAG?"]
+        self.batch_size = batch_size
+        self.file_ids = file_ids
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.position = 0
+
+    def _next_queries(self):
+        with self.lock:
+            start = self.position
+            self.position += self.batch_size
+        batch = [self.questions[(start + i) % len(self.questions)] for i in range(self.batch_size)]
+        return ("get_queries_response", "POST", "/admin/get_queries_response", {"json": {"queries": batch}})
+
+    def _next_file_request(self):
+        with self.lock:
+            choice = self.rng.random()
+            file_id = self.rng.choice(self.file_ids) if self.file_ids else None
+
+        if choice < 0.4 or file_id is None:
+            return ("list_files_page", "GET", "/admin/list_files", {"params": {"page": 1, "page_size": 50}})
+        if choice < 0.6:
+            return ("list_files", "GET", "/admin/list_files", {})
+        return ("download_file", "GET", "/admin/download_file", {"params": {"file_id": file_id}})
+
+    def next_request(self):
+        if self.scenario == "queries":
+            return self._next_queries()
+        if self.scenario == "files":
+            return self._next_file_request()
+        with self.lock:
+            use_queries = self.rng.random() < 0.5
+        return self._next_queries() if use_queries else self._next_file_request()
+
+def run_load(base_url, workload, concurrency, total_requests=None, duration=None, rate=None, timeout=60):
+    """Drive the workload with `concurrency` workers, optionally paced at `rate` requests/second.
+
+    Paced runs are open-loop: request i is due at start + i / rate regardless of
+    how long earlier requests took, and its latency is measured from that due time.
+    Time spent waiting for a free worker therefore counts as latency instead of
+    being hidden (coordinated omission); service_ms is the time on the wire alone.
+    Returns the raw samples and the wall-clock duration.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    samples = []
+    samples_lock = threading.Lock()
+    counter = iter(range(sys.maxsize))
+    counter_lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    def worker():
+        while True:
+            with counter_lock:
+                i = next(counter)
+            if total_requests is not None and i >= total_requests:
+                return
+            due = start + i / rate if rate else None
+            if due is not None:
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if deadline is not None and (due or time.perf_counter()) >= deadline:
+                return
+
+            name, method, path, kwargs = workload.next_request()
+            sent = time.perf_counter()
+            try:
+                response = session.request(method, f"{base_url}{path}", timeout=timeout, **kwargs)
+                size = len(response.content)
+                ok, status = response.status_code < 400, response.status_code
+            except requests.RequestException as e:
+                size, ok, status = 0, False, type(e).__name__
+            done = time.perf_counter()
+            latency_ms = (done - (due if due is not None else sent)) * 1000
+            service_ms = (done - sent) * 1000
+
+            with samples_lock:
+                samples.append({"endpoint": name, "sent_s": sent - start, "latency_ms": latency_ms, "service_ms": service_ms,
+                                "ok": ok, "status": status, "bytes": size})
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return samples, time.perf_counter() - start
+
+def summarize(samples, duration, rate=None):
+    """Latency percentiles, throughput and error rate, overall and per endpoint"""
+    def stats(group):
+        latencies = sorted(s["latency_ms"] for s in group)
+        service = sorted(s["service_ms"] for s in group)
+        errors = sum(1 for s in group if not s["ok"])
+        statuses = {}
+        for s in group:
+            statuses[str(s["status"])] = statuses.get(str(s["status"]), 0) + 1
+        return {
+            "requests": len(group),
+            "errors": errors,
+            "error_rate": errors / len(group) if group else 0.0,
+            "throughput_rps": len(group) / duration if duration else 0.0,
+            "mean_ms": sum(latencies) / len(latencies) if latencies else None,
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "max_ms": latencies[-1] if latencies else None,
+            "service_p95_ms": percentile(service, 95),
+            "bytes": sum(s["bytes"] for s in group),
+            "statuses": statuses,
+        }
+
+    endpoints = {}
+    for sample in samples:
+        endpoints.setdefault(sample["endpoint"], []).append(sample)
+
+    # Rate at which requests actually went out, excluding the wait for the last responses
+    last_sent = max((s["sent_s"] for s in samples), default=0)
+    return {
+        "duration_s": duration,
+        "target_rps": rate,
+        "achieved_rps": (len(samples) - 1) / last_sent if last_sent else None,
+        "overall": stats(samples),
+        "endpoints": {name: stats(group) for name, group in sorted(endpoints.items())},
+    }
+
+def compare(report, baseline, threshold):
+    """List regressions of p95/p99 latency (relative) and error rate (absolute) against a baseline"""
+    regressions = []
+    for name, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if previous.get(key) and current.get(key) and current[key] > previous[key] * (1 + threshold):
+                regressions.append(f"{name} {key}: {previous[key]:.1f} -> {current[key]:.1f} ms")
+        if current["error_rate"] > previous["error_rate"] + threshold / 10:
+            regressions.append(f"{name} error_rate: {previous['error_rate']:.2%} -> {current['error_rate']:.2%}")
+    return regressions
+
+def print_report(report):
+    header = f"{'endpoint':<24}{'requests':>10}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for name, s in rows:
+        fmt = lambda v: f"{v:.1f}" if v is not None else "-"
+        print(f"{name:<24}{s['requests']:>10}{s['errors']:>8}{s['throughput_rps']:>9.1f}"
+              f"{fmt(s['p50_ms']):>10}{fmt(s['p95_ms']):>10}{fmt(s['p99_ms']):>10}")
+    if report.get("target_rps") and report.get("achieved_rps"):
+        print(f"\nTarget rate {report['target_rps']:.1f} rps, achieved {report['achieved_rps']:.1f} rps")
+        if report["achieved_rps"] < report["target_rps"] * RATE_SHORTFALL:
+            print("Warning: the target rate was not reached; raise --concurrency. "
+                  "Latency includes the time requests waited for a free worker.")
+
+def start_stub(seed_files, latency="0", error_rate=0.0, seed=None):
+    """Start the in-repo stub backend on a free port and return (server, base_url)"""
+    import stub_backend
+
+    faults = stub_backend.FaultProfile(latency=latency, error_rate=error_rate, seed=seed)
+    server = stub_backend.make_server(port=0, faults=faults)
+    server.RequestHandlerClass.state.seed_files(seed_files)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the admin/RAG backend")
+    parser.add_argument("--base-url", default=os.getenv("ADMIN_API_URL", "http://127.0.0.1:8000"))
+    parser.add_argument("--stub", action="store_true", help="run against an in-process stub backend (offline)")
+    parser.add_argument("--stub-files", type=int, default=200, help="files seeded into the stub backend")
+    parser.add_argument("--stub-latency", default="0", help="stub latency spec, see stub_backend.py --help")
+    parser.add_argument("--stub-error-rate", type=float, default=0.0, help="fraction of stub requests that fail")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="queries")
+    parser.add_argument("--testset", default=TESTSET_GLOB, help="glob of testset CSVs to replay")
+    parser.add_argument("--batch-size", type=int, default=1, help="queries per get_queries_response request")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=None, help="target requests per second (default: as fast as possible)")
+    parser.add_argument("--requests", type=int, default=None, help="total requests (default: 200 unless --duration)")
+    parser.add_argument("--duration", type=float, default=None, help="run for this many seconds")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--label", default="", help="free-text label stored in the report, e.g. a backend version")
+    parser.add_argument("--output-dir", default=str(REPORTS_DIR))
+    parser.add_argument("--compare", help="baseline report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative p95/p99 increase")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.requests is None and args.duration is None:
+        args.requests = 200
+
+    server = None
+    base_url = args.base_url.rstrip("/")
+    if args.stub:
+        server, base_url = start_stub(args.stub_files, args.stub_latency, args.stub_error_rate, args.seed)
+
+    file_ids = []
+    if args.scenario in ("files", "mixed"):
+        file_ids = list(requests.get(f"{base_url}/admin/list_files", timeout=args.timeout).json())
+
+    workload = Workload(args.scenario, load_questions(args.testset), args.batch_size, file_ids, args.seed)
+    samples, duration = run_load(
+        base_url, workload, args.concurrency, args.requests, args.duration, args.rate, args.timeout
+    )
+
+    report = {
+        "label": args.label,
+        "timestamp": str(datetime.now()),
+        "base_url": "stub" if args.stub else base_url,
+        "config": {
+            "scenario": args.scenario,
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "requests": args.requests,
+            "duration": args.duration,
+            "batch_size": args.batch_size,
+        },
+        **summarize(samples, duration, args.rate),
+    }
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    report_path = Path(args.output_dir) / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{args.scenario}.json"
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=4)
+
+    print_report(report)
+    print(f"\nReport saved to {report_path}")
+
+    if server is not None:
+        server.shutdown()
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+if __name__ == "__main__":
+    main()
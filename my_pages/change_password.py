@@ -1,7 +1,8 @@
 import streamlit as st
 import json
 from pathlib import Path
-import os, requests
+import os
+from utils.auth import get_users, verify_password, change_password
 
 # Define the path to the users file
 USERS_FILE = Path(__file__).parent.parent / "data" / "users.json"
@@ -14,9 +15,7 @@ def show_change_password_page():
     username = st.session_state.username
     
     # Load users from the file
-    API_URL = "http://127.0.0.1:8000/admin/get_users"
-    response = requests.get(API_URL)
-    users = response.json()
+    users = get_users()
     
     if username not in users:
         st.error("User does not exist!")
@@ -35,15 +34,10 @@ def show_change_password_page():
             st.error("New password and confirmation do not match.")
             return
         
-        API_URL = "http://127.0.0.1:8000/admin/verify_password"
-        response = requests.get(API_URL, params={"username": username, "pass_input": old_password})
-        response = response.json()
-
-        if not response['verified']:
+        if not verify_password(username, old_password):
             st.error("Old password is incorrect.")
             return
         
-        API_URL = "http://127.0.0.1:8000/admin/change_password"
-        flag = requests.put(API_URL, params={"username": username, "new_password": new_password})
+        flag = change_password(username, new_password)
 
         st.success("Password updated successfully!")
\ No newline at end of file
@@ -4,20 +4,67 @@ import matplotlib.pyplot as plt
 from pathlib import Path
 import numpy as np
 import glob, os
+import io
 from datetime import datetime
-from utils.rag_evaluator import run_evaluation, list_evaluations, get_evaluation_details, delete_evaluation, create_testset_using_ragas
+from utils.rag_evaluator import get_evaluation_details, delete_evaluation, create_testset_using_ragas
+from utils.rag_evaluator import list_evaluations_page, count_evaluations, get_query_columns, get_evaluation_queries, evaluations_version
+from utils.rag_evaluator import get_evaluations_metrics, get_query_metrics
 from utils.rag_evaluator import get_queries_response, fetch_testset_files
-import requests
+from utils.rag_evaluator import start_testset_job, watch_testset_job, cancel_testset_job
+from utils.api_client import url_for
+from utils.limiter import priority, INTERACTIVE
+from utils.eval_engine import read_query_file, compare_runs, COMPARE_METRICS
+from utils.eval_jobs import submit_evaluation_job, list_jobs, resume_job, cancel_job, ACTIVE_STATUSES
 
 
 TESTSET_DIR = Path(__file__).parent.parent / "data" / "testset_generation"
 
+# Seconds between refreshes while evaluation jobs are running
+JOB_POLL_SECONDS = 2
+
+# Seconds the testset file history is reused before it is fetched from the server again
+TESTSET_FILES_TTL = 30
+
+# Seconds between table refreshes while testset rows stream in
+TESTSET_POLL_SECONDS = 1
+
+# Long-text query columns that are hidden unless selected
+HEAVY_QUERY_COLUMNS = {"retrieved_context", "retrieved_contexts", "sources", "answer", "reference"}
+
+# Summary metrics shown after a run -> result keys
+SUMMARY_METRICS = {
+    "Precision": "precision",
+    "Recall": "recall",
+    "F1 Score": "f1_score",
+    "MRR": "mrr",
+    "NDCG": "ndcg",
+    "Latency (ms)": "latency_ms"
+}
+
+# Sort options of the results table -> evaluation store columns
+EVAL_SORT_COLUMNS = {
+    "Date": "timestamp",
+    "Name": "name",
+    "Queries": "num_queries",
+    "Precision": "precision",
+    "Recall": "recall",
+    "F1": "f1_score",
+    "MRR": "mrr",
+    "NDCG": "ndcg"
+}
+
+# Most recent evaluations offered in the comparison view
+COMPARE_MAX_EVALUATIONS = 200
+
+# Index metrics drawn in the comparison chart -> labels
+COMPARE_CHART_METRICS = {"precision": "Precision", "recall": "Recall", "f1_score": "F1", "mrr": "MRR", "ndcg": "NDCG"}
+
 def show_evaluation_page():
     """Display the RAG evaluation page"""
     st.title("RAG Evaluation Dashboard")
     
     # Tabs for different sections
-    tab1, tab2, tab3 = st.tabs(["Run Evaluation", "View Results", "Create Testset"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Run Evaluation", "View Results", "Compare Runs", "Create Testset"])
     
     with tab1:
         show_run_evaluation_tab()
@@ -26,7 +73,20 @@ def show_evaluation_page():
         show_results_tab()
 
     with tab3:
+        show_compare_tab()
+
+    with tab4:
         show_create_testset_tab()
+    
+    # Poll background jobs; app.py reruns once the page and sidebar are rendered
+    if st.session_state.get("eval_jobs_autorefresh", True) and any(
+        job["status"] in ACTIVE_STATUSES for job in list_jobs()
+    ):
+        request_rerun(JOB_POLL_SECONDS)
+
+def request_rerun(seconds):
+    """Ask app.py for a rerun after `seconds`, keeping a sooner request"""
+    st.session_state.rerun_after = min(st.session_state.get("rerun_after") or seconds, seconds)
 
 def show_run_evaluation_tab():
     """Display the tab for running evaluations"""
@@ -43,6 +103,8 @@ def show_run_evaluation_tab():
             "What is RAG?\nHow does vector search work?\nExplain embedding models."
         )
 
+        use_cache = st.checkbox("Reuse cached responses", value=True, key="query_use_cache")
+
         if st.button("Run Query"):
             if not queries.strip():
                 st.error("Please enter at least one query.")
@@ -50,7 +112,13 @@ def show_run_evaluation_tab():
 
             with st.spinner("Fetching responses..."):
                 query_list = [q.strip() for q in queries.split("\n") if q.strip()]
-                results = get_queries_response(query_list)
+                # Someone is waiting on this page, so it goes ahead of running evaluations
+                with priority(INTERACTIVE):
+                    results = get_queries_response(query_list, use_cache=use_cache)
+
+            if results is None:
+                st.error("The RAG backend did not return any responses.")
+                return
 
             st.subheader("Query Results")
             for res in results:
@@ -81,6 +149,11 @@ def show_run_evaluation_tab():
                     ["Precision", "Recall", "F1", "MRR", "NDCG", "Latency"],
                     default=["Precision", "Recall", "F1", "MRR"]
                 )
+                use_cache = st.checkbox(
+                    "Reuse cached responses",
+                    value=True,
+                    help="Only queries that are new for the current vector DB contents are sent to the RAG backend."
+                )
 
             submit = st.form_submit_button("Run Evaluation")
 
@@ -89,56 +162,109 @@ def show_run_evaluation_tab():
                 st.error("Please upload a query file.")
                 return
 
-            with st.spinner("Running evaluation..."):
-                # Process file
-                if query_file.type == "text/csv":
-                    df = pd.read_csv(query_file)
-                    query_set = df.iloc[:, 0].tolist()  # Assume first column contains queries
-                else:
-                    content = query_file.getvalue().decode()
-                    query_set = [line.strip() for line in content.split("\n") if line.strip()]
-
-                parameters = {
-                    "name": eval_name,
-                    "description": eval_description,
-                    "relevance_threshold": relevance_threshold,
-                    "top_k": top_k,
-                    "metrics": metrics
-                }
-
-                eval_id, results = run_evaluation(query_set, parameters)
-
-                st.success(f"Evaluation completed! ID: {eval_id}")
-
-                st.subheader("Summary Results")
-                metric_cols = st.columns(4)
-                metrics_to_show = {
-                    "Precision": results.get("precision", 0),
-                    "Recall": results.get("recall", 0),
-                    "F1 Score": results.get("f1_score", 0),
-                    "MRR": results.get("mrr", 0)
-                }
-
-                for i, (metric, value) in enumerate(metrics_to_show.items()):
-                    with metric_cols[i % 4]:
-                        st.metric(label=metric, value=f"{value:.2f}")
-
-                if st.button("View Detailed Results"):
-                    st.session_state.selected_eval_id = eval_id
-                    st.session_state.selected_eval_results = results
+            # The job reads the file block by block while it sends queries. Testset CSVs
+            # (with a "question" column) also carry reference and retrieved_context for scoring.
+            query_set = read_query_file(query_file, is_csv=query_file.name.lower().endswith(".csv"))
+
+            parameters = {
+                "name": eval_name,
+                "description": eval_description,
+                "relevance_threshold": relevance_threshold,
+                "top_k": top_k,
+                "metrics": metrics,
+                "use_cache": use_cache
+            }
+
+            # Runs in a background worker, so reruns and refreshes do not stop it
+            job_id = submit_evaluation_job(query_set, parameters)
+            st.success(f"Evaluation started in the background (job {job_id}).")
+
+        show_evaluation_jobs()
+
+def show_evaluation_jobs():
+    """Display background evaluation jobs with progress and resume/cancel controls"""
+    jobs = list_jobs()
+    if not jobs:
+        return
+
+    st.subheader("Evaluation Jobs")
+    st.checkbox("Auto-refresh while jobs are running", value=True, key="eval_jobs_autorefresh")
+
+    for job in jobs:
+        with st.expander(f"{job['name']} ({job['job_id']}) - {job['status']}", expanded=job["status"] != "completed"):
+            total = job["total"] or 1
+            read = " (reading query file)" if job.get("reading_input") and job["status"] in ACTIVE_STATUSES else ""
+            st.progress(min(job["done"] / total, 1.0), text=f"{job['done']}/{job['total']} queries evaluated{read}")
+
+            if job["error"]:
+                st.error(job["error"])
+
+            if job["status"] in ACTIVE_STATUSES:
+                if st.button("Cancel", key=f"cancel_{job['job_id']}"):
+                    cancel_job(job["job_id"])
                     st.rerun()
+            elif job["status"] in ("interrupted", "cancelled", "failed"):
+                if st.button("Resume from checkpoint", key=f"resume_{job['job_id']}"):
+                    resume_job(job["job_id"])
+                    st.rerun()
+            elif job["status"] == "completed" and job["eval_id"]:
+                results = evaluation_details(job["eval_id"], evaluations_version())
+                if results:
+                    if results.get("num_errors"):
+                        st.warning(f"{results['num_errors']} queries failed and were left out of the metrics.")
+                    if results.get("num_cached"):
+                        st.caption(f"{results['num_cached']} answers came from the response cache and are left out of the latency.")
+                    show_summary_metrics(results)
+
+                if st.button("View Detailed Results", key=f"view_{job['job_id']}"):
+                    st.session_state.selected_eval_id = job["eval_id"]
+                    st.rerun()
+
+def show_summary_metrics(results):
+    """Display the metrics that were calculated for an evaluation"""
+    st.subheader("Summary Results")
+    metrics_to_show = {
+        label: results[key]
+        for label, key in SUMMARY_METRICS.items()
+        if results.get(key) is not None
+    }
+
+    if not metrics_to_show:
+        st.info("No metrics could be calculated. Retrieval metrics need a testset CSV with reference contexts.")
+        return
+
+    metric_cols = st.columns(4)
+    for i, (metric, value) in enumerate(metrics_to_show.items()):
+        with metric_cols[i % 4]:
+            if metric == "Latency (ms)":
+                st.metric(label=metric, value=f"{value:.0f}")
+            else:
+                st.metric(label=metric, value=f"{value:.2f}")
 
 def show_results_tab():
     """Display the tab for viewing evaluation results"""
     st.header("Evaluation Results")
     
-    # Get list of evaluations
-    evaluations = list_evaluations()
+    # Sorting and paging are done by the evaluation store
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sort_label = st.selectbox("Sort by", list(EVAL_SORT_COLUMNS.keys()))
+    with col2:
+        descending = st.radio("Order", ["Descending", "Ascending"], horizontal=True) == "Descending"
+    with col3:
+        page_size = st.selectbox("Rows per page", [10, 20, 50, 100], index=1)
     
-    if not evaluations:
+    version = evaluations_version()
+    total = evaluation_count(version)
+    if total == 0:
         st.info("No evaluations have been run yet.")
         return
     
+    num_pages = (total + page_size - 1) // page_size
+    page = st.number_input(f"Page (of {num_pages})", min_value=1, max_value=num_pages, value=1, step=1)
+    
+    evaluations, total = evaluations_page(version, EVAL_SORT_COLUMNS[sort_label], descending, int(page), page_size)
+    
     # Convert to DataFrame for display
     eval_data = []
     for eval_id, eval_info in evaluations.items():
@@ -155,11 +281,9 @@ def show_results_tab():
     
     eval_df = pd.DataFrame(eval_data)
     
-    # Sort by date (newest first)
-    eval_df = eval_df.sort_values("Date", ascending=False).reset_index(drop=True)
-    
     # Display the dataframe
     st.dataframe(eval_df)
+    st.caption(f"Showing {len(eval_df)} of {total} evaluations")
     
     # Select evaluation to view
     st.subheader("View Evaluation Details")
@@ -187,7 +311,7 @@ def show_results_tab():
     selected_eval_id = eval_ids[selected_index]
     
     # Get detailed evaluation data
-    eval_details = get_evaluation_details(selected_eval_id)
+    eval_details = evaluation_details(selected_eval_id, version)
     
     if eval_details:
         # Display evaluation details
@@ -208,48 +332,28 @@ def show_results_tab():
             with metric_cols[i % 4]:
                 st.metric(label=metric, value=f"{value:.2f}")
         
+        # NDCG is only shown in the chart
+        metrics["NDCG"] = eval_details.get("ndcg", 0)
+        
         # Display visualization
         st.subheader("Metrics Visualization")
         
-        # Bar chart of metrics
-        fig, ax = plt.subplots(figsize=(10, 5))
+        # Error bars from the bootstrap confidence intervals, where available
+        intervals = eval_details.get("confidence_intervals", {})
         metric_names = list(metrics.keys())
         metric_values = list(metrics.values())
+        errors = np.zeros((2, len(metric_names)))
+        for i, name in enumerate(metric_names):
+            low, high = intervals.get(SUMMARY_METRICS[name], (None, None))
+            if low is not None and high is not None and not np.isnan(low) and not np.isnan(high):
+                errors[:, i] = [max(metric_values[i] - low, 0), max(high - metric_values[i], 0)]
         
-        # Create bars with different colors
-        bars = ax.bar(
-            metric_names, 
-            metric_values,
-            color=['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
-        )
-        
-        # Add value labels on top of bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(
-                bar.get_x() + bar.get_width()/2.,
-                height + 0.02,
-                f'{height:.2f}',
-                ha='center', 
-                va='bottom'
-            )
-        
-        ax.set_ylim(0, 1.1)  # Set y-axis from 0 to 1.1 to have space for labels
-        ax.set_title('Evaluation Metrics')
-        ax.set_ylabel('Score')
-        
-        # Display the chart
-        st.pyplot(fig)
+        # Rendered once per set of values, not on every rerun
+        st.image(metrics_chart(tuple(metric_names), tuple(metric_values), tuple(map(tuple, errors))))
         
         # Display individual query results
         st.subheader("Query Results")
-        queries = eval_details.get("queries", [])
-        
-        if queries:
-            query_df = pd.DataFrame(queries)
-            st.dataframe(query_df)
-        else:
-            st.info("No detailed query results available.")
+        show_query_results(selected_eval_id, version)
         
         # Delete button
         if st.button("Delete Evaluation"):
@@ -262,11 +366,196 @@ def show_results_tab():
     else:
         st.error("Could not load evaluation details.")
 
+@st.cache_data(max_entries=50, show_spinner=False)
+def metrics_chart(metric_names, metric_values, errors):
+    """PNG bar chart of one evaluation's metrics with confidence interval error bars"""
+    fig, ax = plt.subplots(figsize=(10, 5))
+    
+    # Create bars with different colors
+    bars = ax.bar(
+        metric_names, 
+        metric_values,
+        yerr=np.array(errors),
+        capsize=6,
+        color=['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
+    )
+    
+    # Add value labels on top of bars
+    for bar, upper in zip(bars, errors[1]):
+        height = bar.get_height()
+        ax.text(
+            bar.get_x() + bar.get_width()/2.,
+            height + upper + 0.02,
+            f'{height:.2f}',
+            ha='center', 
+            va='bottom'
+        )
+    
+    ax.set_ylim(0, 1.1)  # Set y-axis from 0 to 1.1 to have space for labels
+    ax.set_title('Evaluation Metrics')
+    ax.set_ylabel('Score')
+    return _figure_png(fig)
+
+@st.cache_data(max_entries=50, show_spinner=False)
+def comparison_chart(labels, metric_names, values):
+    """PNG grouped bar chart of index metrics (rows of values) for several evaluations"""
+    values = np.array(values, dtype=np.float64)
+    fig, ax = plt.subplots(figsize=(10, 5))
+    width = 0.8 / len(labels)
+    positions = np.arange(len(metric_names))
+    for i, label in enumerate(labels):
+        ax.bar(positions + (i - (len(labels) - 1) / 2) * width, np.nan_to_num(values[i]), width, label=label)
+    
+    ax.set_xticks(positions, metric_names)
+    ax.set_ylim(0, 1.1)
+    ax.set_ylabel('Score')
+    ax.set_title('Evaluation Metrics by Run')
+    ax.legend(fontsize="small", loc="upper right")
+    return _figure_png(fig)
+
+# The job panel reruns the whole page every JOB_POLL_SECONDS while jobs run, so the
+# listings below are cached. Evaluation reads are keyed by the store's data version
+# and refresh on the first rerun after any write.
+@st.cache_data(max_entries=20, show_spinner=False)
+def evaluation_count(version):
+    return count_evaluations()
+
+@st.cache_data(max_entries=50, show_spinner=False)
+def evaluations_page(version, sort_by, descending, page, page_size):
+    return list_evaluations_page(sort_by=sort_by, descending=descending, page=page, page_size=page_size)
+
+@st.cache_data(max_entries=50, show_spinner=False)
+def evaluation_details(eval_id, version):
+    return get_evaluation_details(eval_id)
+
+@st.cache_data(max_entries=50, show_spinner=False)
+def evaluations_metrics(eval_ids, version):
+    return get_evaluations_metrics(list(eval_ids))
+
+@st.cache_data(max_entries=50, show_spinner=False)
+def query_columns(eval_id, version):
+    return get_query_columns(eval_id)
+
+@st.cache_data(max_entries=50, show_spinner=False)
+def evaluation_queries(eval_id, version, offset, limit, columns):
+    return get_evaluation_queries(eval_id, offset=offset, limit=limit, columns=list(columns) if columns else None)
+
+@st.cache_data(ttl=TESTSET_FILES_TTL, show_spinner=False)
+def testset_files():
+    return fetch_testset_files()
+
+def _figure_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+@st.cache_data(max_entries=20, show_spinner="Comparing queries...")
+def compare_evaluations(base_id, candidate_id):
+    """Per-query comparison of two evaluations; saved evaluations never change"""
+    columns = [*COMPARE_METRICS, "cached"]
+    return compare_runs(get_query_metrics(base_id, columns), get_query_metrics(candidate_id, columns))
+
+def show_compare_tab():
+    """Compare index metrics across evaluations and find per-query regressions between two runs"""
+    st.header("Compare Evaluations")
+    
+    version = evaluations_version()
+    evaluations, _ = evaluations_page(version, "timestamp", True, 1, COMPARE_MAX_EVALUATIONS)
+    if len(evaluations) < 2:
+        st.info("Run at least two evaluations to compare them.")
+        return
+    
+    labels = {eval_id: f"{info['name']} ({eval_id})" for eval_id, info in evaluations.items()}
+    selected = st.multiselect(
+        "Evaluations to compare",
+        list(labels),
+        default=list(labels)[1::-1],  # The latest run against the one before it
+        format_func=labels.get,
+        key="compare_eval_ids"
+    )
+    if not selected:
+        return
+    
+    # Summary metrics of every selected run come from the index in one query
+    table = evaluations_metrics(tuple(selected), version)
+    st.dataframe(table, hide_index=True)
+    metric_columns = list(COMPARE_CHART_METRICS)
+    st.image(comparison_chart(
+        tuple(table["name"] + " (" + table["eval_id"] + ")"),
+        tuple(COMPARE_CHART_METRICS.values()),
+        tuple(map(tuple, table[metric_columns].to_numpy(dtype=np.float64, na_value=np.nan))),
+    ))
+    
+    if len(selected) < 2:
+        return
+    
+    st.subheader("Per-query Changes")
+    col1, col2 = st.columns(2)
+    with col1:
+        base_id = st.selectbox("Baseline", selected, format_func=labels.get, key="compare_base")
+    with col2:
+        candidates = [eval_id for eval_id in selected if eval_id != base_id]
+        candidate_id = st.selectbox("Candidate", candidates, index=len(candidates) - 1, format_func=labels.get,
+                                    key="compare_candidate")
+    
+    summary, per_query, unmatched = compare_evaluations(base_id, candidate_id)
+    if summary.empty:
+        st.info("The two evaluations have no questions with per-query metrics in common.")
+        return
+    
+    regressions = summary.loc[summary["significant_regression"], "metric"].tolist()
+    improvements = summary.loc[summary["significant_improvement"], "metric"].tolist()
+    if regressions:
+        st.error(f"Significant regressions: {', '.join(regressions)}")
+    else:
+        st.success("No significant regressions.")
+    if improvements:
+        st.caption(f"Significant improvements: {', '.join(improvements)}")
+    if unmatched["base"] or unmatched["candidate"]:
+        st.caption(f"Questions only in the baseline: {unmatched['base']}, only in the candidate: {unmatched['candidate']}")
+    
+    # Deltas are candidate - baseline, with 95% paired bootstrap confidence intervals
+    st.dataframe(summary, hide_index=True)
+    
+    if st.checkbox("Only regressed queries", value=True, key="compare_regressed_only"):
+        per_query = per_query[per_query["regressed_metrics"] > 0]
+    st.dataframe(per_query.head(500), hide_index=True)
+    st.caption(f"Showing {min(len(per_query), 500)} of {len(per_query)} queries, worst first")
+
+def show_query_results(eval_id, version):
+    """Display per-query results one page at a time, reading only the selected columns"""
+    columns = query_columns(eval_id, version)
+    
+    if not columns:
+        st.info("No detailed query results available.")
+        return
+    
+    selected_columns = st.multiselect(
+        "Columns",
+        columns,
+        default=[c for c in columns if c not in HEAVY_QUERY_COLUMNS] or columns,
+        key=f"query_columns_{eval_id}"
+    )
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Queries per page", [25, 50, 100, 500], index=1, key=f"query_page_size_{eval_id}")
+    with col2:
+        page = st.number_input("Page", min_value=1, value=1, step=1, key=f"query_page_{eval_id}")
+    
+    query_df, total = evaluation_queries(
+        eval_id, version, (int(page) - 1) * page_size, page_size, tuple(selected_columns) or None
+    )
+    
+    st.dataframe(query_df)
+    st.caption(f"Showing {len(query_df)} of {total} queries")
+
 def show_testset_history():
-    DOWNLOAD_URL = "http://localhost:8000/download?file="
+    DOWNLOAD_URL = url_for("/download?file=")
 
     """Display testset file history in Streamlit with download buttons"""
-    response = fetch_testset_files()
+    response = testset_files()
 
     if not response["success"]:
         st.warning(response["message"])
@@ -304,19 +593,55 @@ def show_create_testset_tab():
         submit_button = st.form_submit_button(label="Create Now")
 
     if submit_button:
-        response = create_testset_using_ragas(num_of_test=num_of_test)
+        job = start_testset_job(int(num_of_test))
+
+        if job["status"]:
+            st.session_state.testset_job = {"job_id": job["job_id"]}
+        elif not job["supported"]:
+            # Older servers only generate the whole testset in one request
+            response = create_testset_using_ragas(num_of_test=num_of_test)
 
-        if response["status"]:  # Check if the request was successful
-            st.success(response["message"])
+            if response["status"]:  # Check if the request was successful
+                testset_files.clear()
+                st.success(response["message"])
 
-            # Extract only the generated testset and convert it into a DataFrame
-            testset_data = response["data"]  # Extract JSON data
-            testset_df = pd.DataFrame(testset_data)  # Convert JSON to DataFrame
+                # Extract only the generated testset and convert it into a DataFrame
+                testset_data = response["data"]  # Extract JSON data
+                testset_df = pd.DataFrame(testset_data)  # Convert JSON to DataFrame
 
-            # Display the DataFrame in Streamlit
-            st.dataframe(testset_df)
+                # Display the DataFrame in Streamlit
+                st.dataframe(testset_df)
+            else:
+                st.error(response["message"])
         else:
-            st.error(response["message"])
+            st.error(job["message"])
+
+    if "testset_job" in st.session_state:
+        show_testset_job(st.session_state.testset_job)
 
     show_testset_history()
-    
\ No newline at end of file
+
+def show_testset_job(job):
+    """Show the rows of a testset job, read in the background, and refresh while it runs"""
+    watch = watch_testset_job(job["job_id"])
+    rows = list(watch["rows"])
+
+    if watch["status"] == "running" and st.button("Cancel generation"):
+        # The reader stops at the server's cancelled event
+        cancel_testset_job(job["job_id"])
+
+    st.dataframe(pd.DataFrame(rows))
+
+    if watch["status"] == "running":
+        st.info(f"Generating testset... {len(rows)} rows received")
+        request_rerun(TESTSET_POLL_SECONDS)
+    elif watch["status"] == "done":
+        # The finished testset is saved on the server, so the history changed once
+        if not job.get("history_refreshed"):
+            job["history_refreshed"] = True
+            testset_files.clear()
+        st.success(f"Testset created successfully ({len(rows)} rows)")
+    elif watch["status"] == "cancelled":
+        st.warning(f"Testset generation cancelled after {len(rows)} rows")
+    else:
+        st.error(f"Testset generation failed after {len(rows)} rows: {watch['error']}")
@@ -1,15 +1,56 @@
 import streamlit as st
 import pandas as pd
-from utils.file_manager import list_files, delete_file, download_file, add_file_to_vector_db, remove_file_from_vector_db
+import os
+import time
+from utils.file_manager import list_files, delete_files, download_file_to_disk, add_file_to_vector_db
+from utils.file_manager import add_files_to_vector_db, remove_files_from_vector_db, find_duplicate_files, FILES_PAGE_SIZE
+from utils.file_manager import BULK_CONCURRENCY
 
 def show_files_dashboard():
     """Display the files dashboard"""
     st.title("Files Dashboard")
     
-    # Get list of files
-    files = list_files()
+    # Filters are applied by the server, so only the visible page is downloaded
+    search_term = st.text_input("Search files by name:")
+    
+    # Known file types come with every listing; the first unfiltered page (which the
+    # default view requests anyway) supplies them before the filter is drawn
+    if "files_dashboard_types" not in st.session_state:
+        st.session_state.files_dashboard_types = list_files(page=1).get("file_types") or []
+    file_types = ["All"] + st.session_state.files_dashboard_types
+    selected_type = st.selectbox("Filter by file type:", file_types)
+    
+    vector_db_filter = st.radio(
+        "Vector Database Status:",
+        ["All", "In Vector DB", "Not in Vector DB"],
+        horizontal=True
+    )
+    in_vector_db = {"All": None, "In Vector DB": True, "Not in Vector DB": False}[vector_db_filter]
+    
+    # Start again from the first page whenever the filters change
+    filter_key = (search_term, selected_type, vector_db_filter)
+    if st.session_state.get("files_dashboard_filters") != filter_key:
+        st.session_state.files_dashboard_filters = filter_key
+        st.session_state.files_dashboard_pages = 1
+    
+    # Pages loaded before come from the listing cache; "Load more" requests only the next one
+    files, total = {}, 0
+    for page_number in range(1, st.session_state.files_dashboard_pages + 1):
+        page = list_files(
+            page=page_number,
+            search=search_term or None,
+            file_type=None if selected_type == "All" else selected_type,
+            in_vector_db=in_vector_db
+        )
+        files.update(page["files"])
+        total = page["total"]
     
-    if not files:
+    # Remember the known file types for the type filter
+    if page.get("file_types") and page["file_types"] != st.session_state.files_dashboard_types:
+        st.session_state.files_dashboard_types = page["file_types"]
+        st.rerun()
+    
+    if total == 0 and filter_key == ("", "All", "All"):
         st.info("No files have been uploaded yet.")
         return
     
@@ -26,34 +67,32 @@ def show_files_dashboard():
             "In Vector DB": file_info["in_vector_db"]
         })
     
-    df = pd.DataFrame(files_data)
-    
-    # Add search/filter functionality
-    search_term = st.text_input("Search files by name:")
-    if search_term:
-        df = df[df["Filename"].str.contains(search_term, case=False)]
+    df = pd.DataFrame(files_data, columns=["ID", "Filename", "Type", "Size (KB)", "Upload Date", "Uploader", "In Vector DB"])
     
-    # File type filter
-    if len(df) > 0:
-        file_types = ["All"] + sorted(df["Type"].unique().tolist())
-        selected_type = st.selectbox("Filter by file type:", file_types)
-        if selected_type != "All":
-            df = df[df["Type"] == selected_type]
-    
-    # Vector DB filter
-    vector_db_filter = st.radio(
-        "Vector Database Status:",
-        ["All", "In Vector DB", "Not in Vector DB"],
-        horizontal=True
+    # Display the dataframe with a selection column for bulk actions
+    select_all = st.checkbox("Select all listed files")
+    # A new key after each bulk action clears the selection of files that are gone
+    bulk_runs = st.session_state.setdefault("files_bulk_runs", 0)
+    table = st.data_editor(
+        df.assign(Select=select_all)[["Select", *df.columns]],
+        hide_index=True,
+        disabled=list(df.columns),
+        column_config={"Select": st.column_config.CheckboxColumn("Select", width="small")},
+        key=f"files_select_{bulk_runs}_{select_all}",
     )
+    selected = table.loc[table["Select"], "ID"].tolist()
     
-    if vector_db_filter == "In Vector DB":
-        df = df[df["In Vector DB"] == True]
-    elif vector_db_filter == "Not in Vector DB":
-        df = df[df["In Vector DB"] == False]
+    st.caption(f"Showing {len(df)} of {total} matching files")
+    if len(df) < total:
+        if st.button("Load more"):
+            st.session_state.files_dashboard_pages += 1
+            st.rerun()
     
-    # Display the dataframe
-    st.dataframe(df)
+    # Delete or (un)index every selected file in concurrent batches
+    show_bulk_actions(selected, files)
+    
+    # Files with identical content, found through their recorded hashes
+    show_duplicate_files()
     
     # File actions
     st.subheader("File Actions")
@@ -83,18 +122,20 @@ def show_files_dashboard():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        # Download button
+        # Fetched by the app with its backend credentials; the browser never talks to the backend
         if st.button("Download File"):
-            file_data, filename = download_file(selected_file_id)
-            if file_data:
-                st.download_button(
-                    label="Click to download",
-                    data=file_data,
-                    file_name=filename,
-                    mime=selected_file_info["file_type"]
-                )
+            file_path, filename = download_file_to_disk(selected_file_id, expected_sha256=selected_file_info.get("sha256"))
+            if file_path:
+                with open(file_path, "rb") as f:
+                    st.download_button(
+                        label="Click to download",
+                        data=f,
+                        file_name=filename,
+                        mime=selected_file_info["file_type"]
+                    )
+                os.remove(file_path)
             else:
-                st.error("File could not be downloaded")
+                st.error(f"File could not be downloaded: {filename}")
     
     with col2:
         if st.button("Delete File"):
@@ -102,10 +143,9 @@ def show_files_dashboard():
                 st.session_state.confirm_delete = selected_file_id
                 st.warning(f"Are you sure you want to delete '{selected_file_info['original_filename']}'? Click Delete again to confirm.")
             else:
-                response = delete_file(selected_file_id) 
-                result = remove_file_from_vector_db(selected_file_id)
+                response = delete_files({selected_file_id: selected_file_info})[selected_file_id]
 
-                if response["status"] and result['status']:
+                if response["status"]:
                     st.success(response["message"])
                     st.session_state.confirm_delete = None
                     st.rerun()
@@ -126,9 +166,13 @@ def show_files_dashboard():
                         result = add_file_to_vector_db(selected_file_id, selected_file_info)
                     else:
                         # Remove file from vector database
-                        result = remove_file_from_vector_db(selected_file_id)
+                        # Refused while linked copies depend on the file's chunks
+                        result = remove_files_from_vector_db({selected_file_id: selected_file_info})[selected_file_id]
 
-                    if result['status']:
+                    # Identical content already indexed under another file is not indexed again
+                    if result.get('skipped'):
+                        st.info(result['message'])
+                    elif result['status']:
                         st.success(result['message'])
                         st.rerun()
                     else:
@@ -136,3 +180,113 @@ def show_files_dashboard():
 
                 except Exception as e:
                     st.error(f"An error occurred: {str(e)}")
+
+
+def show_bulk_actions(selected, files):
+    """Delete, add to or remove from the vector DB all selected files"""
+    st.subheader("Bulk Actions")
+    
+    # Report of the last bulk action, kept across the rerun that refreshed the table
+    report = st.session_state.pop("files_bulk_report", None)
+    if report:
+        show_batch_results(**report)
+    
+    if not selected:
+        st.caption("Select files in the table to delete or (un)index them together.")
+        return
+    
+    to_add = [file_id for file_id in selected if not files[file_id]["in_vector_db"]]
+    to_remove = [file_id for file_id in selected if files[file_id]["in_vector_db"]]
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        if st.button(f"Delete {len(selected)} files"):
+            if st.session_state.get("confirm_bulk_delete") != sorted(selected):
+                st.session_state.confirm_bulk_delete = sorted(selected)
+                st.warning(f"Are you sure you want to delete {len(selected)} files? Click Delete again to confirm.")
+            else:
+                st.session_state.confirm_bulk_delete = None
+                run_bulk_action("Deleted", delete_files, {file_id: files[file_id] for file_id in selected}, files)
+    
+    with col2:
+        if st.button(f"Add {len(to_add)} files to Vector DB", disabled=not to_add):
+            run_bulk_action("Added to Vector DB", add_files_to_vector_db,
+                            {file_id: files[file_id] for file_id in to_add}, files)
+    
+    with col3:
+        if st.button(f"Remove {len(to_remove)} files from Vector DB", disabled=not to_remove):
+            run_bulk_action("Removed from Vector DB", remove_files_from_vector_db,
+                            {file_id: files[file_id] for file_id in to_remove}, files)
+
+def run_bulk_action(label, action, targets, files):
+    """Run a batched file_manager action with a progress bar, then refresh the table"""
+    total = len(targets)
+    progress = st.progress(0.0, text=f"Processing 0/{total} files...")
+    done = 0
+    
+    def on_batch(results):
+        nonlocal done
+        done += len(results)
+        progress.progress(min(done / total, 1.0), text=f"Processing {done}/{total} files...")
+    
+    start = time.perf_counter()
+    results = action(targets, max_workers=BULK_CONCURRENCY, on_batch=on_batch)
+    st.session_state.files_bulk_report = {
+        "results": results,
+        "filenames": {file_id: files[file_id]["original_filename"] for file_id in results if file_id in files},
+        "label": label,
+        "seconds": time.perf_counter() - start,
+    }
+    st.session_state.files_bulk_runs = st.session_state.get("files_bulk_runs", 0) + 1
+    st.rerun()
+
+def show_duplicate_files():
+    """List groups of files with identical content across the whole files index"""
+    with st.expander("Duplicate files"):
+        # Needs the full index, so only loaded on request
+        if not st.checkbox("Find files with identical content"):
+            return
+        
+        groups, unhashed = find_duplicate_files()
+        if unhashed:
+            st.caption(f"{unhashed} files were uploaded before content hashes were recorded and are not compared.")
+        if not groups:
+            st.success("No duplicate files found.")
+            return
+        
+        rows = []
+        for files in groups:
+            size = files[0][1].get("file_size_bytes", 0)
+            rows.append({
+                "SHA-256": files[0][1]["sha256"][:12],
+                "Copies": len(files),
+                "Filenames": ", ".join(sorted({info["original_filename"] for _, info in files})),
+                "In Vector DB": sum(1 for _, info in files if info.get("in_vector_db")),
+                "Wasted (KB)": round(size * (len(files) - 1) / 1024, 2),
+                "IDs": ", ".join(file_id for file_id, _ in files),
+            })
+        st.warning(f"{len(groups)} groups of identical files, {sum(r['Copies'] - 1 for r in rows)} redundant copies.")
+        st.dataframe(pd.DataFrame(rows), hide_index=True)
+
+def show_batch_results(results, filenames, label="Processed", seconds=None):
+    """Summarise per-file results of a batch action"""
+    failed = {file_id: r for file_id, r in results.items() if not r.get("status")}
+    skipped = {file_id: r for file_id, r in results.items() if r.get("status") and r.get("skipped")}
+    succeeded = len(results) - len(failed) - len(skipped)
+    took = f" in {seconds:.1f} s" if seconds is not None else ""
+    
+    if skipped:
+        st.info(f"{label}: {len(skipped)} files skipped, their content is already in the vector DB.")
+        st.dataframe(pd.DataFrame([
+            {"File": filenames.get(file_id, file_id), "ID": file_id, "Reason": r.get("message", "")}
+            for file_id, r in skipped.items()
+        ]), hide_index=True)
+    if failed:
+        st.warning(f"{label}: {succeeded} succeeded, {len(failed)} failed{took}.")
+        st.dataframe(pd.DataFrame([
+            {"File": filenames.get(file_id, file_id), "ID": file_id, "Error": r.get("message", "Unknown error")}
+            for file_id, r in failed.items()
+        ]), hide_index=True)
+    else:
+        st.success(f"{label}: {succeeded} files processed successfully{took}.")
@@ -0,0 +1,59 @@
+import streamlit as st
+import pandas as pd
+from utils import perf
+from utils.api_client import pool
+from utils.limiter import limiter, LIMITER_ENABLED
+
+# Rows shown in the sidebar table
+PANEL_ROWS = 15
+
+def _histogram(samples):
+    """Count recent samples per latency bucket"""
+    labels = [f"≤{bound * 1000:g} ms" if bound < 1 else f"≤{bound:g} s" for bound in perf.LATENCY_BUCKETS] + ["> 60 s"]
+    counts = [0] * len(labels)
+    for _, seconds, _ in samples:
+        counts[next((i for i, bound in enumerate(perf.LATENCY_BUCKETS) if seconds <= bound), len(labels) - 1)] += 1
+
+    # Trim empty buckets at both ends so the chart stays readable
+    used = [i for i, count in enumerate(counts) if count]
+    if not used:
+        return None
+    return pd.DataFrame({"requests": counts[used[0]:used[-1] + 1]}, index=labels[used[0]:used[-1] + 1])
+
+def show_performance_panel():
+    """Sidebar panel with page render and backend call latencies of this server process"""
+    with st.expander("Performance"):
+        # Replica routing state, when several backends are configured
+        if len(pool.replicas) > 1:
+            st.dataframe(pd.DataFrame(pool.status()), hide_index=True, use_container_width=True)
+
+        # Adaptive concurrency limit on backend calls
+        if LIMITER_ENABLED:
+            status = limiter.status()
+            st.caption(
+                f"Concurrency limit {status['limit']:g} · in flight {status['in_flight']} · "
+                f"waiting {status['waiting']} · decreases {status['decreases']}"
+            )
+
+        rows = perf.registry.snapshot()
+        if not rows:
+            st.caption("No measurements yet.")
+            return
+
+        table = pd.DataFrame(rows)[["kind", "name", "count", "errors", "p50_ms", "p95_ms", "response_bytes"]]
+        st.dataframe(table.head(PANEL_ROWS), hide_index=True, use_container_width=True)
+
+        names = [f"{row['kind']}: {row['name']}" for row in rows]
+        selected = st.selectbox("Recent latency", names, key="perf_series")
+        kind, name = selected.split(": ", 1)
+        histogram = _histogram(perf.registry.recent(kind, name))
+        if histogram is not None:
+            st.bar_chart(histogram)
+
+        if st.checkbox("Show Prometheus metrics", key="perf_prometheus"):
+            st.code(perf.registry.prometheus_text(), language="text")
+        st.download_button("Download metrics", perf.registry.prometheus_text(), file_name="metrics.txt", mime="text/plain")
+
+        if st.button("Reset measurements"):
+            perf.registry.reset()
+            st.rerun()
@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.file_manager import save_uploaded_file, add_file_to_vector_db
+from utils.file_manager import upload_files_concurrently, UPLOAD_CONCURRENCY
 
 def show_upload_page():
     """Display the file upload page"""
@@ -15,24 +15,49 @@ def show_upload_page():
     # Vector DB option
     include_in_vector_db = st.checkbox("Include in Vector Database", value=False)
     
+    # Concurrency limit
+    with st.expander("Advanced"):
+        max_workers = st.number_input(
+            "Parallel uploads",
+            min_value=1,
+            max_value=32,
+            value=UPLOAD_CONCURRENCY,
+            step=1
+        )
+        chunked = st.checkbox(
+            "Resumable chunked upload for large files",
+            value=True,
+            help="Large files are sent in parts; uploading the same file again after a failure only sends the missing parts."
+        )
+    
     # Upload button
     if st.button("Process Uploads") and uploaded_files:
+        total = len(uploaded_files)
+        progress = st.progress(0.0, text=f"Processing 0/{total} files...")
+        failures = []
+        
         with st.spinner("Processing uploads..."):
-            for uploaded_file in uploaded_files:
-                # Process and save the file
-                file_id, file_info = save_uploaded_file(uploaded_file, include_in_vector_db)
-                
-                # If file should be included in vector DB, add it
-                if include_in_vector_db:
-                    result = add_file_to_vector_db(file_id, file_info)
-
-                    if result['status']:
-                        st.success(result['message'])
-                    else:
-                        st.error(result['message'])
+            results = upload_files_concurrently(
+                uploaded_files,
+                include_in_vector_db,
+                st.session_state.username,
+                max_workers=int(max_workers),
+                chunked=chunked
+            )
+            for done, result in enumerate(results, start=1):
+                progress.progress(done / total, text=f"Processing {done}/{total} files...")
                 
-                # Show success message
-                st.success(f"File '{uploaded_file.name}' uploaded successfully!")
+                if result["status"]:
+                    st.success(result["message"])
+                else:
+                    failures.append(result)
+                    st.error(f"{result['filename']}: {result['message']}")
+        
+        # Summary of the batch
+        if failures:
+            st.warning(f"{total - len(failures)} of {total} files processed, {len(failures)} failed.")
+        else:
+            st.success(f"All {total} files processed successfully.")
     
     # Information section
     st.markdown("### Supported File Types")
@@ -0,0 +1,53 @@
+"""Reconcile the files index with the Milvus collection, e.g. nightly from cron.
+
+Scans the collection once with a query iterator and compares the file IDs of its
+chunks with the in_vector_db flags of the files index. By default only the drift
+is reported; with --apply, chunks of unflagged or deleted files are removed with
+batched deletes and flagged files without chunks are re-indexed through the
+backend's batch endpoint.
+
+    python reconcile_vector_db.py
+    python reconcile_vector_db.py --apply --report benchmarks/reconcile.json
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from utils import vdb_reconcile
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile the files index with the Milvus collection")
+    parser.add_argument("--apply", action="store_true", help="repair the drift (default: report only)")
+    parser.add_argument("--uri", default=vdb_reconcile.MILVUS_URI)
+    parser.add_argument("--collection", default=vdb_reconcile.MILVUS_COLLECTION)
+    parser.add_argument("--file-id-field", default=vdb_reconcile.MILVUS_FILE_ID_FIELD,
+                        help='chunk field holding the file ID, e.g. file_id or metadata["file_id"]')
+    parser.add_argument("--scan-batch-size", type=int, default=vdb_reconcile.SCAN_BATCH_SIZE)
+    parser.add_argument("--delete-batch-size", type=int, default=vdb_reconcile.DELETE_BATCH_SIZE)
+    parser.add_argument("--index-batch-size", type=int, default=None, help="files per re-index request")
+    parser.add_argument("--report", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    index = vdb_reconcile.MilvusIndex(
+        args.uri, args.collection, args.file_id_field, scan_batch_size=args.scan_batch_size
+    )
+    report = vdb_reconcile.reconcile(
+        index, apply=args.apply, index_batch_size=args.index_batch_size, delete_batch_size=args.delete_batch_size
+    )
+    report["timestamp"] = str(datetime.now())
+    report["collection"] = args.collection
+
+    print(json.dumps({k: v for k, v in report.items() if k != "errors"}, indent=4))
+    for error in report["errors"]:
+        print(f"  {error}")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=4)
+
+    # Non-zero exit lets cron/monitoring notice failed repairs
+    if report["reindex_failed"] or report["delete_failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Cold start and login-page latency of the admin interface.
+
+Each sample starts a fresh interpreter that renders app.py with Streamlit's
+AppTest harness: once for the cold login render and again for a rerun. The
+"lazy" mode is the normal app; "eager" sets ADMIN_PRELOAD_PAGES=true, which
+imports every page up front like app.py used to. The difference between the
+two is what lazy page loading saves on every cold start.
+
+    python startup_report.py --samples 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+REPORTS_DIR = ROOT / "benchmarks"
+
+# Modules whose presence after the login render shows a page was imported eagerly
+# (AppTest itself imports matplotlib, but not pyplot)
+HEAVY_MODULES = ["matplotlib.pyplot", "my_pages.evaluation", "my_pages.files_dashboard", "utils.rag_evaluator"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit_loaded = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=120).run()
+first_render = time.perf_counter()
+at.run()
+rerun = time.perf_counter()
+print(json.dumps({{
+    "streamlit_import_s": streamlit_loaded - start,
+    "login_render_s": first_render - streamlit_loaded,
+    "login_rerun_s": rerun - first_render,
+    "modules": len(sys.modules),
+    "heavy_modules": [m for m in {heavy!r} if m in sys.modules],
+    "exception": [str(e.value) for e in at.exception],
+}}))
+"""
+
+def sample(mode):
+    """Run one fresh-interpreter probe and return its timings"""
+    env = dict(os.environ, ADMIN_PRELOAD_PAGES="true" if mode == "eager" else "false")
+    code = _PROBE.format(app=str(ROOT / "app.py"), heavy=HEAVY_MODULES)
+
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    result["cold_start_s"] = wall
+    return result
+
+def summarize(samples):
+    keys = ["cold_start_s", "streamlit_import_s", "login_render_s", "login_rerun_s"]
+    summary = {key: statistics.median(s[key] for s in samples) for key in keys}
+    summary["modules"] = samples[-1]["modules"]
+    summary["heavy_modules"] = samples[-1]["heavy_modules"]
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start and login-page latency")
+    parser.add_argument("--samples", type=int, default=3, help="fresh interpreters per mode")
+    parser.add_argument("--output-dir", default=str(REPORTS_DIR))
+    args = parser.parse_args()
+
+    report = {"timestamp": str(datetime.now()), "samples": args.samples, "modes": {}}
+    for mode in ("eager", "lazy"):
+        samples = [sample(mode) for _ in range(args.samples)]
+        for s in samples:
+            if s["exception"]:
+                print(f"{mode}: app raised {s['exception']}")
+        report["modes"][mode] = summarize(samples)
+
+    eager, lazy = report["modes"]["eager"], report["modes"]["lazy"]
+    print(f"{'median':<22}{'eager':>10}{'lazy':>10}{'saved':>10}")
+    for key, label in [("cold_start_s", "cold start (s)"), ("login_render_s", "login render (s)"),
+                       ("login_rerun_s", "login rerun (s)")]:
+        print(f"{label:<22}{eager[key]:>10.3f}{lazy[key]:>10.3f}{eager[key] - lazy[key]:>10.3f}")
+    print(f"{'modules loaded':<22}{eager['modules']:>10}{lazy['modules']:>10}{eager['modules'] - lazy['modules']:>10}")
+    print(f"\nHeavy modules at login: eager={eager['heavy_modules']} lazy={lazy['heavy_modules']}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    report_path = Path(args.output_dir) / f"startup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"Report saved to {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,609 @@
+"""Local stand-in for the admin API, for trying client features without the RAG stack.
+
+Run it with `python stub_backend.py --port 8000` and point the admin interface at it
+with ADMIN_API_URL=http://127.0.0.1:8000. State is kept in memory and lost on exit.
+
+It implements every endpoint the helpers in utils/ call (auth, file upload/list/
+download/delete, vector DB add/remove, queries and testsets), and can inject latency,
+errors and large payloads so client-side throughput features can be tested
+reproducibly:
+
+    python stub_backend.py --latency lognormal:40:0.5 --error-rate 0.02 --seed 1 \\
+        --route-latency get_queries_response=uniform:200:800 --answer-bytes 4096
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+def parse_latency(spec):
+    """Turn a latency spec into a function rng -> seconds.
+
+    Specs are in milliseconds: "0", "fixed:50", "uniform:20:80",
+    "lognormal:MEDIAN:SIGMA" and "exp:MEAN".
+    """
+    kind, _, args = spec.partition(":")
+    if not args:
+        kind, args = "fixed", kind
+    values = [float(v) for v in args.split(":")]
+
+    if kind == "fixed":
+        return lambda rng: values[0] / 1000
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) / 1000
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1 / values[0]) / 1000 if values[0] else 0.0
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+class FaultProfile:
+    """Latency and error injection, per route name with a default for all routes.
+
+    All draws come from one seeded generator, so a given seed and request order
+    reproduces the same delays and failures.
+    """
+
+    def __init__(self, latency="0", error_rate=0.0, error_status=503, route_latency=None,
+                 route_error_rate=None, answer_bytes=0, sources=1, testset_row_latency="50", seed=None):
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.route_latency = {name: parse_latency(spec) for name, spec in (route_latency or {}).items()}
+        self.route_error_rate = dict(route_error_rate or {})
+        self.answer_bytes = answer_bytes
+        self.sources = sources
+        self.testset_row_latency = parse_latency(testset_row_latency)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self, route):
+        with self.lock:
+            return max(0.0, self.route_latency.get(route, self.latency)(self.rng))
+
+    def row_delay(self):
+        with self.lock:
+            return max(0.0, self.testset_row_latency(self.rng))
+
+    def should_fail(self, route):
+        with self.lock:
+            return self.rng.random() < self.route_error_rate.get(route, self.error_rate)
+
+def _hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+class StubState:
+    """In-memory users, files index, pending chunked uploads and testset jobs"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = {"admin": {"password": _hash_password("admin"), "created_by": None}}
+        self.files = {}
+        self.uploads = {}
+        self.testset_jobs = {}
+        self.testset_files = {}
+        # Bumped by every change to the files index, used in the listing ETag
+        self.version = 0
+
+    def add_file(self, filename, content_type, data, uploader, in_vector_db=False):
+        file_id = str(uuid.uuid4())
+        metadata = {
+            "original_filename": filename,
+            "stored_filename": file_id + (("." + filename.rsplit(".", 1)[-1]) if "." in filename else ""),
+            "upload_time": str(datetime.datetime.now()),
+            "uploader": uploader,
+            "file_size_bytes": len(data),
+            "file_type": content_type or "application/octet-stream",
+            "in_vector_db": in_vector_db,
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+        with self.lock:
+            self.files[file_id] = {"metadata": metadata, "data": data}
+            self.version += 1
+        return file_id, metadata
+
+    def seed_files(self, count, size_bytes=4096):
+        """Add synthetic text files, e.g. for benchmarks"""
+        for i in range(count):
+            self.add_file(f"seed_{i:05d}.txt", "text/plain", bytes([65 + i % 26]) * size_bytes, "stub", i % 2 == 0)
+
+    def set_in_vector_db(self, file_id, value):
+        with self.lock:
+            stored = self.files.get(file_id)
+            if stored is None:
+                return False
+            stored["metadata"]["in_vector_db"] = value
+            self.version += 1
+            return True
+
+def _testset_row(i):
+    question = f"Stub question {i}?"
+    return {
+        "question": question,
+        "reference": f"Stub answer to: {question}",
+        "retrieved_context": json.dumps([f"Stub context for: {question}"]),
+    }
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real uvicorn server
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+    state = None
+    faults = None
+
+    # (method, path pattern, handler name); handler names double as route names for fault injection
+    routes = [
+        ("GET", r"/health", "health"),
+        ("GET", r"/admin/check_login", "check_login"),
+        ("POST", r"/admin/create_user", "create_user"),
+        ("GET", r"/admin/get_users", "get_users"),
+        ("GET", r"/admin/verify_password", "verify_password"),
+        ("PUT", r"/admin/change_password", "change_password"),
+        ("GET", r"/admin/list_files", "list_files"),
+        ("POST", r"/admin/upload_file", "upload_file"),
+        ("POST", r"/admin/files/lookup_hashes", "lookup_hashes"),
+        ("POST", r"/admin/link_file", "link_file"),
+        ("DELETE", r"/admin/delete_file", "delete_file"),
+        ("GET", r"/admin/download_file", "download_file"),
+        ("POST", r"/admin/add_file_to_vdb", "add_file_to_vdb"),
+        ("POST", r"/admin/remove_file_from_vdb", "remove_file_from_vdb"),
+        ("POST", r"/admin/add_files_to_vdb", "add_files_to_vdb"),
+        ("POST", r"/admin/remove_files_from_vdb", "remove_files_from_vdb"),
+        ("POST", r"/admin/uploads", "create_upload"),
+        ("GET", r"/admin/uploads/(?P<upload_id>[^/]+)", "get_upload"),
+        ("PUT", r"/admin/uploads/(?P<upload_id>[^/]+)/parts/(?P<part>\d+)", "put_part"),
+        ("POST", r"/admin/uploads/(?P<upload_id>[^/]+)/commit", "commit_upload"),
+        ("POST", r"/admin/get_queries_response", "get_queries_response"),
+        ("POST", r"/admin/create_testset_using_ragas", "create_testset"),
+        ("POST", r"/admin/testset_jobs", "create_testset_job"),
+        ("GET", r"/admin/testset_jobs/(?P<job_id>[^/]+)/stream", "stream_testset_job"),
+        ("DELETE", r"/admin/testset_jobs/(?P<job_id>[^/]+)", "cancel_testset_job"),
+        ("GET", r"/admin/testset_files", "testset_files"),
+        ("GET", r"/download", "download_testset"),
+    ]
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        self.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        self.body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        for route_method, pattern, name in self.routes:
+            match = re.fullmatch(pattern, url.path)
+            if route_method == method and match:
+                delay = self.faults.delay(name)
+                if delay:
+                    time.sleep(delay)
+                if self.faults.should_fail(name):
+                    return self.send_json(self.faults.error_status, {"detail": "Injected failure"})
+                return getattr(self, name)(**match.groupdict())
+
+        self.send_json(404, {"detail": "Not Found"})
+
+    def json_body(self):
+        return json.loads(self.body or b"{}")
+
+    def form_body(self):
+        """Fields of a urlencoded or multipart form; file fields become (filename, content_type, data)"""
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/form-data"):
+            message = BytesParser(policy=HTTP).parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode() + self.body
+            )
+            fields = {}
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                data = part.get_payload(decode=True) or b""
+                if part.get_filename():
+                    fields[name] = (part.get_filename(), part.get_content_type(), data)
+                else:
+                    fields[name] = data.decode()
+            return fields
+        return {k: v[-1] for k, v in parse_qs(self.body.decode()).items()}
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def health(self):
+        self.send_json(200, {"status": "ok"})
+
+    # Auth
+
+    def check_login(self):
+        user = self.state.users.get(self.query.get("username"))
+        if user is None or user["password"] != _hash_password(self.query.get("password", "")):
+            return self.send_json(401, {"detail": "Invalid username or password"})
+        self.send_json(200, {"success": True})
+
+    def create_user(self):
+        username = self.query.get("username")
+        with self.state.lock:
+            if not username or username in self.state.users:
+                return self.send_json(200, {"success": False, "message": "Username already exists"})
+            self.state.users[username] = {
+                "password": _hash_password(self.query.get("password", "")),
+                "created_by": self.query.get("created_by"),
+            }
+        self.send_json(200, {"success": True, "message": f"User {username} created"})
+
+    def get_users(self):
+        with self.state.lock:
+            users = {name: {"created_by": user["created_by"]} for name, user in self.state.users.items()}
+        self.send_json(200, users)
+
+    def verify_password(self):
+        user = self.state.users.get(self.query.get("username"))
+        verified = user is not None and user["password"] == _hash_password(self.query.get("pass_input", ""))
+        self.send_json(200, {"verified": verified})
+
+    def change_password(self):
+        username = self.query.get("username")
+        with self.state.lock:
+            if username not in self.state.users:
+                return self.send_json(404, {"detail": "User not found"})
+            self.state.users[username]["password"] = _hash_password(self.query.get("new_password", ""))
+        self.send_json(200, {"success": True})
+
+    # Files
+
+    def list_files(self):
+        params = hashlib.sha256(repr(sorted(self.query.items())).encode()).hexdigest()[:16]
+        etag = f'"{self.state.version}-{params}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        with self.state.lock:
+            index = {file_id: dict(f["metadata"]) for file_id, f in self.state.files.items()}
+
+        # Without a page the full index is returned, like older servers
+        if "page" not in self.query:
+            return self.send_json(200, index, {"ETag": etag})
+
+        search = self.query.get("search", "").lower()
+        file_type = self.query.get("file_type")
+        in_vector_db = self.query.get("in_vector_db")
+        matches = [
+            (file_id, info) for file_id, info in index.items()
+            if (not search or search in info["original_filename"].lower())
+            and (not file_type or info["file_type"] == file_type)
+            and (in_vector_db is None or info["in_vector_db"] == (in_vector_db == "true"))
+        ]
+
+        page, page_size = int(self.query["page"]), int(self.query.get("page_size", 50))
+        start = (page - 1) * page_size
+        self.send_json(200, {
+            "files": dict(matches[start:start + page_size]),
+            "total": len(matches),
+            "page": page,
+            "page_size": page_size,
+            "file_types": sorted({info["file_type"] for info in index.values()}),
+        }, {"ETag": etag})
+
+    def upload_file(self):
+        form = self.form_body()
+        if "uploaded_file" not in form:
+            return self.send_json(422, {"detail": "uploaded_file is required"})
+
+        filename, content_type, data = form["uploaded_file"]
+        if form.get("sha256") and hashlib.sha256(data).hexdigest() != form["sha256"]:
+            return self.send_json(400, {"detail": "Checksum mismatch"})
+        file_id, metadata = self.state.add_file(
+            filename, content_type, data, form.get("username"), form.get("in_vector_db") == "true"
+        )
+        self.send_json(200, {"file_id": file_id, "metadata": metadata})
+
+    def lookup_hashes(self):
+        request = self.json_body()
+        wanted = set(request.get("sha256", []))
+        matches, copies = {}, {}
+        with self.state.lock:
+            for file_id, stored in self.state.files.items():
+                sha256 = stored["metadata"]["sha256"]
+                if sha256 not in wanted:
+                    continue
+                copies.setdefault(sha256, {})[file_id] = dict(stored["metadata"])
+                if sha256 not in matches or stored["metadata"]["in_vector_db"]:
+                    matches[sha256] = {"file_id": file_id, "metadata": dict(stored["metadata"])}
+        # With "all", every file per hash, for checks that must see all copies
+        self.send_json(200, {"copies": copies} if request.get("all") else {"matches": matches})
+
+    def link_file(self):
+        request = self.json_body()
+        stored = self.state.files.get(request.get("file_id"))
+        if stored is None:
+            return self.send_json(404, {"detail": "File not found"})
+
+        # The stub copies the bytes; a real server would point at the same stored file
+        file_id, metadata = self.state.add_file(
+            request.get("filename") or stored["metadata"]["original_filename"],
+            stored["metadata"]["file_type"], stored["data"], request.get("username"),
+        )
+        self.send_json(200, {"file_id": file_id, "metadata": metadata})
+
+    def delete_file(self):
+        with self.state.lock:
+            stored = self.state.files.pop(self.query.get("file_id"), None)
+            self.state.version += 1
+        if stored is None:
+            return self.send_json(200, {"status": False, "message": "File not found"})
+        self.send_json(200, {"status": True, "message": f"File {stored['metadata']['original_filename']} deleted"})
+
+    def download_file(self):
+        stored = self.state.files.get(self.query.get("file_id"))
+        if stored is None:
+            return self.send_json(404, {"error": "File not found"})
+
+        data, status = stored["data"], 200
+        headers = {
+            "Content-Type": stored["metadata"]["file_type"],
+            "Content-Disposition": f"attachment; filename={stored['metadata']['original_filename']}",
+            "X-Content-SHA256": stored["metadata"]["sha256"],
+            "Accept-Ranges": "bytes",
+        }
+
+        match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if match:
+            offset = int(match.group(1))
+            if offset >= len(data):
+                return self.send_json(416, {"error": "Range not satisfiable"}, {"Content-Range": f"bytes */{len(data)}"})
+            headers["Content-Range"] = f"bytes {offset}-{len(data) - 1}/{len(data)}"
+            data, status = data[offset:], 206
+
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _vdb_result(self, file_id, value):
+        if not self.state.set_in_vector_db(file_id, value):
+            return {"file_id": file_id, "status": False, "message": "File not found"}
+        action = "added to" if value else "removed from"
+        return {"file_id": file_id, "status": True, "message": f"File {action} vector DB"}
+
+    def add_file_to_vdb(self):
+        self.send_json(200, self._vdb_result(self.form_body().get("file_id"), True))
+
+    def remove_file_from_vdb(self):
+        self.send_json(200, self._vdb_result(self.form_body().get("file_id"), False))
+
+    def add_files_to_vdb(self):
+        files = self.json_body().get("files", [])
+        self.send_json(200, {"results": [self._vdb_result(f["file_id"], True) for f in files]})
+
+    def remove_files_from_vdb(self):
+        file_ids = self.json_body().get("file_ids", [])
+        self.send_json(200, {"results": [self._vdb_result(file_id, False) for file_id in file_ids]})
+
+    # Chunked uploads
+
+    def create_upload(self):
+        upload = self.json_body()
+        upload_id = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.uploads[upload_id] = {**upload, "parts": {}}
+        self.send_json(200, {"upload_id": upload_id})
+
+    def get_upload(self, upload_id):
+        upload = self.state.uploads.get(upload_id)
+        if upload is None:
+            return self.send_json(404, {"detail": "Unknown upload"})
+        self.send_json(200, {"upload_id": upload_id, "parts": sorted(upload["parts"])})
+
+    def put_part(self, upload_id, part):
+        upload = self.state.uploads.get(upload_id)
+        if upload is None:
+            return self.send_json(404, {"detail": "Unknown upload"})
+
+        expected = self.headers.get("X-Part-SHA256")
+        if expected and hashlib.sha256(self.body).hexdigest() != expected:
+            return self.send_json(400, {"detail": "Part checksum mismatch"})
+
+        with self.state.lock:
+            upload["parts"][int(part)] = self.body
+        self.send_json(200, {"part": int(part), "size": len(self.body)})
+
+    def commit_upload(self, upload_id):
+        with self.state.lock:
+            upload = self.state.uploads.pop(upload_id, None)
+        if upload is None:
+            return self.send_json(404, {"detail": "Unknown upload"})
+
+        data = b"".join(upload["parts"][n] for n in sorted(upload["parts"]))
+        if len(data) != upload["size"] or (upload.get("sha256") and hashlib.sha256(data).hexdigest() != upload["sha256"]):
+            return self.send_json(400, {"detail": "Assembled file does not match the announced size or checksum"})
+
+        file_id, metadata = self.state.add_file(
+            upload["filename"], upload.get("content_type"), data, upload.get("username"), bool(upload.get("in_vector_db"))
+        )
+        self.send_json(200, {"file_id": file_id, "metadata": metadata})
+
+    # Queries
+
+    def get_queries_response(self):
+        queries = self.json_body().get("queries", [])
+        padding = "x" * self.faults.answer_bytes
+        responses = [
+            {
+                "question": q,
+                "answer": f"Stub answer to: {q}{padding}",
+                "sources": [f"Stub context for: {q}"] * max(1, self.faults.sources),
+            }
+            for q in queries
+        ]
+        self.send_json(200, {"responses": responses})
+
+    # Testsets
+
+    def _save_testset(self, rows):
+        filename = f"testset_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:4]}.csv"
+        lines = ["index,question,reference,retrieved_context"]
+        for i, row in enumerate(rows):
+            context = row["retrieved_context"].replace('"', '""')
+            lines.append(f'{i},"{row["question"]}","{row["reference"]}","{context}"')
+        with self.state.lock:
+            self.state.testset_files[filename] = {"datetime": str(datetime.datetime.now()), "data": "\n".join(lines)}
+
+    def create_testset(self):
+        rows = [_testset_row(i) for i in range(int(self.json_body().get("num_of_test", 10)))]
+        self._save_testset(rows)
+        self.send_json(200, {"data": rows})
+
+    def create_testset_job(self):
+        job_id = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.testset_jobs[job_id] = {
+                "num": int(self.json_body().get("num_of_test", 10)),
+                "cancelled": False,
+                "saved": False,
+            }
+        self.send_json(200, {"job_id": job_id})
+
+    def stream_testset_job(self, job_id):
+        job = self.state.testset_jobs.get(job_id)
+        if job is None:
+            return self.send_json(404, {"detail": "Unknown testset job"})
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        try:
+            for i in range(int(self.query.get("offset", 0)), job["num"]):
+                time.sleep(self.faults.row_delay())
+                if job["cancelled"]:
+                    self.send_chunk(json.dumps({"event": "cancelled"}).encode() + b"\n")
+                    break
+                self.send_chunk(json.dumps(_testset_row(i)).encode() + b"\n")
+            else:
+                if not job["saved"]:
+                    job["saved"] = True
+                    self._save_testset([_testset_row(i) for i in range(job["num"])])
+                self.send_chunk(json.dumps({"event": "done"}).encode() + b"\n")
+            self.send_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away, e.g. a Streamlit rerun
+            self.close_connection = True
+
+    def cancel_testset_job(self, job_id):
+        job = self.state.testset_jobs.get(job_id)
+        if job is None:
+            return self.send_json(404, {"detail": "Unknown testset job"})
+        job["cancelled"] = True
+        self.send_json(200, {"job_id": job_id, "cancelled": True})
+
+    def testset_files(self):
+        with self.state.lock:
+            files = [{"filename": name, "datetime": f["datetime"]} for name, f in sorted(self.state.testset_files.items())]
+        self.send_json(200, {"success": True, "message": "", "files": files})
+
+    def download_testset(self):
+        stored = self.state.testset_files.get(self.query.get("file"))
+        if stored is None:
+            return self.send_json(404, {"detail": "File not found"})
+
+        body = stored["data"].encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Content-Disposition", f"attachment; filename={self.query['file']}")
+        self.end_headers()
+        self.wfile.write(body)
+
+def make_server(host="127.0.0.1", port=8000, faults=None):
+    """Create a stub server with fresh state; call serve_forever() to run it"""
+    handler = type("Handler", (StubHandler,), {"state": StubState(), "faults": faults or FaultProfile()})
+    return ThreadingHTTPServer((host, port), handler)
+
+def _route_options(values, convert):
+    """Parse repeated ROUTE=VALUE options into a dict"""
+    result = {}
+    for value in values or []:
+        route, _, setting = value.partition("=")
+        result[route] = convert(setting)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the admin API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="0",
+                        help="latency of every route in ms: N, uniform:LO:HI, lognormal:MEDIAN:SIGMA or exp:MEAN")
+    parser.add_argument("--route-latency", action="append", metavar="ROUTE=SPEC",
+                        help="latency of one route, e.g. get_queries_response=uniform:200:800 (repeatable)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with --error-status")
+    parser.add_argument("--route-error-rate", action="append", metavar="ROUTE=RATE",
+                        help="error rate of one route (repeatable)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--answer-bytes", type=int, default=0, help="padding added to every query answer")
+    parser.add_argument("--sources", type=int, default=1, help="sources returned per query")
+    parser.add_argument("--testset-row-latency", default="50", help="delay before each streamed testset row in ms")
+    parser.add_argument("--seed-files", type=int, default=0, help="synthetic files created at startup")
+    parser.add_argument("--file-size", type=int, default=4096, help="size of each synthetic file in bytes")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible latency and errors")
+    args = parser.parse_args()
+
+    faults = FaultProfile(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        route_latency=_route_options(args.route_latency, str),
+        route_error_rate=_route_options(args.route_error_rate, float),
+        answer_bytes=args.answer_bytes,
+        sources=args.sources,
+        testset_row_latency=args.testset_row_latency,
+        seed=args.seed,
+    )
+    server = make_server(args.host, args.port, faults)
+    server.RequestHandlerClass.state.seed_files(args.seed_files, args.file_size)
+
+    print(f"Stub admin API listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,556 @@
+"""Smoke test of the admin API and regression checks of the client helpers.
+
+    python test.py          # send two queries to ADMIN_API_URL
+    python test.py --stub   # run everything against an in-process stub backend
+
+The regression checks upload and delete files, so they only run with --stub.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import threading
 import requests
 
-API_URL = "http://localhost:8080/admin/get_queries_response"
-payload = ["what is 1+1", "what is 1+2"]
+# The in-process stub backend, when running with --stub
+stub = None
+
+def start_stub():
+    """Start the in-repo stub backend on a free port and return its base URL"""
+    global stub
+    import stub_backend
+
+    stub = stub_backend.make_server(port=0)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{stub.server_port}"
+
+def check_queries():
+    from utils.api_client import url_for
 
-try:
-    response = requests.post(API_URL, json=payload)
+    payload = {"queries": ["what is 1+1", "what is 1+2"]}
+    response = requests.post(url_for("/admin/get_queries_response"), json=payload)
     print(response.json())
-except Exception as e:
-    print(f"Error: {e}")
\ No newline at end of file
+    assert response.status_code == 200, response.status_code
+
+def check_multiline_csv():
+    """Quoted multi-line cells (RAGAS references) parse at every block size"""
+    from utils.eval_engine import read_query_file
+
+    rows = "".join(f'"q {i}","line one\nline two {i}, more","[\'ctx {i}\']"\n' for i in range(500))
+    data = ("question,reference,retrieved_context\n" + rows).encode()
+    for block_size in (1 << 10, 1 << 14, 1 << 20):
+        parsed = list(read_query_file(io.BytesIO(data), is_csv=True, block_size=block_size))
+        assert len(parsed) == 500, (block_size, len(parsed))
+        assert parsed[7]["reference"] == "line one\nline two 7, more", (block_size, parsed[7])
+
+def check_retrieval_metrics():
+    """Per-query retrieval metrics match values worked out by hand"""
+    import math
+    import numpy as np
+    from utils.metrics import relevance_matrix, retrieval_metrics
+
+    # Ragged lists are truncated or padded to k
+    relevance = relevance_matrix([[0, 1, 0, 1, 1], [], [1], [1, 1]], 4)
+    assert relevance.tolist() == [[0, 1, 0, 1], [0, 0, 0, 0], [1, 0, 0, 0], [1, 1, 0, 0]], relevance
+
+    # Query 2 has no references and query 3 failed, so both are left out
+    metrics = retrieval_metrics(relevance, [2, 3, 0, 2], references_found=[2, 0, 1, 2], valid=[True, True, True, False])
+    d2, d3, d4 = 1 / math.log2(3), 1 / math.log2(4), 1 / math.log2(5)
+    expected = {
+        # Hits at ranks 2 and 4 of 4, both references found
+        "precision": [2 / 4, 0.0],
+        "recall": [2 / 2, 0 / 3],
+        "f1_score": [2 * 0.5 * 1.0 / 1.5, 0.0],
+        "mrr": [1 / 2, 0.0],
+        "ndcg": [(d2 + d4) / (1 + d2), 0.0],
+    }
+    for name, values in expected.items():
+        assert np.allclose(metrics[name][:2], values), (name, metrics[name])
+        assert np.isnan(metrics[name][2:]).all(), (name, metrics[name])
+
+    # Without references_found the hits are capped at the number of references
+    metrics = retrieval_metrics([[1, 1, 1, 0]], [2])
+    assert metrics["recall"][0] == 1.0 and math.isclose(metrics["ndcg"][0], (1 + d2 + d3) / (1 + d2 + d3)), metrics
+
+def check_metric_aggregates():
+    """Means skip undefined queries and bootstrap intervals are reproducible resampled means"""
+    import math
+    import numpy as np
+    from utils.metrics import bootstrap_ci, mean_metrics
+
+    assert mean_metrics({"a": [1.0, np.nan, 3.0], "b": [np.nan, np.nan]}) == {"a": 2.0, "b": None}
+
+    values = np.array([0.0, 1.0, 0.5, 0.25, 1.0, 0.0, 0.75, 0.5])
+    intervals = bootstrap_ci({"a": values, "constant": np.full(8, 0.5), "single": [np.nan, 1.0]}, n_resamples=500, seed=7)
+    assert bootstrap_ci({"a": values}, n_resamples=500, seed=7)["a"] == intervals["a"], "same seed, different interval"
+    assert intervals["constant"] == (0.5, 0.5), intervals
+    assert all(math.isnan(bound) for bound in intervals["single"]), intervals
+
+    # The same draws, averaged one resample at a time
+    draws = np.random.default_rng(7).integers(0, len(values), size=(500, len(values)))
+    low, high = np.quantile(values[draws].mean(axis=1), [0.025, 0.975])
+    assert np.allclose(intervals["a"], (low, high)), (intervals["a"], (low, high))
+    assert intervals["a"][0] < values.mean() < intervals["a"][1], intervals
+
+    # Undefined queries are left out of the resamples
+    assert bootstrap_ci({"a": np.append(values, np.nan)}, n_resamples=500, seed=7)["a"] == intervals["a"]
+
+def check_compare_runs():
+    """A run with a known regression is paired per question and flagged"""
+    import pandas as pd
+    from utils.eval_engine import compare_runs
+
+    questions = [f"question {i}" for i in range(20)]
+    base = pd.DataFrame({
+        "query": questions + ["only in base"],
+        "precision": 0.8,
+        "mrr": 0.5,
+        "latency_ms": 100.0,
+    })
+    # Candidate rows come in another order with stray whitespace and one question asked twice;
+    # precision drops by 0.4 everywhere, one answer got slow and one cached answer is old and slow
+    candidate = pd.DataFrame({
+        "query": [f" {q}" for q in reversed(questions)] + ["question 0", "only in candidate"],
+        "precision": [0.4] * 19 + [0.2, 0.6, 0.4],
+        "mrr": 0.5,
+        "latency_ms": [100.0] * 18 + [5000.0, 100.0, 100.0, 100.0],
+        "cached": [False] * 18 + [True, False, False, False],
+    })
+    candidate.loc[candidate["query"] == " question 3", "latency_ms"] = 900.0
+
+    summary, per_query, unmatched = compare_runs(base, candidate)
+    assert unmatched == {"base": 1, "candidate": 1}, unmatched
+    summary = summary.set_index("metric")
+    assert list(summary.index) == ["precision", "mrr", "latency_ms"], summary
+
+    precision = summary.loc["precision"]
+    assert precision["queries"] == 20 and precision["regressed_queries"] == 20, precision
+    assert abs(precision["delta"] + 0.4) < 1e-9 and precision["significant_regression"], precision
+    mrr = summary.loc["mrr"]
+    assert mrr["delta"] == 0 and not mrr["significant_regression"] and not mrr["significant_improvement"], mrr
+    # The cached answer's latency is not counted, and one slow answer is no significant change
+    latency = summary.loc["latency_ms"]
+    assert latency["queries"] == 19 and latency["regressed_queries"] == 1, latency
+    assert not latency["significant_regression"], latency
+
+    assert per_query.iloc[0]["query"] == "question 3" and per_query.iloc[0]["regressed_metrics"] == 2, per_query.head()
+
+def check_response_cache():
+    """The response cache evicts least recently used answers, is keyed by the corpus,
+    and cached answers are left out of the latency metrics"""
+    import tempfile
+    import time
+    from pathlib import Path
+    from utils import perf, response_cache, eval_engine
+    from utils.rag_evaluator import get_queries_response
+    from utils.file_manager import upload_files_concurrently
+
+    saved = response_cache.RESPONSE_CACHE_DB, response_cache.RESPONSE_CACHE_MAX_BYTES
+    response_cache.RESPONSE_CACHE_DB = Path(tempfile.mkdtemp()) / "response_cache.db"
+    response_cache._local.conn = None
+    try:
+        # Room for three answers: reading "a" makes "b" the least recently used one
+        answer = {"answer": "x" * 100}
+        response_cache.RESPONSE_CACHE_MAX_BYTES = 3 * len(json.dumps(answer))
+        for key in ("a", "b", "c"):
+            response_cache.put_many({key: answer})
+            time.sleep(0.01)
+        response_cache.get_many(["a"])
+        time.sleep(0.01)
+        response_cache.put_many({"d": answer})
+        assert set(response_cache.get_many(["a", "b", "c", "d"])) == {"a", "c", "d"}, "the wrong answer was evicted"
+        response_cache.RESPONSE_CACHE_MAX_BYTES = saved[1]
+
+        def backend_queries():
+            return sum(r["count"] for r in perf.registry.snapshot() if r["name"] == "POST /admin/get_queries_response")
+
+        # A repeated query is answered from the cache until the vector DB changes
+        sent = backend_queries()
+        [first] = get_queries_response(["What is the cached answer?"])
+        [second] = get_queries_response(["what is  the CACHED answer?"])
+        assert not first["cached"] and second["cached"] and backend_queries() - sent == 1, (first, second)
+        uploaded_file = io.BytesIO(b"new content changes the answers")
+        uploaded_file.name, uploaded_file.type = "cache_fingerprint.txt", "text/plain"
+        list(upload_files_concurrently([uploaded_file], in_vector_db=True, username="admin"))
+        [third] = get_queries_response(["What is the cached answer?"])
+        assert not third["cached"] and backend_queries() - sent == 2, third
+    finally:
+        response_cache._local.conn.close()
+        response_cache.RESPONSE_CACHE_DB, response_cache.RESPONSE_CACHE_MAX_BYTES = saved
+        response_cache._local.conn = None
+
+    def result(latency_ms, cached):
+        return {"error": None, "relevance": [1], "num_relevant": 1, "references_found": 1,
+                "latency_ms": latency_ms, "cached": cached}
+
+    summary = eval_engine.summarize([result(100.0, False), result(300.0, False), result(9000.0, True)], ["Latency"], 1)
+    assert summary["latency_ms"] == 200.0 and summary["latency_p95_ms"] <= 300.0, summary
+    assert summary["num_cached"] == 1, summary
+    summary = eval_engine.summarize([result(9000.0, True)], ["Latency"], 1)
+    assert "latency_ms" not in summary and "latency_p95_ms" not in summary, summary
+
+def check_prometheus_text():
+    """The metrics export follows the Prometheus text format and agrees with the recorded calls"""
+    import math
+    import re
+    from utils import perf
+
+    registry = perf.PerfRegistry()
+    name = 'GET /admin/files/{id} "quoted" \\ and\nnewline'
+    for seconds in (0.002, 0.02, 0.2, 0.2, 120.0):
+        registry.observe("backend", name, seconds, 200, response_bytes=10)
+    registry.observe("backend", name, 0.03, 500, error=True)
+    registry.observe("page", "Files", 0.3, "ok")
+    text = registry.prometheus_text()
+    assert text.endswith("\n"), "the export must end with a newline"
+
+    label = r'([a-zA-Z_]\w*)="((?:[^"\\\n]|\\[\\"n])*)"'
+    sample = re.compile(rf'([a-zA-Z_:][\w:]*)\{{({label}(?:,{label})*)\}} (\S+)')
+    types, samples = {}, []
+    for line in text.splitlines():
+        if line.startswith("#"):
+            comment = re.fullmatch(r"# (HELP|TYPE) ([a-zA-Z_:][\w:]*) (.+)", line)
+            assert comment, f"malformed comment line: {line!r}"
+            if comment[1] == "TYPE":
+                assert comment[2] not in types, f"{comment[2]} is declared twice"
+                assert comment[3] in ("counter", "gauge", "histogram", "summary", "untyped"), line
+                types[comment[2]] = comment[3]
+            continue
+        match = sample.fullmatch(line)
+        assert match, f"malformed sample line: {line!r}"
+        metric, value = match[1], float(match[match.lastindex])
+        family = re.sub(r"_(bucket|sum|count)$", "", metric)
+        assert types.get(metric) or types.get(family) == "histogram", f"{metric} has no TYPE before its samples"
+        labels = {
+            key: re.sub(r"\\(.)", lambda m: "\n" if m[1] == "n" else m[1], raw)
+            for key, raw in re.findall(label, match[2])
+        }
+        samples.append((metric, labels, value))
+
+    def values(metric, **labels):
+        return [(found, value) for m, found, value in samples if m == metric and labels.items() <= found.items()]
+
+    # Buckets are cumulative, in increasing order and end with +Inf = count
+    buckets = values("admin_backend_duration_seconds_bucket", endpoint=name)
+    bounds = [float(found["le"]) for found, _ in buckets]
+    counts = [value for _, value in buckets]
+    assert bounds == sorted(bounds) and bounds[-1] == math.inf, bounds
+    assert counts == sorted(counts) and counts[0] == 1 and counts[-2] == 5 and counts[-1] == 6, counts
+    [(_, count)] = values("admin_backend_duration_seconds_count", endpoint=name)
+    [(_, total)] = values("admin_backend_duration_seconds_sum", endpoint=name)
+    assert count == 6 and math.isclose(total, 120.452), (count, total)
+
+    statuses = {found["status"]: value for found, value in values("admin_backend_total", endpoint=name)}
+    assert statuses == {"200": 5, "500": 1}, statuses
+    [(_, received)] = values("admin_backend_bytes_total", endpoint=name, direction="received")
+    assert received == 50, received
+
+    # The exported percentiles are the ones the performance panel shows
+    [row] = registry.snapshot("backend")
+    quantiles = {found["quantile"]: value for found, value in values("admin_backend_recent_duration_seconds", endpoint=name)}
+    assert quantiles == {"0.5": row["p50_ms"] / 1000, "0.95": row["p95_ms"] / 1000}, (quantiles, row)
+    assert values("admin_page_duration_seconds_count", page="Files") == [({"page": "Files"}, 1.0)]
+
+def check_replica_failover():
+    """Calls fail over to a second replica, pinned paths stay on one replica,
+    and a replica that comes back is used again after a health check"""
+    import stub_backend
+    from utils import api_client
+
+    def serve(port=0):
+        server = stub_backend.make_server(port=port)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    first, second = serve(), serve()
+    port = first.server_port
+    replicas = api_client.ReplicaPool([f"http://127.0.0.1:{port}", f"http://127.0.0.1:{second.server_port}"])
+    # Health checks are run by hand below
+    replicas.start_health_checks = lambda interval=None: None
+    saved, api_client.pool = api_client.pool, replicas
+
+    def routed(path, calls):
+        before = [r.requests for r in replicas.replicas]
+        for _ in range(calls):
+            response = api_client.get(path)
+            assert response.status_code < 500, (path, response.status_code)
+        return [r.requests - b for r, b in zip(replicas.replicas, before)]
+
+    try:
+        assert routed("/health", 6) == [3, 3], "calls were not spread over both replicas"
+        assert routed("/admin/uploads/unknown", 4) == [4, 0], "an upload session moved between replicas"
+
+        # The first replica goes away; kept-alive connections to it are dropped with it
+        first.shutdown()
+        first.server_close()
+        api_client.get_session().close()
+        assert routed("/health", 4) == [1, 4], "the call to the stopped replica did not fail over"
+        assert not replicas.replicas[0].healthy and replicas.replicas[0].failures == 1, replicas.status()
+        assert routed("/admin/uploads/unknown", 3) == [0, 3], "pinned calls did not move to the healthy replica"
+
+        # Back on the same port, it is used again once a health check has seen it
+        first = serve(port)
+        assert routed("/health", 2) == [0, 2], "an unhealthy replica got calls before its health check"
+        replicas.check_health()
+        assert replicas.replicas[0].healthy, replicas.status()
+        assert routed("/health", 6) == [3, 3], "the recovered replica is not used again"
+        assert routed("/admin/uploads/unknown", 2) == [2, 0], "pinned calls did not return to the first replica"
+    finally:
+        api_client.pool = saved
+        api_client.get_session().close()
+        for server in (first, second):
+            server.shutdown()
+            server.server_close()
+
+def check_chunked_upload_resume():
+    """A failed chunked upload resumes with only the parts the server has not acknowledged"""
+    from utils import perf
+    from utils.file_manager import save_uploaded_file_chunked, download_file_to_disk
+
+    content = os.urandom(10 * 1024)
+    uploaded_file = io.BytesIO(content)
+    uploaded_file.name, uploaded_file.type = "chunked.bin", "application/octet-stream"
+
+    def part_requests():
+        return sum(r["count"] for r in perf.registry.snapshot() if r["name"].startswith("PUT /admin/uploads"))
+
+    # The server rejects parts 5-6 and drops the connection on parts 7-9
+    handler = stub.RequestHandlerClass
+    put_part = handler.put_part
+    def put_first_half(self, upload_id, part):
+        if int(part) >= 7:
+            self.close_connection = True
+            return
+        if int(part) >= 5:
+            return self.send_json(400, {"detail": "Part rejected", "size": len(self.body)})
+        put_part(self, upload_id, part)
+
+    handler.put_part = put_first_half
+    try:
+        file_id, metadata = save_uploaded_file_chunked(uploaded_file, username="admin", part_size=1024, dedup=False)
+    finally:
+        handler.put_part = put_part
+    assert file_id is None and "5 parts failed" in metadata["error"], metadata
+
+    sent = part_requests()
+    file_id, metadata = save_uploaded_file_chunked(uploaded_file, username="admin", part_size=1024, dedup=False)
+    assert file_id, metadata
+    assert part_requests() - sent == 5, f"resume sent {part_requests() - sent} parts instead of the 5 missing"
+
+    path, file_name = download_file_to_disk(file_id)
+    assert path and open(path, "rb").read() == content, file_name
+    os.remove(path)
+
+def check_linked_file_not_reindexed():
+    """Re-uploaded indexed content is linked, never indexed again, and keeps its original"""
+    from utils import perf
+    from utils.file_manager import (upload_files_concurrently, list_files, delete_files,
+                                    remove_files_from_vector_db, add_file_to_vector_db)
+
+    def upload(name):
+        uploaded_file = io.BytesIO(b"linked content\n" * 100)
+        uploaded_file.name, uploaded_file.type = name, "text/plain"
+        [result] = upload_files_concurrently([uploaded_file], in_vector_db=True, username="admin")
+        assert result["status"], result
+        return result["file_id"]
+
+    def requests_to(*names):
+        return sum(r["count"] for r in perf.registry.snapshot() if r["name"] in names)
+
+    def index_requests():
+        return requests_to("POST /admin/add_files_to_vdb", "POST /admin/add_file_to_vdb")
+
+    original = upload("original.txt")
+    indexed = index_requests()
+    linked = upload("copy.txt")
+
+    # Servers without /admin/link_file get the content uploaded again as a new file
+    routes = stub.RequestHandlerClass.routes
+    stub.RequestHandlerClass.routes = [route for route in routes if route[2] != "link_file"]
+    try:
+        copy = upload("copy2.txt")
+    finally:
+        stub.RequestHandlerClass.routes = routes
+    assert copy not in (original, linked), "the upload was answered with another file's ID"
+    assert index_requests() == indexed, "a duplicate file was sent for indexing again"
+
+    files_index = list_files()
+    assert files_index[copy]["original_filename"] == "copy2.txt"
+    result = add_file_to_vector_db(linked, files_index[linked])
+    assert result.get("skipped") and index_requests() == indexed, result
+
+    # The original's chunks serve the copies, so it is kept until they are gone,
+    # and checking that does not download the whole files index again
+    listings = requests_to("GET /admin/list_files")
+    assert not remove_files_from_vector_db({original: files_index[original]})[original]["status"]
+    assert not delete_files({original: files_index[original]})[original]["status"]
+    assert delete_files({linked: files_index[linked], copy: files_index[copy]})[linked]["status"]
+    assert delete_files({original: files_index[original]})[original]["status"]
+    assert requests_to("GET /admin/list_files") == listings, "a vector DB action fetched the whole files index"
+
+def check_reconcile_dedup():
+    """Reconciliation re-indexes content once and leaves copies served by another file alone"""
+    from utils.vdb_reconcile import diff
+
+    files_index = {
+        "original": {"in_vector_db": True, "sha256": "a"},
+        "linked": {"in_vector_db": True, "sha256": "a"},
+        "lost": {"in_vector_db": True, "sha256": "b"},
+        "lost_copy": {"in_vector_db": True, "sha256": "b"},
+        "unhashed": {"in_vector_db": True},
+        "unflagged": {"in_vector_db": False, "sha256": "c"},
+    }
+    drift = diff(files_index, {"original": 3, "unflagged": 2, "deleted": 1})
+    assert drift == {
+        "missing": ["lost", "unhashed"],
+        "covered": ["linked", "lost_copy"],
+        "stale": ["unflagged"],
+        "orphaned": ["deleted"],
+    }, drift
+
+def check_testset_stream_status():
+    """A testset is done only after the server's done event, not when the stream stops"""
+    import time
+    from utils.rag_evaluator import start_testset_job, watch_testset_job, cancel_testset_job
+
+    def finish(job_id, timeout=10):
+        watch = watch_testset_job(job_id)
+        deadline = time.monotonic() + timeout
+        while watch["status"] == "running" and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return watch
+
+    watch = finish(start_testset_job(5)["job_id"])
+    assert watch["status"] == "done" and len(watch["rows"]) == 5, watch
+
+    job_id = start_testset_job(200)["job_id"]
+    watch = watch_testset_job(job_id)
+    while not watch["rows"]:
+        time.sleep(0.05)
+    cancel_testset_job(job_id)
+    watch = finish(job_id)
+    assert watch["status"] == "cancelled" and len(watch["rows"]) < 200, (watch["status"], len(watch["rows"]))
+
+    # The connection closes after two rows every time, without a done event
+    handler = stub.RequestHandlerClass
+    stream = handler.stream_testset_job
+    def cut_short(self, job_id):
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        offset = int(self.query.get("offset", 0))
+        for i in range(offset, min(offset + 2, 5)):
+            self.send_chunk(json.dumps({"question": f"q {i}"}).encode() + b"\n")
+        self.send_chunk(b"")
+
+    handler.stream_testset_job = cut_short
+    try:
+        watch = finish(start_testset_job(5)["job_id"])
+    finally:
+        handler.stream_testset_job = stream
+    assert watch["status"] == "failed" and len(watch["rows"]) == 5, watch
+
+def check_download_resume():
+    """A resume answered with the wrong byte range restarts, file names cannot leave the download dir
+    and partial downloads that cannot or were not resumed are deleted"""
+    import os
+    import tempfile
+    import time
+    from pathlib import Path
+    from utils.file_manager import upload_files_concurrently, download_file_to_disk, DOWNLOAD_PART_TTL
+
+    content = b"0123456789" * 10000
+    uploaded_file = io.BytesIO(content)
+    uploaded_file.name, uploaded_file.type = "../../escape.txt", "text/plain"
+    [result] = upload_files_concurrently([uploaded_file], in_vector_db=False, username="admin")
+    file_id = result["file_id"]
+
+    # The server ignores the Range offset and sends the file from its first byte
+    handler = stub.RequestHandlerClass
+    download = handler.download_file
+    def download_from_start(self):
+        if self.headers.get("Range"):
+            self.headers.replace_header("Range", "bytes=0-")
+        download(self)
+
+    dest_dir = Path(tempfile.mkdtemp())
+    (dest_dir / f"{file_id}.part").write_bytes(content[:3000])
+    handler.download_file = download_from_start
+    try:
+        path, file_name = download_file_to_disk(file_id, dest_dir)
+    finally:
+        handler.download_file = download
+    assert path, file_name
+    assert Path(path).parent == dest_dir and "/" not in file_name, (path, file_name)
+    assert Path(path).read_bytes() == content, "resumed download does not match the file"
+
+    # A deleted file cannot be resumed, and an abandoned download expires
+    (dest_dir / "deleted.part").write_bytes(content[:3000])
+    abandoned = dest_dir / "abandoned.part"
+    abandoned.write_bytes(content[:3000])
+    os.utime(abandoned, (time.time() - 2 * DOWNLOAD_PART_TTL,) * 2)
+    path, error = download_file_to_disk("deleted", dest_dir)
+    assert path is None, path
+    assert not list(dest_dir.glob("*.part")), list(dest_dir.glob("*.part"))
+
+def check_limiter_latency_trend():
+    """Payload-dependent latency is not overload; sustained growth is"""
+    from utils.limiter import LatencyTrend
+
+    trend = LatencyTrend()
+    slow = [trend.add(0.06 if i % 2 else 0.4) for i in range(2000)]
+    assert not any(slow), f"alternating 60/400 ms calls flagged slow {sum(slow)} times"
+
+    trend = LatencyTrend()
+    for _ in range(1000):
+        trend.add(0.1)
+    assert any(trend.add(0.5) for _ in range(20)), "a sustained 5x latency step was not flagged"
+
+# name -> (check, needs a stub backend)
+CHECKS = {
+    "queries": (check_queries, False),
+    "multiline_csv": (check_multiline_csv, False),
+    "retrieval_metrics": (check_retrieval_metrics, False),
+    "metric_aggregates": (check_metric_aggregates, False),
+    "compare_runs": (check_compare_runs, False),
+    "chunked_upload_resume": (check_chunked_upload_resume, True),
+    "linked_file_not_reindexed": (check_linked_file_not_reindexed, True),
+    "reconcile_dedup": (check_reconcile_dedup, False),
+    "testset_stream_status": (check_testset_stream_status, True),
+    "download_resume": (check_download_resume, True),
+    "response_cache": (check_response_cache, True),
+    "limiter_latency_trend": (check_limiter_latency_trend, False),
+    "prometheus_text": (check_prometheus_text, False),
+    "replica_failover": (check_replica_failover, False),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Smoke test the admin API helpers")
+    parser.add_argument("--stub", action="store_true", help="run against an in-process stub backend")
+    parser.add_argument("checks", nargs="*", help=f"checks to run (default: all of {', '.join(CHECKS)})")
+    args = parser.parse_args()
+    unknown = set(args.checks) - set(CHECKS)
+    if unknown:
+        parser.error(f"unknown checks: {', '.join(sorted(unknown))}")
+
+    # The API client reads the backend URL when it is imported, so this comes first
+    if args.stub:
+        os.environ["ADMIN_API_URL"] = start_stub()
+
+    failed = 0
+    for name in args.checks or CHECKS:
+        check, needs_stub = CHECKS[name]
+        if needs_stub and not args.stub:
+            print(f"SKIP {name} (needs --stub)")
+            continue
+        try:
+            check()
+            print(f"OK   {name}")
+        except Exception as e:
+            failed += 1
+            print(f"FAIL {name}: {type(e).__name__}: {e}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
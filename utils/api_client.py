@@ -0,0 +1,283 @@
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.retry import Retry
+from utils import perf
+from utils.limiter import limiter, priority_for, LIMITER_ENABLED
+
+# Root URLs of the admin FastAPI replicas (without the "/admin" prefix). ADMIN_API_URLS
+# takes a comma-separated list; ADMIN_API_URL a single server.
+API_BASE_URLS = [
+    url.strip().rstrip("/")
+    for url in os.getenv("ADMIN_API_URLS", os.getenv("ADMIN_API_URL", "http://127.0.0.1:8000")).split(",")
+    if url.strip()
+]
+API_BASE_URL = API_BASE_URLS[0]
+
+# Active health checks of the replicas; any response below 500 counts as alive
+HEALTH_CHECK_PATH = os.getenv("ADMIN_API_HEALTH_PATH", "/health")
+HEALTH_CHECK_INTERVAL = float(os.getenv("ADMIN_API_HEALTH_INTERVAL", "10"))
+HEALTH_CHECK_TIMEOUT = (1, 2)
+
+# Multi-request workflows keep state on the replica that started them, so they
+# always go to the primary: the first healthy replica in configured order
+PINNED_PREFIXES = ("/admin/uploads", "/admin/testset_jobs", "/download")
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (3.05, 30)
+ENDPOINT_TIMEOUTS = {
+    "/admin/upload_file": (3.05, 300),
+    "/admin/download_file": (3.05, 300),
+    "/admin/add_file_to_vdb": (3.05, 300),
+    "/admin/remove_file_from_vdb": (3.05, 120),
+    "/admin/add_files_to_vdb": (3.05, 900),
+    "/admin/remove_files_from_vdb": (3.05, 300),
+    "/admin/get_queries_response": (3.05, 600),
+    "/admin/create_testset_using_ragas": (3.05, 1800),
+    # Prefix entries (ending with "/") apply to every path below them
+    "/admin/uploads/": (3.05, 120),
+    # Streaming endpoints: the read timeout applies between received chunks
+    "/admin/testset_jobs/": (3.05, 300),
+}
+
+# Retry / pooling settings
+MAX_RETRIES = int(os.getenv("ADMIN_API_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("ADMIN_API_BACKOFF", "0.3"))
+POOL_SIZE = int(os.getenv("ADMIN_API_POOL_SIZE", "20"))
+RETRY_STATUSES = (502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+def _build_session():
+    """Create a keep-alive session with a bounded retry policy"""
+    # Read errors and retryable statuses are retried only for idempotent methods,
+    # so POSTs are never replayed once the server has seen them. Connection
+    # errors are not retried here: _send() moves them to the next replica at once
+    # and backs off only after every replica has failed.
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=0,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def get_session():
+    """Return the process-wide pooled session"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+class Replica:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.last_error = None
+
+class ReplicaPool:
+    """Healthy replicas with least-outstanding-requests routing.
+
+    A replica is taken out of rotation when a request to it cannot connect and
+    put back by the next successful health check. When no replica is healthy,
+    all of them are tried rather than failing outright.
+    """
+
+    def __init__(self, base_urls):
+        self.replicas = [Replica(url) for url in base_urls]
+        self._lock = threading.Lock()
+        self._next = 0
+        self._health_thread = None
+
+    def _candidates(self, path, exclude=()):
+        replicas = [r for r in self.replicas if r not in exclude] or self.replicas
+        healthy = [r for r in replicas if r.healthy] or replicas
+        if path.startswith(PINNED_PREFIXES):
+            return healthy[:1]
+
+        fewest = min(r.outstanding for r in healthy)
+        return [r for r in healthy if r.outstanding == fewest]
+
+    def acquire(self, path, exclude=()):
+        """Pick a replica for a request and count it as outstanding until release()"""
+        with self._lock:
+            candidates = self._candidates(path, exclude)
+            # Rotate between equally loaded replicas
+            replica = candidates[self._next % len(candidates)]
+            self._next += 1
+            replica.outstanding += 1
+            return replica
+
+    def release(self, replica, error=None):
+        with self._lock:
+            replica.outstanding -= 1
+            replica.requests += 1
+            if error is not None:
+                replica.failures += 1
+                replica.last_error = error
+                # With a single replica there is nothing to route around
+                if len(self.replicas) > 1:
+                    replica.healthy = False
+
+    def base_url(self, path):
+        """Replica for a link opened outside this client (e.g. by the browser)"""
+        with self._lock:
+            return self._candidates(path)[0].base_url
+
+    def check_health(self):
+        session = requests.Session()
+        for replica in self.replicas:
+            try:
+                response = session.get(f"{replica.base_url}{HEALTH_CHECK_PATH}", timeout=HEALTH_CHECK_TIMEOUT)
+                healthy, error = response.status_code < 500, f"Health check: {response.status_code}"
+            except requests.RequestException as e:
+                healthy, error = False, f"Health check: {type(e).__name__}"
+            with self._lock:
+                replica.healthy = healthy
+                if not healthy:
+                    replica.last_error = error
+        session.close()
+
+    def start_health_checks(self, interval=HEALTH_CHECK_INTERVAL):
+        """Check every replica periodically in a daemon thread (once per process)"""
+        with self._lock:
+            if self._health_thread is not None or len(self.replicas) < 2:
+                return
+            self._health_thread = threading.Thread(
+                target=self._health_loop, args=(interval,), daemon=True, name="api-health"
+            )
+        self._health_thread.start()
+
+    def _health_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            self.check_health()
+
+    def status(self):
+        with self._lock:
+            return [
+                {"replica": r.base_url, "healthy": r.healthy, "outstanding": r.outstanding,
+                 "requests": r.requests, "failures": r.failures, "last_error": r.last_error}
+                for r in self.replicas
+            ]
+
+pool = ReplicaPool(API_BASE_URLS)
+
+def url_for(path):
+    """Build an absolute URL for a backend path such as '/admin/list_files'"""
+    return f"{pool.base_url('/' + path.lstrip('/'))}/{path.lstrip('/')}"
+
+def timeout_for(path):
+    """Return the (connect, read) timeout configured for a backend path"""
+    path = "/" + path.lstrip("/").split("?")[0]
+    if path in ENDPOINT_TIMEOUTS:
+        return ENDPOINT_TIMEOUTS[path]
+
+    prefixes = [p for p in ENDPOINT_TIMEOUTS if p.endswith("/") and path.startswith(p)]
+    if prefixes:
+        return ENDPOINT_TIMEOUTS[max(prefixes, key=len)]
+    return DEFAULT_TIMEOUT
+
+def _not_sent(error):
+    """True when a connection error happened before the request reached the server"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+def request(method, path, timeout=None, priority=None, **kwargs):
+    """Send a request to the admin API through the pooled session.
+
+    The call first waits for a slot of the adaptive concurrency limiter in its
+    priority class (see utils/limiter.py), then goes to the healthy replica with
+    the fewest outstanding requests. If it cannot connect, the next replica is
+    tried. Every call is recorded in the perf registry. For streamed responses
+    the duration, the limiter slot and the outstanding count cover the time
+    until the headers arrived.
+    """
+    path = "/" + path.lstrip("/")
+    if timeout is None:
+        timeout = timeout_for(path)
+    pool.start_health_checks()
+
+    name = perf.endpoint_name(method, path)
+    priority = priority or priority_for(path)
+    if not LIMITER_ENABLED:
+        return _send(method, path, name, timeout, kwargs)
+
+    limiter.acquire(priority)
+    start = time.perf_counter()
+    overloaded = True
+    try:
+        response = _send(method, path, name, timeout, kwargs)
+        overloaded = response.status_code >= 500 or response.status_code == 429
+        return response
+    finally:
+        limiter.release(priority, name, time.perf_counter() - start, overloaded=overloaded)
+
+def _send(method, path, name, timeout, kwargs):
+    sent = perf.body_size(kwargs)
+    start = time.perf_counter()
+    tried = []
+    attempts = 0
+    while True:
+        replica = pool.acquire(path, exclude=tried)
+        try:
+            response = get_session().request(method, f"{replica.base_url}{path}", timeout=timeout, **kwargs)
+        except requests.RequestException as e:
+            connection_failed = isinstance(e, requests.ConnectionError)
+            pool.release(replica, error=type(e).__name__ if connection_failed else None)
+            tried.append(replica)
+            attempts += 1
+            # Retry only if the request never reached the replica, so nothing is sent twice:
+            # on the next replica at once, then all of them again after a backoff
+            if connection_failed and _not_sent(e) and attempts <= MAX_RETRIES * len(pool.replicas):
+                if len(tried) == len(pool.replicas):
+                    time.sleep(BACKOFF_FACTOR * 2 ** (attempts // len(pool.replicas) - 1))
+                    tried = []
+                continue
+            perf.registry.observe("backend", name, time.perf_counter() - start, type(e).__name__,
+                                  error=True, request_bytes=sent)
+            raise
+        pool.release(replica)
+        break
+
+    if kwargs.get("stream"):
+        received = int(response.headers.get("Content-Length") or 0)
+    else:
+        received = len(response.content)
+    perf.registry.observe(
+        "backend", name, time.perf_counter() - start, response.status_code,
+        error=response.status_code >= 500, request_bytes=sent, response_bytes=received,
+    )
+    return response
+
+def get(path, **kwargs):
+    return request("GET", path, **kwargs)
+
+def post(path, **kwargs):
+    return request("POST", path, **kwargs)
+
+def put(path, **kwargs):
+    return request("PUT", path, **kwargs)
+
+def delete(path, **kwargs):
+    return request("DELETE", path, **kwargs)
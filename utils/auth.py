@@ -5,16 +5,26 @@ import hashlib
 import secrets
 import string
 from pathlib import Path
-import requests
+from utils import api_client
 
 def check_login(username, password):
-    API_URL = "http://127.0.0.1:8000/admin/check_login"
-    response = requests.get(API_URL, params={"username": username, "password": password})
+    response = api_client.get("/admin/check_login", params={"username": username, "password": password})
     return response
 
 def create_user(username, password, created_by):
-    API_URL = "http://127.0.0.1:8000/admin/create_user"
-    response = requests.post(API_URL, params={"username": username, "password": password, "created_by": created_by})
+    response = api_client.post("/admin/create_user", params={"username": username, "password": password, "created_by": created_by})
     
     data = response.json()
-    return data["success"], data["message"]
\ No newline at end of file
+    return data["success"], data["message"]
+
+def get_users():
+    response = api_client.get("/admin/get_users")
+    return response.json()
+
+def verify_password(username, password):
+    response = api_client.get("/admin/verify_password", params={"username": username, "pass_input": password})
+    return response.json()["verified"]
+
+def change_password(username, new_password):
+    response = api_client.put("/admin/change_password", params={"username": username, "new_password": new_password})
+    return response
@@ -0,0 +1,58 @@
+import os
+import threading
+import time
+
+# Seconds a cached listing is served without asking the source again
+LISTING_CACHE_TTL = float(os.getenv("LISTING_CACHE_TTL", "30"))
+
+class CacheEntry:
+    def __init__(self, value, validator, expires_at):
+        self.value = value
+        self.validator = validator
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self):
+        return time.monotonic() < self.expires_at
+
+class ListingCache:
+    """Thread-safe TTL cache whose entries carry a validator (ETag, mtime or version).
+
+    Fresh entries are returned as-is. Expired entries are kept so the caller can
+    revalidate them cheaply with their validator and extend them with touch().
+    Cached values are shared between sessions and must be treated as read-only.
+    """
+
+    def __init__(self, ttl=LISTING_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self):
+        """Counter bumped by every invalidation; pass it to set() to drop stale fetches"""
+        return self._generation
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key, value, validator=None, generation=None):
+        """Store a value unless the cache was invalidated since `generation` was read"""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = CacheEntry(value, validator, time.monotonic() + self.ttl)
+
+    def touch(self, key):
+        """Mark an entry fresh again after a successful revalidation"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
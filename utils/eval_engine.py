@@ -0,0 +1,384 @@
+import ast
+import csv
+import math
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from utils.metrics import relevance_matrix, retrieval_metrics, bootstrap_ci, mean_metrics
+
+# Queries sent per /admin/get_queries_response request, and requests in flight
+EVAL_BATCH_SIZE = int(os.getenv("EVAL_BATCH_SIZE", "8"))
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "4"))
+
+# Bytes of a query file parsed at a time when it is streamed
+QUERY_FILE_BLOCK_SIZE = int(os.getenv("QUERY_FILE_BLOCK_SIZE", str(1 << 20)))
+
+# Metric names offered by the evaluation form -> summary keys
+METRIC_NAMES = {
+    "Precision": "precision",
+    "Recall": "recall",
+    "F1": "f1_score",
+    "MRR": "mrr",
+    "NDCG": "ndcg",
+    "Latency": "latency_ms",
+}
+
+# Per-query metrics compared between two runs; a lower latency is better
+COMPARE_METRICS = ["precision", "recall", "f1_score", "mrr", "ndcg", "score", "latency_ms"]
+LOWER_IS_BETTER = {"latency_ms"}
+
+# Per-query changes at least this much worse count as a regressed query
+REGRESSION_MIN_DELTA = float(os.getenv("REGRESSION_MIN_DELTA", "0.1"))
+REGRESSION_MIN_LATENCY_MS = float(os.getenv("REGRESSION_MIN_LATENCY_MS", "500"))
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def normalize_query_rows(query_set):
+    """Turn plain query strings or testset rows into dicts with a stable row_id"""
+    for row_id, item in enumerate(query_set):
+        row = {"question": item} if isinstance(item, str) else dict(item)
+        yield {
+            "row_id": row_id,
+            "question": str(row.get("question", "")).strip(),
+            "reference": _clean(row.get("reference")),
+            "reference_contexts": parse_contexts(row.get("retrieved_context")),
+        }
+
+def read_query_file(file, is_csv, block_size=QUERY_FILE_BLOCK_SIZE):
+    """Yield the queries of an uploaded query file without loading it whole.
+
+    CSV files are parsed block by block with pyarrow's streaming reader. With a
+    "question" column every row is yielded as a testset dict, otherwise the
+    first column as plain query strings. Text files yield one query per line.
+    """
+    if not is_csv:
+        for line in file:
+            query = line.decode("utf-8").strip()
+            if query:
+                yield query
+        return
+
+    # Read every column as text: types inferred from the first block may not fit later ones.
+    # Quoted cells may span lines (multi-line testset references).
+    header = next(csv.reader([file.readline().decode("utf-8-sig")]), [])
+    file.seek(0)
+    if not header:
+        return
+    reader = pa_csv.open_csv(
+        file,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(column_types={name: pa.string() for name in header}),
+    )
+    for batch in reader:
+        if "question" in header:
+            yield from batch.to_pylist()
+        else:
+            yield from (query for query in batch.column(0).to_pylist() if query and query.strip())
+
+def _clean(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+def parse_contexts(value):
+    """Parse a testset context cell (list, list literal or plain text) into strings"""
+    if isinstance(value, (list, tuple)):
+        return [_source_text(v) for v in value if _source_text(v)]
+
+    value = _clean(value).strip()
+    if not value:
+        return []
+    if value.startswith("["):
+        try:
+            return parse_contexts(ast.literal_eval(value))
+        except (ValueError, SyntaxError):
+            pass
+    return [value]
+
+def _source_text(source):
+    """Text of a retrieved source, which the backend may send as a string or a document dict"""
+    if isinstance(source, dict):
+        return str(source.get("page_content") or source.get("content") or source.get("text") or "")
+    return _clean(source)
+
+def _tokens(text):
+    return _TOKEN_RE.findall(text.lower())
+
+def token_f1(prediction, reference):
+    """Bag-of-words F1 overlap between two texts"""
+    pred, ref = _tokens(prediction), _tokens(reference)
+    if not pred or not ref:
+        return 0.0
+
+    ref_counts = {}
+    for token in ref:
+        ref_counts[token] = ref_counts.get(token, 0) + 1
+    common = 0
+    for token in pred:
+        if ref_counts.get(token, 0) > 0:
+            ref_counts[token] -= 1
+            common += 1
+
+    if common == 0:
+        return 0.0
+    precision, recall = common / len(pred), common / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+def score_row(row, response, top_k, relevance_threshold, latency_ms):
+    """Judge one query's response against its testset reference and contexts.
+
+    A retrieved source counts as relevant when its token overlap with any reference
+    context reaches relevance_threshold. Only the first top_k sources are judged.
+    """
+    sources = response.get("sources") or []
+    if not isinstance(sources, list):
+        sources = [sources]
+    sources = [_source_text(s) for s in sources][:top_k]
+    contexts = row["reference_contexts"]
+
+    # overlap[i][j]: retrieved source i vs reference context j
+    overlap = [[token_f1(source, context) for context in contexts] for source in sources]
+    relevance = [int(any(score >= relevance_threshold for score in scores)) for scores in overlap]
+    references_found = sum(
+        1 for j in range(len(contexts)) if any(overlap[i][j] >= relevance_threshold for i in range(len(sources)))
+    )
+
+    answer = _clean(response.get("answer"))
+    return {
+        "row_id": row["row_id"],
+        "query": row["question"],
+        "reference": row["reference"],
+        "answer": answer,
+        "sources": sources,
+        "relevance": relevance,
+        "num_relevant": len(contexts),
+        "references_found": references_found,
+        "score": token_f1(answer, row["reference"]) if row["reference"] else None,
+        "latency_ms": latency_ms,
+        "cached": bool(response.get("cached")),
+        "error": None,
+    }
+
+def _failed_row(row, error, latency_ms):
+    return {
+        "row_id": row["row_id"],
+        "query": row["question"],
+        "reference": row["reference"],
+        "answer": "",
+        "sources": [],
+        "relevance": [],
+        "num_relevant": len(row["reference_contexts"]),
+        "references_found": 0,
+        "score": None,
+        "latency_ms": latency_ms,
+        "cached": False,
+        "error": error,
+    }
+
+def _run_batch(batch, query_fn, top_k, relevance_threshold):
+    """Send one batch of queries and score every response.
+
+    Responses carrying "latency_ms" (the backend round trip, see
+    rag_evaluator.get_queries_response) keep it; otherwise the whole call is timed.
+    """
+    start = time.perf_counter()
+    try:
+        responses = query_fn([row["question"] for row in batch])
+        error = None if responses is not None and len(responses) == len(batch) else "No response from server"
+    except Exception as e:
+        responses, error = None, str(e)
+
+    # Every query in the batch waited for the whole round trip
+    latency_ms = (time.perf_counter() - start) * 1000
+
+    if error:
+        return [_failed_row(row, error, latency_ms) for row in batch]
+    return [
+        score_row(row, response, top_k, relevance_threshold, response.get("latency_ms", latency_ms))
+        for row, response in zip(batch, responses)
+    ]
+
+def iter_batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def evaluate_queries(rows, query_fn, top_k=5, relevance_threshold=0.7,
+                     batch_size=EVAL_BATCH_SIZE, max_workers=EVAL_CONCURRENCY, stop=None):
+    """Query and score rows in batches with bounded concurrency.
+
+    rows may be any iterable (it is consumed lazily); scored results are yielded
+    batch by batch in completion order. Once the optional `stop` event is set no
+    new batches are sent, but results of batches already in flight are still yielded.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        in_flight = set()
+        for batch in iter_batches(rows, batch_size):
+            if stop is not None and stop.is_set():
+                break
+            in_flight.add(pool.submit(_run_batch, batch, query_fn, top_k, relevance_threshold))
+
+            # Keep a bounded number of batches queued so memory stays flat
+            if len(in_flight) >= 2 * max_workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            else:
+                # Hand out finished batches right away instead of after the last one is sent
+                done = {future for future in in_flight if future.done()}
+                in_flight -= done
+            for future in done:
+                yield from future.result()
+
+        for future in in_flight:
+            yield from future.result()
+
+def metric_columns(results, top_k):
+    """The fields of scored results that the summary needs, as arrays.
+
+    Relevance lists are packed into an (n_queries, top_k) matrix. Columns of
+    consecutive chunks of results can be concatenated and summarized together.
+    """
+    n = len(results)
+    return {
+        "error": np.fromiter((r["error"] is not None for r in results), dtype=bool, count=n),
+        "num_relevant": np.fromiter((r["num_relevant"] for r in results), dtype=np.int64, count=n),
+        "relevance": relevance_matrix([r["relevance"] for r in results], top_k),
+        "references_found": np.fromiter((r["references_found"] for r in results), dtype=np.float64, count=n),
+        "latency_ms": np.fromiter((r["latency_ms"] for r in results), dtype=np.float64, count=n),
+        "cached": np.fromiter((bool(r.get("cached")) for r in results), dtype=bool, count=n),
+    }
+
+def summarize_columns(columns, metrics):
+    """Aggregate the selected metrics (form names, e.g. "Precision") over metric_columns.
+
+    Returns the summary, with bootstrap confidence intervals for every aggregated
+    metric, and the per-query values of the selected metrics.
+    """
+    selected = [METRIC_NAMES[m] for m in metrics if m in METRIC_NAMES]
+    summary = {}
+
+    errors, num_relevant, cached = columns["error"], columns["num_relevant"], columns["cached"]
+    per_query = retrieval_metrics(
+        columns["relevance"],
+        num_relevant,
+        columns["references_found"],
+        valid=~errors,
+    )
+    per_query = {key: values for key, values in per_query.items() if key in selected}
+    # Cached answers cost this run no backend time, so they are left out of the latency metrics
+    if "latency_ms" in selected and len(errors):
+        latencies = columns["latency_ms"].copy()
+        latencies[cached] = np.nan
+        per_query["latency_ms"] = latencies
+        if not cached.all():
+            summary["latency_p95_ms"] = float(np.nanpercentile(latencies, 95))
+
+    for key, value in mean_metrics(per_query).items():
+        if value is not None:
+            summary[key] = value
+    summary["confidence_intervals"] = {
+        key: list(interval) for key, interval in bootstrap_ci(per_query).items() if key in summary
+    }
+
+    summary["num_scored"] = int((~errors & (num_relevant > 0)).sum())
+    summary["num_errors"] = int(errors.sum())
+    summary["num_cached"] = int(cached.sum())
+    return summary, per_query
+
+def summarize(results, metrics, top_k):
+    """Aggregate the selected metrics (form names, e.g. "Precision") over scored results.
+
+    Each result is also annotated with its own per-query metric values.
+    The summary includes bootstrap confidence intervals for every aggregated metric.
+    """
+    summary, per_query = summarize_columns(metric_columns(results, top_k), metrics)
+    for key, values in per_query.items():
+        # Rows keep the latency that was measured for them, cached or not
+        if key == "latency_ms":
+            continue
+        for result, value in zip(results, values.tolist()):
+            result[key] = None if np.isnan(value) else value
+    return summary
+
+def compare_runs(base, candidate, metrics=COMPARE_METRICS):
+    """Paired per-query comparison of two evaluations, joined on the question.
+
+    base and candidate are DataFrames with a "query" column and one column per
+    metric, and optionally a "cached" column; repeated questions are averaged. Returns (summary, per_query, unmatched).
+    summary has one row per metric with both means, the mean delta and its
+    paired bootstrap confidence interval. A change is significant when the whole
+    interval lies on one side of zero. per_query holds base, candidate and delta
+    of every metric for each shared question, worst regressions first.
+    unmatched counts the questions found in only one of the runs.
+    """
+    def by_question(df):
+        values = df.reindex(columns=metrics).apply(pd.to_numeric, errors="coerce")
+        # The latency of a cached answer is from an earlier run, not this one
+        if "cached" in df:
+            cached = df["cached"].fillna(False).astype(bool).to_numpy()
+            values.loc[cached, [m for m in metrics if m in LOWER_IS_BETTER]] = np.nan
+        return values.groupby(df["query"].astype(str).str.strip(), sort=False).mean().rename_axis("query")
+
+    base, candidate = by_question(base), by_question(candidate)
+    joined = base.join(candidate, how="inner", lsuffix="_base", rsuffix="_candidate")
+
+    before = joined[[f"{m}_base" for m in metrics]].to_numpy(dtype=np.float64)
+    after = joined[[f"{m}_candidate" for m in metrics]].to_numpy(dtype=np.float64)
+    deltas = after - before  # (questions, metrics); NaN where either run lacks the metric
+    # Gains are deltas signed so that positive is always an improvement
+    signs = np.array([-1.0 if m in LOWER_IS_BETTER else 1.0 for m in metrics])
+    gains = deltas * signs
+    thresholds = np.array([REGRESSION_MIN_LATENCY_MS if m in LOWER_IS_BETTER else REGRESSION_MIN_DELTA for m in metrics])
+    regressed = gains <= -thresholds
+
+    intervals = bootstrap_ci({m: gains[:, i] for i, m in enumerate(metrics)})
+    base_means = mean_metrics({m: before[:, i] for i, m in enumerate(metrics)})
+    candidate_means = mean_metrics({m: after[:, i] for i, m in enumerate(metrics)})
+    delta_means = mean_metrics({m: deltas[:, i] for i, m in enumerate(metrics)})
+
+    rows = []
+    for i, m in enumerate(metrics):
+        paired = int((~np.isnan(deltas[:, i])).sum())
+        if not paired:
+            continue
+        low, high = intervals[m]
+        # Back from gains to deltas of the metric itself
+        ci = sorted((low * signs[i], high * signs[i]))
+        rows.append({
+            "metric": m,
+            "base": base_means[m],
+            "candidate": candidate_means[m],
+            "delta": delta_means[m],
+            "ci_low": ci[0],
+            "ci_high": ci[1],
+            "queries": paired,
+            "regressed_queries": int(regressed[:, i].sum()),
+            "significant_regression": bool(high < 0),
+            "significant_improvement": bool(low > 0),
+        })
+    summary = pd.DataFrame(rows, columns=[
+        "metric", "base", "candidate", "delta", "ci_low", "ci_high", "queries",
+        "regressed_queries", "significant_regression", "significant_improvement",
+    ])
+
+    per_query = joined.copy()
+    for i, m in enumerate(metrics):
+        per_query[f"{m}_delta"] = deltas[:, i]
+    per_query["regressed_metrics"] = regressed.sum(axis=1)
+    # Worst first: most regressed metrics, then the largest total loss
+    per_query["_loss"] = np.nansum(np.minimum(gains / thresholds, 0), axis=1)
+    per_query = per_query.sort_values(["regressed_metrics", "_loss"], ascending=[False, True]).drop(columns="_loss")
+    per_query = per_query.dropna(axis=1, how="all")
+
+    unmatched = {"base": len(base) - len(joined), "candidate": len(candidate) - len(joined)}
+    return summary, per_query.reset_index(), unmatched
@@ -0,0 +1,208 @@
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from datetime import datetime
+from pathlib import Path
+from utils import eval_engine
+from utils.rag_evaluator import get_queries_response, finalize_evaluation
+
+# Each job keeps job.json (state), input.jsonl (queries) and checkpoint.jsonl (scored results)
+JOBS_DIR = Path(__file__).parent.parent / "data" / "eval_jobs"
+
+# Evaluations that may run at the same time in this process
+EVAL_JOB_WORKERS = int(os.getenv("EVAL_JOB_WORKERS", "2"))
+
+# Minimum seconds between progress writes to job.json
+PROGRESS_INTERVAL = 1.0
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Ensure directories exist
+os.makedirs(JOBS_DIR, exist_ok=True)
+
+_executor = ThreadPoolExecutor(max_workers=EVAL_JOB_WORKERS, thread_name_prefix="eval-job")
+_jobs_lock = threading.Lock()
+_running = {}  # job_id -> cancel Event, for jobs owned by this process
+_sources = {}  # job_id -> rows not yet read from the submitted query set
+
+def _job_dir(job_id):
+    return JOBS_DIR / job_id
+
+def _read_state(job_id):
+    with open(_job_dir(job_id) / "job.json", 'r') as f:
+        return json.load(f)
+
+def _write_state(job_id, state):
+    state["updated"] = str(datetime.now())
+    tmp_path = _job_dir(job_id) / "job.json.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=4)
+    os.replace(tmp_path, _job_dir(job_id) / "job.json")
+
+def _iter_jsonl(path):
+    if not os.path.exists(path):
+        return
+    with open(path, 'r') as f:
+        for line in f:
+            # A crash can leave a half-written last line; that query is simply sent again
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                return
+
+def _truncate_partial_line(path):
+    """Drop a half-written last line so new results are appended on a clean line"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+def submit_evaluation_job(query_set, parameters):
+    """Start an evaluation in a background worker and return its job ID.
+
+    query_set may be any iterable, such as a query file being read by
+    eval_engine.read_query_file. The worker copies rows to input.jsonl as it
+    sends them, so the first results arrive before the whole set is read.
+    """
+    job_id = f"job_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    os.makedirs(_job_dir(job_id))
+    open(_job_dir(job_id) / "input.jsonl", 'w').close()
+
+    _write_state(job_id, {
+        "job_id": job_id,
+        "name": parameters.get("name", job_id),
+        "parameters": parameters,
+        "status": "queued",
+        "total": 0,
+        "reading_input": True,
+        "done": 0,
+        "eval_id": None,
+        "error": None,
+        "created": str(datetime.now()),
+    })
+    with _jobs_lock:
+        _sources[job_id] = eval_engine.normalize_query_rows(query_set)
+    _start(job_id)
+    return job_id
+
+def _read_input(job_id, source, state):
+    """Copy rows from the submitted query set to input.jsonl while passing them on"""
+    with open(_job_dir(job_id) / "input.jsonl", 'a') as f:
+        for row in source:
+            f.write(json.dumps(row) + "\n")
+            state["total"] += 1
+            yield row
+    state["reading_input"] = False
+
+def _start(job_id):
+    with _jobs_lock:
+        if job_id in _running:
+            return
+        _running[job_id] = threading.Event()
+    _executor.submit(_run_job, job_id)
+
+def resume_job(job_id):
+    """Continue an interrupted, cancelled or failed job from its last checkpoint"""
+    state = get_job(job_id)
+    if state is None or state["status"] in ACTIVE_STATUSES or state["status"] == "completed":
+        return False
+    state["status"], state["error"] = "queued", None
+    _write_state(job_id, state)
+    _start(job_id)
+    return True
+
+def cancel_job(job_id):
+    """Ask a running job to stop sending queries; it can be resumed later"""
+    with _jobs_lock:
+        cancel = _running.get(job_id)
+    if cancel is None:
+        return False
+    cancel.set()
+    return True
+
+def _run_job(job_id):
+    cancel = _running[job_id]
+    state = _read_state(job_id)
+    reading = None
+    try:
+        state["status"] = "running"
+        _write_state(job_id, state)
+
+        parameters = state["parameters"]
+        checkpoint_path = _job_dir(job_id) / "checkpoint.jsonl"
+        input_path = _job_dir(job_id) / "input.jsonl"
+        _truncate_partial_line(checkpoint_path)
+        _truncate_partial_line(input_path)
+        done_ids = {r["row_id"] for r in _iter_jsonl(checkpoint_path)}
+        state["done"] = len(done_ids)
+        state["total"] = sum(1 for _ in _iter_jsonl(input_path))
+
+        # Only queries without a checkpointed result are sent to the backend again,
+        # followed by the rest of the query set if it was not read to the end yet
+        pending = (r for r in _iter_jsonl(input_path) if r["row_id"] not in done_ids)
+        if state.get("reading_input"):
+            with _jobs_lock:
+                source = _sources.get(job_id)
+            if source is None:
+                raise RuntimeError("The query file was not read to the end before the server stopped; submit it again")
+            reading = _read_input(job_id, source, state)
+            pending = itertools.chain(pending, reading)
+        results = eval_engine.evaluate_queries(
+            pending,
+            partial(get_queries_response, use_cache=parameters.get("use_cache", True)),
+            top_k=int(parameters.get("top_k", 5)),
+            relevance_threshold=parameters.get("relevance_threshold", 0.7),
+            stop=cancel,
+        )
+
+        last_write = time.monotonic()
+        with open(checkpoint_path, 'a') as checkpoint:
+            for result in results:
+                checkpoint.write(json.dumps(result) + "\n")
+                checkpoint.flush()
+                state["done"] += 1
+
+                if time.monotonic() - last_write >= PROGRESS_INTERVAL:
+                    _write_state(job_id, state)
+                    last_write = time.monotonic()
+
+        # Batches already sent when the job was cancelled are still checkpointed
+        if cancel.is_set() and (state["done"] < state["total"] or state.get("reading_input")):
+            state["status"] = "cancelled"
+        else:
+            eval_id, _ = finalize_evaluation(checkpoint_path, parameters)
+            state["status"], state["eval_id"] = "completed", eval_id
+    except Exception as e:
+        state["status"], state["error"] = "failed", str(e)
+    finally:
+        if reading is not None:
+            reading.close()  # flushes input.jsonl before the job can be resumed
+        _write_state(job_id, state)
+        with _jobs_lock:
+            _running.pop(job_id, None)
+            # A cancelled job keeps the unread rest of its query set for resume_job
+            if state["status"] != "cancelled" or not state.get("reading_input"):
+                _sources.pop(job_id, None)
+
+def get_job(job_id):
+    """Current state of a job; active jobs not owned by this process are reported as interrupted"""
+    if not os.path.exists(_job_dir(job_id) / "job.json"):
+        return None
+    state = _read_state(job_id)
+    with _jobs_lock:
+        owned = job_id in _running
+    if state["status"] in ACTIVE_STATUSES and not owned:
+        state["status"] = "interrupted"
+    return state
+
+def list_jobs(limit=20):
+    """Most recent jobs first"""
+    job_ids = sorted((p.name for p in JOBS_DIR.iterdir() if p.is_dir()), reverse=True)[:limit]
+    return [state for state in (get_job(job_id) for job_id in job_ids) if state is not None]
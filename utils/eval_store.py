@@ -0,0 +1,157 @@
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+# Define constants
+EVAL_DB = Path(__file__).parent.parent / "data" / "evaluations.db"
+EVAL_INDEX = Path(__file__).parent.parent / "data" / "evaluation_index.json"
+
+METRIC_KEYS = ["precision", "recall", "f1_score", "accuracy", "mrr", "ndcg"]
+SORT_COLUMNS = ["timestamp", "name", "num_queries"] + METRIC_KEYS
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+def get_connection():
+    """Return this thread's connection to the evaluation store"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(EVAL_DB.parent, exist_ok=True)
+        conn = sqlite3.connect(EVAL_DB, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+        _ensure_schema(conn)
+    return conn
+
+def _ensure_schema(conn):
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS evaluations (
+                    eval_id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    description TEXT,
+                    timestamp TEXT NOT NULL,
+                    num_queries INTEGER NOT NULL DEFAULT 0,
+                    file_path TEXT,
+                    precision REAL,
+                    recall REAL,
+                    f1_score REAL,
+                    accuracy REAL,
+                    mrr REAL,
+                    ndcg REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_evaluations_timestamp ON evaluations (timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_evaluations_name ON evaluations (name)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', '0')")
+        _migrate_json_index(conn)
+        _schema_ready = True
+
+def _migrate_json_index(conn):
+    """One-time import of the legacy evaluation_index.json"""
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'json_index_migrated'").fetchone():
+        return
+
+    eval_index = {}
+    if os.path.exists(EVAL_INDEX):
+        with open(EVAL_INDEX, 'r') as f:
+            eval_index = json.load(f)
+
+    with conn:
+        for eval_id, info in eval_index.items():
+            _insert(conn, eval_id, info, replace=False)
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('json_index_migrated', '1')")
+        _bump_version(conn)
+
+def _insert(conn, eval_id, info, replace=True):
+    metrics = info.get("metrics", {})
+    conn.execute(
+        f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO evaluations "
+        "(eval_id, name, description, timestamp, num_queries, file_path, "
+        + ", ".join(METRIC_KEYS) + ") VALUES (?, ?, ?, ?, ?, ?, " + ", ".join("?" * len(METRIC_KEYS)) + ")",
+        [eval_id, info.get("name", eval_id), info.get("description"), info["timestamp"],
+         info.get("num_queries", 0), info.get("file_path")] + [metrics.get(k) for k in METRIC_KEYS],
+    )
+
+def _bump_version(conn):
+    conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'")
+
+def _to_entry(row):
+    """Convert a row to the entry format of the old JSON index"""
+    return {
+        "name": row["name"],
+        "description": row["description"],
+        "timestamp": row["timestamp"],
+        "metrics": {k: row[k] for k in METRIC_KEYS if row[k] is not None},
+        "num_queries": row["num_queries"],
+        "file_path": row["file_path"],
+    }
+
+def data_version():
+    """Counter bumped by every write; cheap to read for cache revalidation"""
+    row = get_connection().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    return int(row["value"])
+
+def add_evaluation(eval_id, info):
+    """Insert or replace an evaluation entry (same shape as the old JSON index entries)"""
+    conn = get_connection()
+    with conn:
+        _insert(conn, eval_id, info)
+        _bump_version(conn)
+
+def get_evaluation(eval_id):
+    row = get_connection().execute("SELECT * FROM evaluations WHERE eval_id = ?", (eval_id,)).fetchone()
+    return _to_entry(row) if row else None
+
+def get_evaluations(eval_ids):
+    """Return {eval_id: entry} for many evaluations with one query; unknown IDs are left out"""
+    eval_ids = list(eval_ids)
+    if not eval_ids:
+        return {}
+    rows = get_connection().execute(
+        f"SELECT * FROM evaluations WHERE eval_id IN ({', '.join('?' * len(eval_ids))})", eval_ids
+    ).fetchall()
+    return {row["eval_id"]: _to_entry(row) for row in rows}
+
+def remove_evaluation(eval_id):
+    """Delete an evaluation entry; returns False if it did not exist"""
+    conn = get_connection()
+    with conn:
+        deleted = conn.execute("DELETE FROM evaluations WHERE eval_id = ?", (eval_id,)).rowcount
+        if deleted:
+            _bump_version(conn)
+    return bool(deleted)
+
+def count_evaluations(search=None):
+    sql, params = "SELECT COUNT(*) FROM evaluations", []
+    if search:
+        sql += " WHERE name LIKE ?"
+        params.append(f"%{search}%")
+    return get_connection().execute(sql, params).fetchone()[0]
+
+def query_evaluations(sort_by="timestamp", descending=True, limit=None, offset=0, search=None):
+    """Return {eval_id: entry} for one sorted page of evaluations"""
+    if sort_by not in SORT_COLUMNS:
+        raise ValueError(f"Cannot sort evaluations by '{sort_by}'")
+
+    sql, params = "SELECT * FROM evaluations", []
+    if search:
+        sql += " WHERE name LIKE ?"
+        params.append(f"%{search}%")
+    sql += f" ORDER BY {sort_by} {'DESC' if descending else 'ASC'}, eval_id"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+
+    rows = get_connection().execute(sql, params).fetchall()
+    return {row["eval_id"]: _to_entry(row) for row in rows}
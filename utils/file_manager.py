@@ -5,64 +5,529 @@ import json
 from pathlib import Path
 import uuid
 import datetime
+import base64
+import hashlib
+import tempfile
+import math
+import re
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from functools import partial
+from utils import api_client
+from utils.cache import ListingCache
 
 # Define constants
 FILES_DIR = Path(__file__).parent.parent / "data" / "files"
 FILES_INDEX = Path(__file__).parent.parent / "data" / "files_index.json"
 
+# Bounded concurrency for multi-file uploads and vector DB indexing
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+INDEX_CONCURRENCY = int(os.getenv("INDEX_CONCURRENCY", "2"))
+
+# Number of files shown per page in the files dashboard
+FILES_PAGE_SIZE = int(os.getenv("FILES_PAGE_SIZE", "50"))
+
+# Number of files sent per batch vector DB request
+VDB_BATCH_SIZE = int(os.getenv("VDB_BATCH_SIZE", "20"))
+
+# Batches of a bulk dashboard action (delete, vector DB add/remove) run at the same time
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", "4"))
+
+# Streaming downloads are written here in chunks of DOWNLOAD_CHUNK_SIZE bytes
+DOWNLOAD_DIR = Path(os.getenv("DOWNLOAD_DIR", Path(tempfile.gettempdir()) / "admin_downloads"))
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Interrupted downloads are resumed this many times before giving up
+DOWNLOAD_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", "3"))
+# ".part" files of downloads that were not resumed for this many seconds are deleted
+DOWNLOAD_PART_TTL = int(os.getenv("DOWNLOAD_PART_TTL", str(24 * 3600)))
+
+# Chunked, resumable uploads
+UPLOAD_PART_SIZE = int(os.getenv("UPLOAD_PART_SIZE", str(8 * 1024 * 1024)))
+UPLOAD_PART_CONCURRENCY = int(os.getenv("UPLOAD_PART_CONCURRENCY", "4"))
+UPLOAD_SESSIONS_FILE = Path(__file__).parent.parent / "data" / "upload_sessions.json"
+
+# Link files whose content the server already has instead of uploading them again
+DEDUP_UPLOADS = os.getenv("DEDUP_UPLOADS", "true").lower() == "true"
+_upload_sessions_lock = threading.Lock()
+
+# One download per file ID at a time, since they share the ".part" file
+_download_locks = {}
+_download_locks_lock = threading.Lock()
+
+# Listings are cached until the TTL expires or a write below invalidates them
+_files_cache = ListingCache()
+
 # Ensure directories exist
 os.makedirs(FILES_DIR, exist_ok=True)
 
-def save_uploaded_file(uploaded_file, in_vector_db=False):
-    API_URL = "http://127.0.0.1:8000/admin/upload_file"
-    
+def save_uploaded_file(uploaded_file, in_vector_db=False, username=None, sha256=None, dedup=DEDUP_UPLOADS):
+    # Worker threads have no Streamlit session, so callers there pass the username
+    if username is None:
+        username = st.session_state.username
+
+    # The hash is recorded in the files index; known content is linked, not re-sent
+    if sha256 is None:
+        sha256 = stream_sha256(uploaded_file)
+    match = lookup_file_hashes([sha256]).get(sha256) if dedup else None
+    if match:
+        file_id, metadata = link_file(match["file_id"], uploaded_file.name, username)
+        if not metadata.get("unsupported"):
+            return file_id, metadata
+        # A copy has no chunks of its own
+        in_vector_db = False
+
     # Mengirim file sebagai multipart/form-data
     files = {"uploaded_file": (uploaded_file.name, uploaded_file, uploaded_file.type)}
     data = {
-        "username": st.session_state.username,
+        "username": username,
         "in_vector_db": str(in_vector_db).lower(),  # FastAPI menerima string "true"/"false"
+        "sha256": sha256,
     }
     
-    response = requests.post(API_URL, files=files, data=data)
+    response = api_client.post("/admin/upload_file", files=files, data=data)
+    invalidate_files_cache()
     
+    if response.status_code != 200:
+        return None, {"error": response.text}
+
+    # Content sent again because the server cannot link it still duplicates the match
+    metadata = response.json()["metadata"]
+    return response.json()["file_id"], {**metadata, "duplicate_of": match["file_id"]} if match else metadata
+
+def _lookup_hashes(hashes, all_copies=False):
+    hashes = list(dict.fromkeys(h for h in hashes if h))
+    if not hashes:
+        return {}
+
+    response = api_client.post("/admin/files/lookup_hashes", json={"sha256": hashes, "all": all_copies})
+    if response.status_code != 200:
+        return {}
+    return response.json().get("copies" if all_copies else "matches", {})
+
+def lookup_file_hashes(hashes):
+    """Find files whose content is already on the server.
+
+    POST /admin/files/lookup_hashes {"sha256": [...]} -> {"matches": {sha256: {"file_id", "metadata"}}}
+    Returns {sha256: {"file_id", "metadata"}} for known hashes, preferring a copy
+    that is in the vector DB. Servers without the endpoint match nothing, so
+    uploads are not deduplicated there.
+    """
+    return _lookup_hashes(hashes)
+
+def file_copies(hashes):
+    """Every file with one of the given hashes.
+
+    POST /admin/files/lookup_hashes {"sha256": [...], "all": true}
+      -> {"copies": {sha256: {file_id: metadata}}}
+    Only the files involved are looked up, never the whole files index.
+    """
+    return _lookup_hashes(hashes, all_copies=True)
+
+def link_file(file_id, filename, username):
+    """Register an upload whose content is identical to an existing file.
+
+    POST /admin/link_file creates an index entry sharing the stored content; its
+    metadata carries "duplicate_of" with the existing file ID and "linked". Servers without
+    the endpoint return (None, {"error", "unsupported": True}) and callers upload
+    the content as a new file instead.
+    """
+    response = api_client.post("/admin/link_file", json={"file_id": file_id, "filename": filename, "username": username})
+    invalidate_files_cache()
+
     if response.status_code == 200:
-        return response.json()["file_id"], response.json()["metadata"]
-    else:
+        return response.json()["file_id"], {**response.json()["metadata"], "duplicate_of": file_id, "linked": True}
+    if response.status_code in (404, 405):
+        return None, {"error": "Server cannot link duplicate files", "unsupported": True}
+    return None, {"error": response.text}
+
+def find_duplicate_files(files_index=None):
+    """Group files with identical content using the hashes recorded in the files index.
+
+    Returns (groups, unhashed): groups is a list of [(file_id, metadata), ...] with
+    at least two files each, largest wasted size first; unhashed counts files
+    uploaded before hashes were recorded.
+    """
+    if files_index is None:
+        files_index = list_files()
+
+    by_hash, unhashed = {}, 0
+    for file_id, info in files_index.items():
+        if info.get("sha256"):
+            by_hash.setdefault(info["sha256"], []).append((file_id, info))
+        else:
+            unhashed += 1
+
+    groups = [files for files in by_hash.values() if len(files) > 1]
+    groups.sort(key=lambda files: files[0][1].get("file_size_bytes", 0) * (len(files) - 1), reverse=True)
+    return groups, unhashed
+
+def stream_sha256(fileobj, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """SHA-256 of a file-like object, read in chunks and rewound afterwards"""
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+def _file_size(fileobj):
+    size = getattr(fileobj, "size", None)
+    if size is None:
+        size = fileobj.seek(0, os.SEEK_END)
+        fileobj.seek(0)
+    return size
+
+def _upload_sessions():
+    if not os.path.exists(UPLOAD_SESSIONS_FILE):
+        return {}
+    with open(UPLOAD_SESSIONS_FILE, 'r') as f:
+        return json.load(f)
+
+def _update_upload_session(fingerprint, upload_id):
+    """Remember (or forget, when upload_id is None) the server upload for a file"""
+    with _upload_sessions_lock:
+        sessions = _upload_sessions()
+        if upload_id is None:
+            sessions.pop(fingerprint, None)
+        else:
+            sessions[fingerprint] = upload_id
+        with open(UPLOAD_SESSIONS_FILE, 'w') as f:
+            json.dump(sessions, f, indent=4)
+
+def _upload_part(upload_id, part_number, data):
+    """PUT one part; returns None on success or an error message"""
+    headers = {
+        "Content-Type": "application/octet-stream",
+        "X-Part-SHA256": hashlib.sha256(data).hexdigest(),
+    }
+    # A part that cannot be sent fails on its own; the other parts are still sent
+    try:
+        response = api_client.put(f"/admin/uploads/{upload_id}/parts/{part_number}", data=data, headers=headers)
+    except Exception as e:
+        return f"Part {part_number}: {type(e).__name__} - {e}"
+    if response.status_code != 200:
+        return f"Part {part_number}: {response.status_code} - {response.text}"
+    return None
+
+def save_uploaded_file_chunked(uploaded_file, in_vector_db=False, username=None,
+                               part_size=UPLOAD_PART_SIZE, max_workers=UPLOAD_PART_CONCURRENCY,
+                               sha256=None, dedup=DEDUP_UPLOADS):
+    """Upload a file in fixed-size parts that can be resumed after a failure.
+
+    Server contract:
+      POST /admin/uploads                          -> {"upload_id"}
+      GET  /admin/uploads/{upload_id}              -> {"parts": [acknowledged part numbers]}
+      PUT  /admin/uploads/{upload_id}/parts/{n}    raw part bytes
+      POST /admin/uploads/{upload_id}/commit       -> {"file_id", "metadata"}
+
+    Returns the same (file_id, metadata) / (None, {"error"}) pair as save_uploaded_file.
+    Calling it again for the same file after a failure only sends the missing parts.
+    """
+    if username is None:
+        username = st.session_state.username
+
+    size = _file_size(uploaded_file)
+    if sha256 is None:
+        sha256 = stream_sha256(uploaded_file)
+    match = lookup_file_hashes([sha256]).get(sha256) if dedup else None
+    if match:
+        file_id, metadata = link_file(match["file_id"], uploaded_file.name, username)
+        if not metadata.get("unsupported"):
+            return file_id, metadata
+        # A copy has no chunks of its own
+        in_vector_db = False
+    fingerprint = f"{uploaded_file.name}:{size}:{sha256}"
+
+    # Resume a previous upload of the same content if the server still has it
+    upload_id = _upload_sessions().get(fingerprint)
+    acknowledged = set()
+    if upload_id:
+        response = api_client.get(f"/admin/uploads/{upload_id}")
+        if response.status_code == 200:
+            acknowledged = set(response.json().get("parts", []))
+        else:
+            upload_id = None
+
+    if not upload_id:
+        response = api_client.post("/admin/uploads", json={
+            "filename": uploaded_file.name,
+            "content_type": uploaded_file.type,
+            "size": size,
+            "part_size": part_size,
+            "sha256": sha256,
+            "username": username,
+            "in_vector_db": in_vector_db,
+        })
+        # Servers without the chunked protocol get a regular upload
+        if response.status_code in (404, 405):
+            return save_uploaded_file(uploaded_file, in_vector_db, username, sha256=sha256, dedup=False)
+        if response.status_code != 200:
+            return None, {"error": response.text}
+        upload_id = response.json()["upload_id"]
+        _update_upload_session(fingerprint, upload_id)
+
+    # Parts are read on this thread and at most max_workers are held in memory
+    errors = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        in_flight = set()
+        for part_number in range(max(1, math.ceil(size / part_size))):
+            if part_number in acknowledged:
+                continue
+
+            uploaded_file.seek(part_number * part_size)
+            in_flight.add(pool.submit(_upload_part, upload_id, part_number, uploaded_file.read(part_size)))
+
+            if len(in_flight) >= max_workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                errors.extend(error for error in (f.result() for f in done) if error)
+
+        errors.extend(error for error in (f.result() for f in in_flight) if error)
+    uploaded_file.seek(0)
+
+    if errors:
+        return None, {"error": f"{len(errors)} parts failed, upload again to resume. {errors[0]}"}
+
+    response = api_client.post(f"/admin/uploads/{upload_id}/commit")
+    invalidate_files_cache()
+    if response.status_code != 200:
         return None, {"error": response.text}
 
-def list_files():
-    API_URL = "http://127.0.0.1:8000/admin/list_files"
-    response = requests.get(API_URL)
-    files_index = response.json()
-    return files_index
+    _update_upload_session(fingerprint, None)
+    metadata = response.json()["metadata"]
+    return response.json()["file_id"], {**metadata, "duplicate_of": match["file_id"]} if match else metadata
+
+def list_files(page=None, page_size=FILES_PAGE_SIZE, search=None, file_type=None, in_vector_db=None):
+    """List uploaded files.
+
+    Without a page this returns the whole files index as before. With a page,
+    filtering and pagination are done by the server and a dict with "files",
+    "total", "page", "page_size" and "file_types" is returned.
+    """
+    if page is None:
+        files_index = _get_listing({})
+        return files_index
+
+    params = {"page": page, "page_size": page_size}
+    if search:
+        params["search"] = search
+    if file_type:
+        params["file_type"] = file_type
+    if in_vector_db is not None:
+        params["in_vector_db"] = str(in_vector_db).lower()
+
+    data = _get_listing(params)
+
+    # Older servers ignore the parameters and return the full index
+    if not ("files" in data and "total" in data):
+        return _paginate_files(data, page, page_size, search, file_type, in_vector_db)
+
+    return data
+
+def _get_listing(params):
+    """GET /admin/list_files through the listing cache, revalidating with the ETag"""
+    key = tuple(sorted(params.items()))
+    entry = _files_cache.get(key)
+    if entry is not None and entry.fresh:
+        return entry.value
+
+    generation = _files_cache.generation
+    headers = {"If-None-Match": entry.validator} if entry is not None and entry.validator else {}
+    response = api_client.get("/admin/list_files", params=params, headers=headers)
+
+    if response.status_code == 304 and entry is not None:
+        _files_cache.touch(key)
+        return entry.value
+
+    data = response.json()
+    if response.status_code == 200:
+        _files_cache.set(key, data, response.headers.get("ETag"), generation)
+    return data
+
+def invalidate_files_cache():
+    """Drop cached file listings after anything that changes the files index"""
+    _files_cache.invalidate()
+
+def _paginate_files(files_index, page, page_size, search=None, file_type=None, in_vector_db=None):
+    """Filter and paginate a full files index on the client"""
+    matches = [
+        (file_id, info) for file_id, info in files_index.items()
+        if (not search or search.lower() in info["original_filename"].lower())
+        and (not file_type or info["file_type"] == file_type)
+        and (in_vector_db is None or info.get("in_vector_db", False) == in_vector_db)
+    ]
+
+    start = (page - 1) * page_size
+    return {
+        "files": dict(matches[start:start + page_size]),
+        "total": len(matches),
+        "page": page,
+        "page_size": page_size,
+        "file_types": sorted({info["file_type"] for info in files_index.values()}),
+    }
 
 def delete_file(file_id):
     """Delete a file and its metadata"""
-    API_URL = "http://127.0.0.1:8000/admin/delete_file"
-    response = requests.delete(API_URL, params={"file_id": file_id})
+    response = api_client.delete("/admin/delete_file", params={"file_id": file_id})
+    invalidate_files_cache()
 
     if response.status_code != 200:
         return {"status": False, "message": "Server error"}
 
     return response.json()
 
-def download_file(file_id):
-    """Download file from server"""
-    API_URL = "http://127.0.0.1:8000/admin/download_file"
-    response = requests.get(API_URL, params={"file_id": file_id}, stream=True)
+def _filename_from_headers(headers, default):
+    """File name from Content-Disposition, without any directory part"""
+    file_name = headers.get("Content-Disposition", "").split("filename=")[-1].strip('"; ')
+    file_name = os.path.basename(file_name.replace("\\", "/")).replace("\0", "")
+    return file_name if file_name not in ("", ".", "..") else default
 
-    if response.status_code != 200:
-        return None, response.json().get("error", "Unknown error")
+def _range_start(headers):
+    """First byte position of a 206 response's Content-Range, or None"""
+    match = re.match(r"bytes (\d+)-", headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
 
-    file_data = response.content
-    file_name = response.headers.get("Content-Disposition", "").split("filename=")[-1]
+def _checksum_from_headers(headers):
+    """Return the SHA-256 hex digest announced by the server, if any"""
+    if headers.get("X-Content-SHA256"):
+        return headers["X-Content-SHA256"].lower()
 
-    return file_data, file_name 
+    for part in headers.get("Digest", "").split(","):
+        algorithm, _, value = part.strip().partition("=")
+        if algorithm.lower() == "sha-256" and value:
+            return base64.b64decode(value).hex()
+
+    return None
+
+def file_sha256(path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """SHA-256 of a file on disk, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _expire_partial_downloads(dest_dir):
+    """Delete ".part" files that have not been written to for DOWNLOAD_PART_TTL seconds"""
+    cutoff = time.time() - DOWNLOAD_PART_TTL
+    for part_path in Path(dest_dir).glob("*.part"):
+        try:
+            if part_path.stat().st_mtime < cutoff:
+                part_path.unlink()
+        except FileNotFoundError:
+            pass
+
+def download_file_to_disk(file_id, dest_dir=DOWNLOAD_DIR, expected_sha256=None, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Stream a file from the server to disk with bounded memory.
+
+    An interrupted download leaves a ".part" file behind and is resumed with an
+    HTTP Range request, up to DOWNLOAD_RETRIES times here and again by the next
+    call. A ".part" file is deleted when the server refuses the download, and
+    when it has not been resumed for DOWNLOAD_PART_TTL seconds. Downloads of the
+    same file ID are serialized since they share the ".part" file. The result is checked against expected_sha256 or the checksum
+    announced by the server.
+    Returns (path, file_name) on success and (None, error message) otherwise.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    _expire_partial_downloads(dest_dir)
+    part_path = Path(dest_dir) / f"{file_id}.part"
+    with _download_locks_lock:
+        lock = _download_locks.setdefault(file_id, threading.Lock())
+
+    with lock:
+        failures = 0
+        while True:
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            try:
+                response = api_client.get("/admin/download_file", params={"file_id": file_id}, headers=headers, stream=True)
+                with response:
+                    # The partial file is already complete or no longer matches: start over
+                    if response.status_code == 416:
+                        part_path.unlink()
+                        failures += 1
+                        if failures > DOWNLOAD_RETRIES:
+                            return None, "Error: the server rejected every resume attempt"
+                        continue
+
+                    # The file is gone or may not be read: its partial copy can never be completed
+                    if response.status_code not in (200, 206):
+                        part_path.unlink(missing_ok=True)
+                        return None, f"Error: {response.status_code}"
+
+                    # A range other than the one asked for cannot be appended: start over
+                    if response.status_code == 206 and _range_start(response.headers) != offset:
+                        part_path.unlink()
+                        failures += 1
+                        if failures > DOWNLOAD_RETRIES:
+                            return None, "Error: the server sent the wrong byte range"
+                        continue
+
+                    file_name = _filename_from_headers(response.headers, file_id)
+                    expected_sha256 = expected_sha256 or _checksum_from_headers(response.headers)
+
+                    # 200 means the server ignored the Range header and sent the whole file
+                    mode = "ab" if response.status_code == 206 else "wb"
+                    with open(part_path, mode) as f:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            f.write(chunk)
+                break
+            except requests.RequestException as e:
+                failures += 1
+                if failures > DOWNLOAD_RETRIES:
+                    return None, f"Download interrupted ({type(e).__name__}), try again to resume it"
+
+        if expected_sha256 and file_sha256(part_path, chunk_size) != expected_sha256.lower():
+            part_path.unlink()
+            return None, "Checksum mismatch, the download was discarded"
+
+        # A name of its own, so a second download of the file cannot replace it while it is served
+        final_path = Path(dest_dir) / f"{file_id}_{uuid.uuid4().hex[:8]}_{file_name}"
+        os.replace(part_path, final_path)
+        return final_path, file_name
+
+def _split_indexed_duplicates(files_metadata):
+    """Separate files that are already in the vector DB, themselves or under another file ID.
+
+    Returns (to_index, skipped); skipped maps file_id -> result dict flagged
+    "skipped". A later file in the same batch with the same content as an earlier
+    one is skipped too. Only the hashes of these files are looked up.
+    """
+    known = lookup_file_hashes((metadata or {}).get("sha256") for metadata in files_metadata.values())
+    indexed = {sha256: match["file_id"] for sha256, match in known.items() if match["metadata"].get("in_vector_db")}
+
+    to_index, skipped = {}, {}
+    for file_id, metadata in files_metadata.items():
+        sha256 = (metadata or {}).get("sha256")
+        duplicate_of = indexed.get(sha256) if sha256 else None
+        # Indexing a file again would duplicate its chunks
+        if (metadata or {}).get("in_vector_db") or duplicate_of == file_id:
+            skipped[file_id] = {"file_id": file_id, "status": True, "skipped": True,
+                                "message": "File is already in the vector DB"}
+            continue
+        if duplicate_of:
+            skipped[file_id] = {
+                "file_id": file_id,
+                "status": True,
+                "skipped": True,
+                "message": f"Not indexed: identical content is already in the vector DB (file {duplicate_of}) "
+                           "and answers questions about this file too",
+                "duplicate_of": duplicate_of,
+            }
+            continue
+        to_index[file_id] = metadata
+        if sha256:
+            indexed[sha256] = file_id
+    return to_index, skipped
+
+def add_file_to_vector_db(file_id, file_metadata, dedup=DEDUP_UPLOADS):
+    # Identical content indexed under another file would only add duplicate chunks
+    if dedup:
+        _, skipped = _split_indexed_duplicates({file_id: file_metadata})
+        if skipped:
+            return skipped[file_id]
 
-def add_file_to_vector_db(file_id, file_metadata):
-    API_URL = "http://127.0.0.1:8000/admin/add_file_to_vdb"
-    
     # Convert file_metadata to JSON string
     payload = {
         "file_id": file_id,
@@ -70,7 +535,8 @@ def add_file_to_vector_db(file_id, file_metadata):
     }
     
     # Send request to FastAPI server using form data
-    response = requests.post(API_URL, data=payload)
+    response = api_client.post("/admin/add_file_to_vdb", data=payload)
+    invalidate_files_cache()
     
     if response.status_code == 200:
         return response.json()
@@ -78,11 +544,289 @@ def add_file_to_vector_db(file_id, file_metadata):
         return {"status": False, "message": f"Error: {response.status_code}"}
 
 def remove_file_from_vector_db(file_id):
-    API_URL = "http://127.0.0.1:8000/admin/remove_file_from_vdb"
-
-    response = requests.post(API_URL, data={"file_id": file_id})
+    response = api_client.post("/admin/remove_file_from_vdb", data={"file_id": file_id})
+    invalidate_files_cache()
 
     if response.status_code == 200:
         return response.json()
     else:
-        return {"status": False, "message": f"Error: {response.status_code} - {response.text}"}
\ No newline at end of file
+        return {"status": False, "message": f"Error: {response.status_code} - {response.text}"}
+
+def _batch_results(response, file_ids):
+    """Map a batch vector DB response to per-file results"""
+    if response.status_code != 200:
+        message = f"Error: {response.status_code} - {response.text}"
+        return {file_id: {"status": False, "message": message} for file_id in file_ids}
+
+    returned = {r["file_id"]: r for r in response.json().get("results", [])}
+    return {
+        file_id: returned.get(file_id, {"status": False, "message": "No result returned by server"})
+        for file_id in file_ids
+    }
+
+def linked_dependents(files_metadata):
+    """Files whose content is only retrievable through the vector DB chunks of these files.
+
+    Linked copies (see link_file) share the content of an indexed file and have no
+    chunks of their own. Removing the last indexed copy of some content from the
+    vector DB, or deleting it, would silently drop the other copies from retrieval.
+    files_metadata maps file_id -> metadata. Returns {file_id: [dependent file IDs]}
+    for the files that would; only the copies of their hashes are looked up.
+    """
+    targets = {
+        file_id: metadata["sha256"] for file_id, metadata in files_metadata.items()
+        if metadata and metadata.get("in_vector_db") and metadata.get("sha256")
+    }
+    copies = file_copies(targets.values())
+
+    blocked = {}
+    for file_id, sha256 in targets.items():
+        others = {other: info for other, info in copies.get(sha256, {}).items() if other not in files_metadata}
+        # Another indexed copy keeps the content retrievable
+        if any(info.get("in_vector_db") for info in others.values()):
+            continue
+        if others:
+            blocked[file_id] = list(others)
+    return blocked
+
+def _blocked_results(blocked, action):
+    return {
+        file_id: {
+            "file_id": file_id,
+            "status": False,
+            "message": f"Not {action}: {len(dependents)} linked copies use its vector DB chunks "
+                       f"({', '.join(dependents[:3])}{', ...' if len(dependents) > 3 else ''}); "
+                       "delete them or add one of them to the vector DB first",
+        }
+        for file_id, dependents in blocked.items()
+    }
+
+def run_in_batches(batch_fn, file_ids, batch_size=VDB_BATCH_SIZE, max_workers=1, on_batch=None):
+    """Apply batch_fn to consecutive batches of file IDs, max_workers batches at a time.
+
+    batch_fn takes a list of file IDs and returns {file_id: result}. A batch that
+    raises is reported as failed for each of its files. on_batch is called in the
+    calling thread with the results of every batch as soon as it finishes.
+    Returns the results of all batches.
+    """
+    file_ids = list(file_ids)
+    batches = [file_ids[start:start + batch_size] for start in range(0, len(file_ids), batch_size)]
+    results = {}
+
+    def run(batch):
+        try:
+            return batch_fn(batch)
+        except Exception as e:
+            return {file_id: {"status": False, "message": f"Error: {e}"} for file_id in batch}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for future in as_completed([pool.submit(run, batch) for batch in batches]):
+            batch_results = future.result()
+            results.update(batch_results)
+            if on_batch:
+                on_batch(batch_results)
+    return results
+
+def _add_files_batch(files_metadata, file_ids):
+    payload = {"files": [{"file_id": file_id, "file_metadata": files_metadata[file_id]} for file_id in file_ids]}
+    response = api_client.post("/admin/add_files_to_vdb", json=payload)
+    invalidate_files_cache()
+
+    # Older servers only have the single-file endpoint
+    if response.status_code in (404, 405):
+        return {file_id: add_file_to_vector_db(file_id, files_metadata[file_id], dedup=False) for file_id in file_ids}
+    return _batch_results(response, file_ids)
+
+def _remove_files_batch(file_ids):
+    response = api_client.post("/admin/remove_files_from_vdb", json={"file_ids": file_ids})
+    invalidate_files_cache()
+
+    # Older servers only have the single-file endpoint
+    if response.status_code in (404, 405):
+        return {file_id: remove_file_from_vector_db(file_id) for file_id in file_ids}
+    return _batch_results(response, file_ids)
+
+def add_files_to_vector_db(files_metadata, batch_size=VDB_BATCH_SIZE, dedup=DEDUP_UPLOADS,
+                           max_workers=1, on_batch=None):
+    """Add many files to the vector DB using chunked batch requests.
+
+    files_metadata maps file_id -> metadata. Returns a dict mapping each
+    file_id to its own {"status", "message"} result. With dedup, files whose
+    content (by SHA-256) is already in the vector DB are skipped. Up to
+    max_workers batches are sent at a time (see run_in_batches).
+    """
+    skipped = {}
+    if dedup:
+        files_metadata, skipped = _split_indexed_duplicates(files_metadata)
+        if skipped and on_batch:
+            on_batch(skipped)
+
+    results = run_in_batches(partial(_add_files_batch, files_metadata), files_metadata,
+                             batch_size, max_workers, on_batch)
+    return {**skipped, **results}
+
+def remove_files_from_vector_db(files_metadata, batch_size=VDB_BATCH_SIZE, max_workers=1, on_batch=None):
+    """Remove many files from the vector DB using chunked batch requests.
+
+    files_metadata maps file_id -> metadata. Returns a dict mapping each file_id
+    to its own {"status", "message"} result. Files whose chunks linked copies
+    still depend on are kept (see linked_dependents).
+    """
+    blocked = _blocked_results(linked_dependents(files_metadata), "removed")
+    if blocked and on_batch:
+        on_batch(blocked)
+
+    results = run_in_batches(_remove_files_batch, [f for f in files_metadata if f not in blocked],
+                             batch_size, max_workers, on_batch)
+    return {**blocked, **results}
+
+def _delete_files_batch(files_metadata, file_ids):
+    # Chunks go first: a file whose chunks could not be removed is kept, so none are orphaned
+    indexed = [file_id for file_id in file_ids if files_metadata[file_id].get("in_vector_db")]
+    removed = _remove_files_batch(indexed) if indexed else {}
+
+    results = {}
+    for file_id in file_ids:
+        if file_id in removed and not removed[file_id].get("status"):
+            message = removed[file_id].get("message", "Unknown error")
+            results[file_id] = {"status": False, "message": f"Not deleted, removing it from the vector DB failed: {message}"}
+            continue
+        try:
+            results[file_id] = delete_file(file_id)
+        except Exception as e:
+            results[file_id] = {"status": False, "message": f"Error: {e}"}
+    return results
+
+def delete_files(files_metadata, batch_size=VDB_BATCH_SIZE, max_workers=BULK_CONCURRENCY, on_batch=None):
+    """Delete many files and their vector DB chunks in concurrent batches.
+
+    files_metadata maps file_id -> metadata; only files flagged in_vector_db are
+    removed from the vector DB, with one batch request per batch. Returns a dict
+    mapping each file_id to its own {"status", "message"} result. Files whose
+    chunks linked copies still depend on are kept (see linked_dependents).
+    """
+    blocked = _blocked_results(linked_dependents(files_metadata), "deleted")
+    if blocked and on_batch:
+        on_batch(blocked)
+
+    results = run_in_batches(partial(_delete_files_batch, files_metadata), [f for f in files_metadata if f not in blocked],
+                             batch_size, max_workers, on_batch)
+    return {**blocked, **results}
+
+def upload_files_concurrently(uploaded_files, in_vector_db=False, username=None,
+                              max_workers=UPLOAD_CONCURRENCY, index_workers=INDEX_CONCURRENCY,
+                              index_batch_size=VDB_BATCH_SIZE, chunked=False, dedup=DEDUP_UPLOADS):
+    """Upload many files with bounded concurrency, overlapping uploads with vector DB indexing.
+
+    Finished uploads are indexed in batches while the remaining files keep
+    uploading. Yields one result dict per file as soon as that file is finished;
+    failures are reported in the result instead of stopping the rest of the batch.
+    With chunked=True, files larger than one part use the resumable chunked upload.
+    With dedup, every file is hashed first and one preflight request finds content
+    the server already has; those files (and repeats within the batch) are linked
+    instead of uploaded.
+    """
+    if username is None:
+        username = st.session_state.username
+
+    uploaded_files = list(uploaded_files)
+    hashes = {id(f): stream_sha256(f) for f in uploaded_files}
+    known = lookup_file_hashes(hashes.values()) if dedup else {}
+
+    def upload(uploaded_file):
+        sha256 = hashes[id(uploaded_file)]
+        match = known.get(sha256)
+        if match:
+            file_id, metadata = link_file(match["file_id"], uploaded_file.name, username)
+            if not metadata.get("unsupported"):
+                return file_id, metadata
+        # A copy has no chunks of its own
+        flag = in_vector_db and not match
+        if chunked and _file_size(uploaded_file) > UPLOAD_PART_SIZE:
+            file_id, metadata = save_uploaded_file_chunked(uploaded_file, flag, username, sha256=sha256, dedup=False)
+        else:
+            file_id, metadata = save_uploaded_file(uploaded_file, flag, username, sha256=sha256, dedup=False)
+        # Without /admin/link_file the content was uploaded again, as a copy of the match
+        if match and file_id:
+            metadata = {**metadata, "duplicate_of": match["file_id"]}
+        return file_id, metadata
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as upload_pool, \
+            ThreadPoolExecutor(max_workers=max(1, index_workers)) as index_pool:
+        # future -> ("upload", uploaded_file) or ("index", {file_id: filename})
+        pending = {}
+        # Repeats of content already being uploaded in this batch wait for that upload
+        uploading, waiting = set(), {}
+        for uploaded_file in uploaded_files:
+            sha256 = hashes[id(uploaded_file)]
+            if dedup and sha256 not in known and sha256 in uploading:
+                waiting.setdefault(sha256, []).append(uploaded_file)
+                continue
+            uploading.add(sha256)
+            pending[upload_pool.submit(upload, uploaded_file)] = ("upload", uploaded_file)
+        to_index = {}  # file_id -> (filename, metadata)
+        queued = set()  # every file_id ever put in to_index
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, target = pending.pop(future)
+
+                if stage == "upload":
+                    result = {"filename": target.name, "file_id": None, "stage": stage}
+                    sha256 = hashes[id(target)]
+                    try:
+                        file_id, file_info = future.result()
+                    except Exception as e:
+                        file_id, file_info = None, {"error": str(e)}
+
+                    # Waiting repeats are linked to this upload, or uploaded themselves if it failed
+                    if file_id is not None and sha256 not in known:
+                        known[sha256] = {"file_id": file_id, "metadata": file_info}
+                    for repeat in waiting.pop(sha256, []):
+                        pending[upload_pool.submit(upload, repeat)] = ("upload", repeat)
+
+                    if file_id is None:
+                        yield {**result, "status": False, "message": f"Upload failed: {file_info.get('error', 'Unknown error')}"}
+                        continue
+
+                    file_info = {**file_info, "sha256": file_info.get("sha256") or sha256}
+                    if file_info.get("duplicate_of"):
+                        duplicate = known[sha256]["metadata"].get("original_filename", file_info["duplicate_of"])
+                        how = "linked instead of uploaded" if file_info.get("linked") else "uploaded as a copy"
+                        message = f"File '{target.name}' is identical to '{duplicate}', {how}"
+                    else:
+                        message = f"File '{target.name}' uploaded successfully!"
+
+                    # Duplicates (linked or uploaded as a copy) are answered from the chunks
+                    # of the file they duplicate, so only new content is indexed
+                    if in_vector_db and file_info.get("duplicate_of"):
+                        original = known[sha256]["metadata"]
+                        if not original.get("in_vector_db") and file_info["duplicate_of"] not in queued:
+                            message += "; the original is not in the vector DB, add it from the Files Dashboard"
+                        yield {**result, "file_id": file_id, "status": True, "message": message}
+                    elif in_vector_db:
+                        to_index[file_id] = (target.name, file_info)
+                        queued.add(file_id)
+                    else:
+                        yield {**result, "file_id": file_id, "status": True, "message": message}
+                else:
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        outcome = {file_id: {"status": False, "message": f"Indexing failed: {e}"} for file_id in target}
+
+                    for file_id, filename in target.items():
+                        r = outcome.get(file_id, {"status": False, "message": "No result returned by server"})
+                        yield {"filename": filename, "file_id": file_id, "stage": stage,
+                               "status": bool(r.get("status")), "message": r.get("message", "")}
+
+            # Dispatch an indexing batch once it is full or no uploads are left to fill it
+            uploads_left = any(stage == "upload" for stage, _ in pending.values())
+            if to_index and (len(to_index) >= index_batch_size or not uploads_left):
+                batch = {file_id: info for file_id, (_, info) in to_index.items()}
+                # Only new content is queued (duplicates were linked above), and the upload
+                # already flagged these files in_vector_db, so no dedup check here
+                index_future = index_pool.submit(add_files_to_vector_db, batch, index_batch_size, False)
+                pending[index_future] = ("index", {file_id: name for file_id, (name, _) in to_index.items()})
+                to_index = {}
@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Priority classes: interactive calls keep a reserved share of the backend,
+# background work (evaluations, bulk ingest, testsets) backs off first
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Paths whose calls are background work unless the caller says otherwise
+BACKGROUND_PATHS = (
+    "/admin/get_queries_response",
+    "/admin/upload_file",
+    "/admin/uploads",
+    "/admin/add_file_to_vdb",
+    "/admin/add_files_to_vdb",
+    "/admin/remove_files_from_vdb",
+    "/admin/create_testset_using_ragas",
+    "/admin/testset_jobs",
+)
+
+LIMITER_ENABLED = os.getenv("LIMITER_ENABLED", "true").lower() == "true"
+
+# Concurrent requests allowed to the backend, adapted between MIN and MAX
+LIMITER_INITIAL = float(os.getenv("LIMITER_INITIAL", "8"))
+LIMITER_MIN = float(os.getenv("LIMITER_MIN", "1"))
+LIMITER_MAX = float(os.getenv("LIMITER_MAX", "64"))
+
+# Multiplicative decrease on overload, at most once per LIMITER_COOLDOWN seconds
+LIMITER_BACKOFF = float(os.getenv("LIMITER_BACKOFF", "0.7"))
+LIMITER_COOLDOWN = float(os.getenv("LIMITER_COOLDOWN", "1.0"))
+
+# An endpoint counts as overloaded when its recent average latency grows to this many
+# times its long-run average. Both are EWMAs, so single slow calls (large payloads,
+# cache misses) average out and only sustained growth triggers a decrease.
+LIMITER_LATENCY_TOLERANCE = float(os.getenv("LIMITER_LATENCY_TOLERANCE", "2.5"))
+LIMITER_RECENT_WEIGHT = 0.2
+LIMITER_LONG_RUN_WEIGHT = 0.002
+# Calls per endpoint before its latency is judged, and the recent average must be at
+# least this long so jitter on fast calls is ignored (seconds)
+LIMITER_LATENCY_WARMUP = 20
+LIMITER_MIN_OVERLOAD_LATENCY = 0.05
+
+# Share of the limit background calls may use, and interactive calls always admitted
+LIMITER_BACKGROUND_SHARE = float(os.getenv("LIMITER_BACKGROUND_SHARE", "0.75"))
+LIMITER_INTERACTIVE_RESERVE = int(os.getenv("LIMITER_INTERACTIVE_RESERVE", "2"))
+
+# Interactive calls never wait longer than this for a slot (seconds)
+INTERACTIVE_MAX_WAIT = float(os.getenv("LIMITER_INTERACTIVE_MAX_WAIT", "5"))
+
+_local = threading.local()
+
+class LatencyTrend:
+    """Recent and long-run average latency of one endpoint"""
+
+    def __init__(self):
+        self.recent = 0.0
+        self.long_run = 0.0
+        self.samples = 0
+
+    def add(self, seconds):
+        """Record a call and tell whether latency has grown well beyond its usual level"""
+        self.samples += 1
+        # Plain means until there are enough samples for the EWMA weights
+        self.recent += max(LIMITER_RECENT_WEIGHT, 1 / self.samples) * (seconds - self.recent)
+        self.long_run += max(LIMITER_LONG_RUN_WEIGHT, 1 / self.samples) * (seconds - self.long_run)
+        return (self.samples >= LIMITER_LATENCY_WARMUP
+                and self.recent > LIMITER_MIN_OVERLOAD_LATENCY
+                and self.recent > self.long_run * LIMITER_LATENCY_TOLERANCE)
+
+class AdaptiveLimiter:
+    """Process-wide AIMD concurrency limit on calls to the admin API.
+
+    The limit grows by one per round of successful calls while it is being used
+    (additive increase) and shrinks by LIMITER_BACKOFF when a call fails with a
+    5xx/429, a connection error or a timeout, or when the endpoint's recent
+    latency has grown well beyond its long-run level (multiplicative decrease).
+
+    Background calls may only fill LIMITER_BACKGROUND_SHARE of the limit and
+    always yield to waiting interactive calls. Interactive calls are admitted
+    up to the full limit, plus LIMITER_INTERACTIVE_RESERVE beyond it, so
+    dashboard calls stay fast while evaluations and uploads are running.
+    """
+
+    def __init__(self, initial=LIMITER_INITIAL, minimum=LIMITER_MIN, maximum=LIMITER_MAX):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.decreases = 0
+        self._trends = {}  # endpoint -> LatencyTrend
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def _admissible(self, priority):
+        total = sum(self.in_flight.values())
+        if priority == INTERACTIVE:
+            return total < self.limit or self.in_flight[INTERACTIVE] < LIMITER_INTERACTIVE_RESERVE
+        return (total < max(1.0, self.limit * LIMITER_BACKGROUND_SHARE)
+                and not self.waiting[INTERACTIVE])
+
+    def acquire(self, priority):
+        """Wait for a slot; interactive calls give up waiting after INTERACTIVE_MAX_WAIT"""
+        deadline = time.monotonic() + INTERACTIVE_MAX_WAIT if priority == INTERACTIVE else None
+        with self._condition:
+            self.waiting[priority] += 1
+            try:
+                while not self._admissible(priority):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting[priority] -= 1
+            self.in_flight[priority] += 1
+
+    def release(self, priority, endpoint, seconds, overloaded=False):
+        """Return a slot and adapt the limit to how the call went"""
+        with self._condition:
+            used = sum(self.in_flight.values())
+            self.in_flight[priority] -= 1
+
+            # Failed calls say nothing about the endpoint's normal latency
+            slow = not overloaded and self._trends.setdefault(endpoint, LatencyTrend()).add(seconds)
+
+            now = time.monotonic()
+            if overloaded or slow:
+                if now - self._last_decrease >= LIMITER_COOLDOWN:
+                    self.limit = max(self.minimum, self.limit * LIMITER_BACKOFF)
+                    self._last_decrease = now
+                    self.decreases += 1
+            elif used >= self.limit * 0.5:
+                # Only grow while the limit is actually being used
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+            self._condition.notify_all()
+
+    def status(self):
+        with self._condition:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": dict(self.in_flight),
+                "waiting": dict(self.waiting),
+                "decreases": self.decreases,
+            }
+
+limiter = AdaptiveLimiter()
+
+@contextmanager
+def priority(priority_class):
+    """Run backend calls made by this thread in the given priority class"""
+    previous = getattr(_local, "priority", None)
+    _local.priority = priority_class
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+def priority_for(path):
+    """Priority of a call: the thread's class if set, else the default for its path"""
+    explicit = getattr(_local, "priority", None)
+    if explicit:
+        return explicit
+    return BACKGROUND if path.startswith(BACKGROUND_PATHS) else INTERACTIVE
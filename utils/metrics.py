@@ -0,0 +1,111 @@
+import itertools
+import os
+import numpy as np
+
+RETRIEVAL_METRICS = ["precision", "recall", "f1_score", "mrr", "ndcg"]
+
+# Bootstrap settings for confidence intervals
+BOOTSTRAP_RESAMPLES = int(os.getenv("BOOTSTRAP_RESAMPLES", "1000"))
+CONFIDENCE_LEVEL = 0.95
+
+# Upper bound on resample weights held in memory at once (resamples x queries)
+_BOOTSTRAP_CHUNK_CELLS = 5_000_000
+
+def relevance_matrix(relevance_lists, k):
+    """Pack ragged 0/1 relevance lists into an (n_queries, k) uint8 matrix, truncated/padded to k"""
+    lengths = np.fromiter((min(len(r), k) for r in relevance_lists), dtype=np.int64, count=len(relevance_lists))
+    flat = np.fromiter(
+        itertools.chain.from_iterable(r[:k] for r in relevance_lists), dtype=np.uint8, count=int(lengths.sum())
+    )
+
+    matrix = np.zeros((len(relevance_lists), k), dtype=np.uint8)
+    rows = np.repeat(np.arange(len(relevance_lists)), lengths)
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    matrix[rows, np.arange(len(flat)) - offsets] = flat
+    return matrix
+
+def retrieval_metrics(relevance, num_relevant, references_found=None, valid=None):
+    """Per-query Precision@k, Recall, F1, reciprocal rank and NDCG@k in one vectorized pass.
+
+    relevance is an (n_queries, k) 0/1 matrix of ranked results and num_relevant the
+    number of reference contexts per query. references_found (distinct references
+    retrieved) gives the recall numerator; without it hits are capped at num_relevant.
+    Queries without references, or masked out by `valid`, get NaN.
+    """
+    relevance = np.asarray(relevance, dtype=np.float64)
+    num_relevant = np.asarray(num_relevant, dtype=np.int64)
+    n, k = relevance.shape
+
+    hits = relevance.sum(axis=1)
+    found = np.minimum(hits, num_relevant) if references_found is None else np.asarray(references_found, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = hits / k
+        recall = found / num_relevant
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+        # Reciprocal rank of the first relevant result
+        has_hit = relevance.any(axis=1)
+        rr = np.where(has_hit, 1.0 / (relevance.argmax(axis=1) + 1), 0.0)
+
+        # Several results may match the same reference, so the ideal list has at least `hits` entries
+        discounts = 1.0 / np.log2(np.arange(2, k + 2))
+        dcg = relevance @ discounts
+        ideal_counts = np.clip(np.maximum(num_relevant, hits.astype(np.int64)), 0, k)
+        idcg = np.concatenate(([0.0], np.cumsum(discounts)))[ideal_counts]
+        ndcg = np.where(idcg > 0, dcg / idcg, 0.0)
+
+    mask = num_relevant > 0
+    if valid is not None:
+        mask &= np.asarray(valid, dtype=bool)
+
+    metrics = {"precision": precision, "recall": recall, "f1_score": f1, "mrr": rr, "ndcg": ndcg}
+    return {name: np.where(mask, values, np.nan) for name, values in metrics.items()}
+
+def bootstrap_ci(per_query, n_resamples=BOOTSTRAP_RESAMPLES, confidence=CONFIDENCE_LEVEL, seed=0):
+    """Percentile bootstrap confidence intervals of the mean for several metrics at once.
+
+    per_query maps metric name -> per-query values (NaN values are ignored).
+    Each chunk of resamples is turned into a matrix of per-query draw counts, so the
+    resample means of all metrics come from one matrix product instead of a loop.
+    Returns {name: (low, high)}; metrics with fewer than two values get (nan, nan).
+    """
+    rng = np.random.default_rng(seed)
+    alpha = (1 - confidence) / 2
+    intervals = {}
+
+    # Metrics with the same set of valid queries share their resamples
+    groups = {}
+    for name, values in per_query.items():
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        groups.setdefault(valid.tobytes(), (valid, []))[1].append((name, values[valid]))
+
+    for valid, members in groups.values():
+        n = int(valid.sum())
+        if n < 2:
+            intervals.update({name: (float("nan"), float("nan")) for name, _ in members})
+            continue
+
+        data = np.stack([values for _, values in members], axis=1)  # (n, n_metrics)
+        chunk = max(1, _BOOTSTRAP_CHUNK_CELLS // n)
+        means = []
+        for start in range(0, n_resamples, chunk):
+            size = min(chunk, n_resamples - start)
+            draws = rng.integers(0, n, size=(size, n)) + (np.arange(size) * n)[:, None]
+            counts = np.bincount(draws.ravel(), minlength=size * n).reshape(size, n)
+            means.append(counts @ data / n)
+        means = np.concatenate(means)  # (n_resamples, n_metrics)
+
+        low, high = np.quantile(means, [alpha, 1 - alpha], axis=0)
+        for i, (name, _) in enumerate(members):
+            intervals[name] = (float(low[i]), float(high[i]))
+
+    return intervals
+
+def mean_metrics(per_query):
+    """Mean of each metric over the queries where it is defined (None if it never is)"""
+    means = {}
+    for name, values in per_query.items():
+        values = np.asarray(values, dtype=np.float64)
+        means[name] = float(np.nanmean(values)) if np.any(~np.isnan(values)) else None
+    return means
@@ -0,0 +1,219 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds (Prometheus style, cumulative)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Recent samples kept per metric for percentiles and the recent-latency histogram
+RECENT_SAMPLES = int(os.getenv("PERF_RECENT_SAMPLES", "500"))
+
+# Serve the Prometheus text format on this port when set (e.g. PERF_METRICS_PORT=9108)
+PERF_METRICS_PORT = os.getenv("PERF_METRICS_PORT")
+
+# Path segments that identify one object (UUIDs, hex IDs, job IDs, part numbers)
+_ID_SEGMENT = re.compile(r"^([0-9a-fA-F-]{8,}|\d+|(job|eval)_[\w-]+)$")
+
+class Series:
+    """Counters, cumulative histogram and recent samples of one instrumented operation"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.statuses = {}
+        # (timestamp, seconds, status)
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+class PerfRegistry:
+    """Thread-safe in-process registry shared by all sessions of the Streamlit server.
+
+    Series are keyed by (kind, name): kind "backend" for admin API calls named
+    "METHOD /path/{id}", kind "page" for page renders named after the page.
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def observe(self, kind, name, seconds, status, error=False, request_bytes=0, response_bytes=0):
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        with self._lock:
+            series = self._series.setdefault((kind, name), Series())
+            series.count += 1
+            series.errors += bool(error)
+            series.total_seconds += seconds
+            series.request_bytes += request_bytes
+            series.response_bytes += response_bytes
+            series.buckets[bucket] += 1
+            series.statuses[str(status)] = series.statuses.get(str(status), 0) + 1
+            series.recent.append((time.time(), seconds, str(status)))
+
+    def snapshot(self, kind=None):
+        """Summary rows for the performance panel, slowest recent p95 first.
+
+        Counts and the mean cover every call; p50 and p95 only the recent samples.
+        """
+        with self._lock:
+            items = [(k, n, s, list(s.recent)) for (k, n), s in self._series.items() if kind in (None, k)]
+
+        rows = []
+        for series_kind, name, series, recent in items:
+            latencies = sorted(seconds for _, seconds, _ in recent)
+            rows.append({
+                "kind": series_kind,
+                "name": name,
+                "count": series.count,
+                "errors": series.errors,
+                "mean_ms": series.total_seconds / series.count * 1000,
+                "p50_ms": _percentile(latencies, 50) * 1000,
+                "p95_ms": _percentile(latencies, 95) * 1000,
+                "request_bytes": series.request_bytes,
+                "response_bytes": series.response_bytes,
+            })
+        return sorted(rows, key=lambda row: row["p95_ms"], reverse=True)
+
+    def recent(self, kind, name):
+        """Recent (timestamp, seconds, status) samples of one series"""
+        with self._lock:
+            series = self._series.get((kind, name))
+            return list(series.recent) if series else []
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self.started = time.time()
+
+    def prometheus_text(self):
+        """All series in the Prometheus text exposition format"""
+        with self._lock:
+            items = sorted(
+                ((kind, name, series.count, series.errors, series.total_seconds, series.request_bytes,
+                  series.response_bytes, list(series.buckets), dict(series.statuses))
+                 for (kind, name), series in self._series.items()),
+                key=lambda item: item[:2],
+            )
+            latencies = {key: sorted(seconds for _, seconds, _ in series.recent) for key, series in self._series.items()}
+
+        lines = []
+        for kind, label in (("backend", "endpoint"), ("page", "page")):
+            prefix = f"admin_{kind}"
+            lines += [
+                f"# HELP {prefix}_duration_seconds Duration of {kind} operations.",
+                f"# TYPE {prefix}_duration_seconds histogram",
+            ]
+            for series_kind, name, count, _, total, _, _, buckets, _ in items:
+                if series_kind != kind:
+                    continue
+                cumulative = 0
+                for bound, value in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                    cumulative += value
+                    lines.append(f'{prefix}_duration_seconds_bucket{{{label}="{_escape(name)}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_duration_seconds_sum{{{label}="{_escape(name)}"}} {total}')
+                lines.append(f'{prefix}_duration_seconds_count{{{label}="{_escape(name)}"}} {count}')
+
+            lines += [
+                f"# HELP {prefix}_recent_duration_seconds Duration percentiles of the recent {kind} operations.",
+                f"# TYPE {prefix}_recent_duration_seconds gauge",
+            ]
+            for series_kind, name, *_ in items:
+                if series_kind == kind:
+                    for q in (50, 95):
+                        value = _percentile(latencies[(kind, name)], q)
+                        lines.append(f'{prefix}_recent_duration_seconds{{{label}="{_escape(name)}",quantile="{q / 100:g}"}} {value}')
+
+            lines += [f"# HELP {prefix}_total Completed {kind} operations by status.", f"# TYPE {prefix}_total counter"]
+            for series_kind, name, _, _, _, _, _, _, statuses in items:
+                if series_kind == kind:
+                    for status, value in sorted(statuses.items()):
+                        lines.append(f'{prefix}_total{{{label}="{_escape(name)}",status="{_escape(status)}"}} {value}')
+
+        lines += ["# HELP admin_backend_bytes_total Bytes sent to and received from the admin API.",
+                  "# TYPE admin_backend_bytes_total counter"]
+        for kind, name, _, _, _, sent, received, _, _ in items:
+            if kind == "backend":
+                lines.append(f'admin_backend_bytes_total{{endpoint="{_escape(name)}",direction="sent"}} {sent}')
+                lines.append(f'admin_backend_bytes_total{{endpoint="{_escape(name)}",direction="received"}} {received}')
+
+        return "\n".join(lines) + "\n"
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round((len(sorted_values) - 1) * q / 100)))]
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+registry = PerfRegistry()
+
+def endpoint_name(method, path):
+    """Metric name of a backend call, with object IDs collapsed so series stay bounded"""
+    path = "/" + path.lstrip("/").split("?")[0]
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+def body_size(kwargs):
+    """Best-effort size of a request body passed to requests"""
+    for key in ("data", "json"):
+        body = kwargs.get(key)
+        if isinstance(body, (bytes, str)):
+            return len(body)
+        if isinstance(body, dict) and key == "data":
+            return sum(len(str(k)) + len(str(v)) for k, v in body.items())
+    for _, value in (kwargs.get("files") or {}).items():
+        fileobj = value[1] if isinstance(value, tuple) else value
+        if hasattr(fileobj, "getbuffer"):
+            return fileobj.getbuffer().nbytes
+        if hasattr(fileobj, "size"):
+            return fileobj.size
+    return 0
+
+@contextmanager
+def timed(kind, name):
+    """Record how long the block takes; exceptions are recorded with their type and re-raised"""
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        status = type(e).__name__
+        raise
+    finally:
+        # Streamlit's st.rerun() and st.stop() unwind with exceptions; they are not errors
+        error = status not in ("ok", "RerunException", "StopException")
+        registry.observe(kind, name, time.perf_counter() - start, status, error=error)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = registry.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+_metrics_server = None
+_metrics_lock = threading.Lock()
+
+def start_metrics_server(port=PERF_METRICS_PORT, host="0.0.0.0"):
+    """Serve the registry for Prometheus scraping once per process; no-op without a port"""
+    global _metrics_server
+    if not port:
+        return None
+    with _metrics_lock:
+        if _metrics_server is None:
+            _metrics_server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            threading.Thread(target=_metrics_server.serve_forever, daemon=True, name="perf-metrics").start()
+    return _metrics_server
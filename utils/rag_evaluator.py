@@ -1,37 +1,108 @@
 import json
 import os
-import datetime
+import threading
+import uuid
+import hashlib
 from pathlib import Path
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datetime import datetime
-import requests
+from utils import api_client, eval_store, eval_engine, response_cache
+from utils.file_manager import list_files
 
 # Define constants
 EVALUATIONS_DIR = Path(__file__).parent.parent / "data" / "evaluations"
-EVAL_INDEX = Path(__file__).parent.parent / "data" / "evaluation_index.json"
+EVAL_INDEX = eval_store.EVAL_INDEX
 TESTSET_DIR = Path(__file__).parent.parent / "data" / "testset_generation"
 
+# Identifies the RAG pipeline configuration (models, prompts, chunking) for the response cache;
+# change it whenever the backend pipeline changes so cached answers are not reused
+RAG_PIPELINE_CONFIG = os.getenv("RAG_PIPELINE_CONFIG", "")
+
+# Per-query results are stored in Parquet, in row groups of this many rows
+QUERY_ROW_GROUP_SIZE = 1000
+
+# Reconnects of a dropped testset stream before the job is reported as failed
+TESTSET_STREAM_RETRIES = 3
+
+# Testset jobs whose rows are being read in this process (see watch_testset_job)
+_testset_watches = {}
+_testset_watches_lock = threading.Lock()
+
 # Ensure directories exist
 os.makedirs(EVALUATIONS_DIR, exist_ok=True)
 
-def get_queries_response(queries):
-    API_URL = "http://localhost:8000/admin/get_queries_response"
-    response = requests.post(API_URL, json={"queries": queries})  # Kirim data dalam format JSON
+def get_queries_response(queries, use_cache=True):
+    """Get RAG responses for a list of queries.
+
+    Responses are cached on disk per normalised query and corpus fingerprint,
+    so only queries that are new for the current corpus/config reach the backend.
+    Each response carries "latency_ms", the backend round trip of the request that
+    produced it (stored with cached answers), and "cached".
+    """
+    if not use_cache:
+        return _fetch_queries_response(queries)
+    
+    fingerprint = corpus_fingerprint()
+    keys = [response_cache.make_key(q, fingerprint) for q in queries]
+    cached = response_cache.get_many(keys)
+    
+    # Each distinct uncached query is sent once
+    missing, fetched = {}, {}
+    for query, key in zip(queries, keys):
+        if key not in cached:
+            missing.setdefault(key, query)
+    
+    if missing:
+        responses = _fetch_queries_response(list(missing.values()))
+        if responses is None or len(responses) != len(missing):
+            return None
+        fetched = dict(zip(missing.keys(), responses))
+        response_cache.put_many(fetched)
+        cached.update(fetched)
+    
+    # A cached answer may come from a differently-cased phrasing of the same query
+    return [{**cached[key], "question": query, "cached": key not in fetched} for query, key in zip(queries, keys)]
+
+def _fetch_queries_response(queries):
+    response = api_client.post("/admin/get_queries_response", json={"queries": queries})  # Kirim data dalam format JSON
 
     if response.status_code == 200:
-        return response.json()["responses"]
+        # Only the round trip itself, without limiter waits; shared by every query of the request
+        latency_ms = response.elapsed.total_seconds() * 1000
+        return [{**r, "latency_ms": latency_ms} for r in response.json()["responses"]]
 
-def save_evaluation_result(evaluation_data):
-    """Save a RAG evaluation result"""
-    if not os.path.exists(EVAL_INDEX):
-        with open(EVAL_INDEX, 'w') as f:
-            json.dump({}, f)
+def corpus_fingerprint():
+    """Fingerprint of what answers depend on: the files in the vector DB and the pipeline config"""
+    files_index = list_files()
+    in_vector_db = sorted(file_id for file_id, info in files_index.items() if info.get("in_vector_db"))
     
-    # Generate evaluation ID using timestamp
-    eval_id = f"eval_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    digest = hashlib.sha256()
+    digest.update(RAG_PIPELINE_CONFIG.encode())
+    for file_id in in_vector_db:
+        digest.update(b"\0" + file_id.encode())
+    return digest.hexdigest()
+
+def save_evaluation_result(evaluation_data, query_schema=None):
+    """Save a RAG evaluation result.
+
+    "queries" may be any iterable of per-query rows; with query_schema (their
+    Arrow schema) they are written as they are read instead of being held in memory.
+    """
+    # Timestamp plus a random suffix, so concurrent runs never share an ID
+    now = datetime.now()
+    eval_id = f"eval_{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
     
     # Add metadata
-    evaluation_data["timestamp"] = str(datetime.datetime.now())
+    evaluation_data["timestamp"] = str(now)
+    
+    # Per-query rows go to Parquet, the JSON file keeps only the summary
+    evaluation_data = dict(evaluation_data)
+    queries_file, evaluation_data["num_queries"] = _write_queries(eval_id, evaluation_data.pop("queries", []), query_schema)
+    if queries_file:
+        evaluation_data["queries_file"] = queries_file
     
     # Save evaluation data
     eval_file = os.path.join(EVALUATIONS_DIR, f"{eval_id}.json")
@@ -39,47 +110,144 @@ def save_evaluation_result(evaluation_data):
         json.dump(evaluation_data, f, indent=4)
     
     # Update index
-    with open(EVAL_INDEX, 'r') as f:
-        eval_index = json.load(f)
-    
-    eval_index[eval_id] = {
+    eval_store.add_evaluation(eval_id, {
         "name": evaluation_data.get("name", eval_id),
+        "description": evaluation_data.get("description"),
         "timestamp": evaluation_data["timestamp"],
         "metrics": {
             k: v for k, v in evaluation_data.items() 
-            if k in ["precision", "recall", "f1_score", "accuracy", "mrr", "ndcg"]
+            if k in eval_store.METRIC_KEYS
         },
-        "num_queries": len(evaluation_data.get("queries", [])),
+        "num_queries": evaluation_data["num_queries"],
         "file_path": eval_file
-    }
-    
-    with open(EVAL_INDEX, 'w') as f:
-        json.dump(eval_index, f, indent=4)
+    })
     
     return eval_id
 
-def list_evaluations():
-    """Get a list of all evaluations with their metadata"""
-    if not os.path.exists(EVAL_INDEX):
-        return {}
+def list_evaluations_page(sort_by="timestamp", descending=True, page=1, page_size=20, search=None):
+    """Get one sorted page of evaluations and the total number of matches"""
+    evaluations = eval_store.query_evaluations(
+        sort_by=sort_by,
+        descending=descending,
+        limit=page_size,
+        offset=(page - 1) * page_size,
+        search=search
+    )
+    return evaluations, eval_store.count_evaluations(search)
+
+def count_evaluations(search=None):
+    """Number of stored evaluations"""
+    return eval_store.count_evaluations(search)
+
+def evaluations_version():
+    """Counter bumped by every change to the stored evaluations"""
+    return eval_store.data_version()
+
+def _evaluation_file(eval_id, eval_info):
+    """Path of an evaluation's data file, also for indexes copied from another machine"""
+    eval_file = eval_info.get("file_path")
+    if eval_file and os.path.exists(eval_file):
+        return eval_file
+    return os.path.join(EVALUATIONS_DIR, f"{eval_id}.json")
+
+def _write_queries(eval_id, queries, schema=None):
+    """Write per-query rows to a Parquet file, one row group at a time.
+
+    Without a schema it is inferred from all rows, which are then held in memory.
+    Returns the file path (None when there are no rows) and the number of rows.
+    """
+    if schema is None:
+        queries = list(queries)
+        if not queries:
+            return None, 0
+        schema = pa.Table.from_pylist(queries).schema
     
-    with open(EVAL_INDEX, 'r') as f:
-        eval_index = json.load(f)
+    queries_file = os.path.join(EVALUATIONS_DIR, f"{eval_id}.parquet")
+    num_queries = 0
+    with pq.ParquetWriter(queries_file, schema) as writer:
+        for batch in eval_engine.iter_batches(queries, QUERY_ROW_GROUP_SIZE):
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema), row_group_size=QUERY_ROW_GROUP_SIZE)
+            num_queries += len(batch)
+    if not num_queries:
+        os.remove(queries_file)
+        return None, 0
+    return queries_file, num_queries
+
+def _queries_file(eval_id):
+    queries_file = os.path.join(EVALUATIONS_DIR, f"{eval_id}.parquet")
+    return queries_file if os.path.exists(queries_file) else None
+
+def get_query_columns(eval_id):
+    """Column names of an evaluation's per-query results"""
+    queries_file = _queries_file(eval_id)
+    if queries_file:
+        return pq.read_schema(queries_file).names
     
-    return eval_index
+    # Older evaluations keep their queries inline in the JSON file
+    eval_data = get_evaluation_details(eval_id) or {}
+    return list(pd.DataFrame(eval_data.get("queries", [])[:1]).columns)
 
-def get_evaluation_details(eval_id):
-    """Get full details for a specific evaluation"""
-    if not os.path.exists(EVAL_INDEX):
-        return None
+def get_evaluation_queries(eval_id, offset=0, limit=50, columns=None):
+    """Read one page of per-query results, only for the requested columns.
+
+    Only the Parquet row groups overlapping the page are read.
+    Returns (DataFrame, total number of queries).
+    """
+    queries_file = _queries_file(eval_id)
+    if queries_file is None:
+        eval_data = get_evaluation_details(eval_id) or {}
+        queries = eval_data.get("queries", [])
+        page = pd.DataFrame(queries[offset:offset + limit])
+        return (page[columns] if columns else page), len(queries)
+    
+    parquet_file = pq.ParquetFile(queries_file)
+    total = parquet_file.metadata.num_rows
+    
+    # Find the row groups that overlap [offset, offset + limit)
+    row_groups, first_row, row = [], None, 0
+    for i in range(parquet_file.num_row_groups):
+        num_rows = parquet_file.metadata.row_group(i).num_rows
+        if row + num_rows > offset and row < offset + limit:
+            if first_row is None:
+                first_row = row
+            row_groups.append(i)
+        row += num_rows
     
-    with open(EVAL_INDEX, 'r') as f:
-        eval_index = json.load(f)
+    if not row_groups:
+        return pd.DataFrame(columns=columns or parquet_file.schema_arrow.names), total
     
-    if eval_id not in eval_index:
+    table = parquet_file.read_row_groups(row_groups, columns=columns)
+    return table.slice(offset - first_row, limit).to_pandas(), total
+
+def get_evaluations_metrics(eval_ids):
+    """Index metrics of many evaluations at once, one row per evaluation in the given order"""
+    entries = eval_store.get_evaluations(eval_ids)
+    rows = [
+        {"eval_id": eval_id, "name": entries[eval_id]["name"], "timestamp": entries[eval_id]["timestamp"],
+         "num_queries": entries[eval_id]["num_queries"], **entries[eval_id]["metrics"]}
+        for eval_id in eval_ids if eval_id in entries
+    ]
+    return pd.DataFrame(rows, columns=["eval_id", "name", "timestamp", "num_queries", *eval_store.METRIC_KEYS])
+
+def get_query_metrics(eval_id, metrics):
+    """Question and per-query metric columns of an evaluation; metrics it lacks are NaN"""
+    queries_file = _queries_file(eval_id)
+    if queries_file is None:
+        # Older evaluations keep their queries inline in the JSON file
+        queries = pd.DataFrame((get_evaluation_details(eval_id) or {}).get("queries", []))
+    else:
+        available = set(pq.read_schema(queries_file).names)
+        columns = [c for c in ["query", *metrics] if c in available]
+        queries = pq.read_table(queries_file, columns=columns).to_pandas()
+    return queries.reindex(columns=["query", *metrics])
+
+def get_evaluation_details(eval_id):
+    """Get full details for a specific evaluation"""
+    eval_info = eval_store.get_evaluation(eval_id)
+    if eval_info is None:
         return None
     
-    eval_file = eval_index[eval_id]["file_path"]
+    eval_file = _evaluation_file(eval_id, eval_info)
     if not os.path.exists(eval_file):
         return None
     
@@ -90,67 +258,104 @@ def get_evaluation_details(eval_id):
 
 def delete_evaluation(eval_id):
     """Delete an evaluation and its data"""
-    if not os.path.exists(EVAL_INDEX):
-        return False, "Evaluation index not found"
-    
-    with open(EVAL_INDEX, 'r') as f:
-        eval_index = json.load(f)
-    
-    if eval_id not in eval_index:
+    eval_info = eval_store.get_evaluation(eval_id)
+    if eval_info is None:
         return False, "Evaluation not found"
     
-    # Get the file info
-    eval_file = eval_index[eval_id]["file_path"]
-    
     # Delete the file if it exists
+    eval_file = _evaluation_file(eval_id, eval_info)
     if os.path.exists(eval_file):
         os.remove(eval_file)
+    queries_file = _queries_file(eval_id)
+    if queries_file:
+        os.remove(queries_file)
     
     # Remove from index
-    del eval_index[eval_id]
-    
-    # Update index file
-    with open(EVAL_INDEX, 'w') as f:
-        json.dump(eval_index, f, indent=4)
+    eval_store.remove_evaluation(eval_id)
     
     return True, "Evaluation deleted successfully"
 
-# Example function for running an evaluation - replace with your actual implementation
-def run_evaluation(query_set, parameters):
-    """Run a RAG evaluation on a set of queries"""
-    # This is a placeholder - replace with your actual evaluation logic
+def _scan_checkpoint(checkpoint_path, top_k):
+    """One pass over a checkpoint file of scored results, without keeping the rows.
+
+    Returns the byte offset and row_id of every row, the metric columns of all
+    rows (see eval_engine.metric_columns) and the Arrow schema the rows fit in.
+    """
+    offsets, row_ids, chunks, schema = [], [], [], None
+    position = 0
+    with open(checkpoint_path, 'rb') as f:
+        for batch in eval_engine.iter_batches(f, QUERY_ROW_GROUP_SIZE):
+            rows = []
+            for line in batch:
+                # A half-written last line was never counted as done
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                offsets.append(position)
+                row_ids.append(row["row_id"])
+                rows.append(row)
+                position += len(line)
+            if not rows:
+                break
+            chunks.append(eval_engine.metric_columns(rows, top_k))
+            # A column that is empty in one batch (e.g. no errors yet) takes its type from the others
+            batch_schema = pa.Table.from_pylist(rows).schema
+            schema = batch_schema if schema is None else pa.unify_schemas([schema, batch_schema], promote_options="permissive")
+    
+    if chunks:
+        columns = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+    else:
+        columns = eval_engine.metric_columns([], top_k)
+    return np.array(offsets, dtype=np.int64), np.array(row_ids, dtype=np.int64), columns, schema
+
+def finalize_evaluation(checkpoint_path, parameters):
+    """Summarize the scored per-query results in a checkpoint file and save them as an evaluation.
+
+    Only the fields the metrics need are held in memory. The rows themselves are
+    read from the file again, in row_id order, while the Parquet file is written.
+    """
+    top_k = int(parameters.get("top_k", 5))
+    offsets, row_ids, columns, schema = _scan_checkpoint(checkpoint_path, top_k)
+    order = np.argsort(row_ids, kind="stable")
+    offsets, columns = offsets[order], {key: values[order] for key, values in columns.items()}
+    summary, per_query = eval_engine.summarize_columns(
+        columns, parameters.get("metrics", list(eval_engine.METRIC_NAMES))
+    )
+    # Rows keep the latency that was measured for them, cached or not
+    per_query = {key: values for key, values in per_query.items() if key != "latency_ms"}
+    if schema is not None:
+        for key in per_query:
+            field = pa.field(key, pa.float64())
+            index = schema.get_field_index(key)
+            schema = schema.set(index, field) if index >= 0 else schema.append(field)
+    
+    def queries():
+        with open(checkpoint_path, 'rb') as f:
+            for i, offset in enumerate(offsets):
+                f.seek(offset)
+                row = json.loads(f.readline())
+                for key, values in per_query.items():
+                    row[key] = None if np.isnan(values[i]) else float(values[i])
+                yield row
     
-    # Example result structure
     results = {
         "name": parameters.get("name", "Evaluation"),
         "description": parameters.get("description", ""),
         "parameters": parameters,
-        "precision": 0.85,
-        "recall": 0.78,
-        "f1_score": 0.81,
-        "mrr": 0.92,
-        "ndcg": 0.88,
-        "queries": [
-            {
-                "query": q,
-                "expected": "Expected result",
-                "actual": "Actual result",
-                "score": 0.9,
-                "latency_ms": 150
-            }
-            for q in query_set
-        ]
+        **summary,
+        "queries": queries()
     }
     
     # Save results
-    eval_id = save_evaluation_result(results)
+    eval_id = save_evaluation_result(results, query_schema=schema)
+    results.pop("queries")
     
     return eval_id, results
 
 def create_testset_using_ragas(num_of_test):
-    API_URL = "http://localhost:8000/admin/create_testset_using_ragas"
     payload = {"num_of_test": num_of_test}
-    response = requests.post(API_URL, json=payload)
+    response = api_client.post("/admin/create_testset_using_ragas", json=payload)
 
     # Check response
     if response.status_code == 200:
@@ -159,12 +364,82 @@ def create_testset_using_ragas(num_of_test):
     else:
         return {"status": False, "message": "Testset generation failed",  "data": []}
 
+def start_testset_job(num_of_test):
+    """Submit asynchronous testset generation; rows are then read with stream_testset_rows.
 
-def fetch_testset_files():
-    API_BASE_URL = "http://localhost:8000/admin"
+    Returns {"status", "message", "job_id", "supported"}; "supported" is False when the
+    server has no job API and create_testset_using_ragas must be used instead.
+    """
+    response = api_client.post("/admin/testset_jobs", json={"num_of_test": num_of_test})
+    
+    if response.status_code in (404, 405):
+        return {"status": False, "supported": False, "message": "Server does not support testset jobs", "job_id": None}
+    if response.status_code != 200:
+        return {"status": False, "supported": True, "message": f"Testset generation failed: {response.text}", "job_id": None}
+    
+    return {"status": True, "supported": True, "message": "Testset generation started", "job_id": response.json()["job_id"]}
+
+def stream_testset_rows(job_id, offset=0):
+    """Yield generated testset rows as the server produces them (NDJSON stream).
+
+    offset skips rows that were already received, e.g. before a dropped connection.
+    Control lines ({"event": "done"}, {"event": "cancelled"} or {"event": "error",
+    "message": ...}) are yielded too, so the caller can tell a finished testset from
+    a stream that was cut short. Blank keep-alive lines are ignored, so slow
+    generation never hits the read timeout.
+    """
+    response = api_client.get(f"/admin/testset_jobs/{job_id}/stream", params={"offset": offset}, stream=True)
+    
+    with response:
+        if response.status_code != 200:
+            raise RuntimeError(f"Testset stream failed: {response.status_code} - {response.text}")
+    
+        for line in response.iter_lines():
+            if line:
+                yield json.loads(line)
+
+def watch_testset_job(job_id):
+    """Read a testset job's rows in a background thread, once per job in this process.
+
+    Returns a dict shared with the reader: "rows" received so far, "status"
+    ("running", "done", "cancelled" or "failed") and "error". The status becomes
+    "done" only after the server's explicit done event.
+    """
+    with _testset_watches_lock:
+        job = _testset_watches.get(job_id)
+        if job is None:
+            job = _testset_watches[job_id] = {"rows": [], "status": "running", "error": None}
+            threading.Thread(target=_read_testset_job, args=(job_id, job), daemon=True,
+                             name=f"testset-{job_id}").start()
+    return job
 
+def _read_testset_job(job_id, job):
+    error = None
+    # A dropped connection is resumed after the rows already received
+    for _ in range(TESTSET_STREAM_RETRIES + 1):
+        try:
+            for item in stream_testset_rows(job_id, offset=len(job["rows"])):
+                event = item.get("event")
+                if event is None:
+                    job["rows"].append(item)
+                elif event in ("done", "cancelled"):
+                    job["status"] = event
+                    return
+                elif event == "error":
+                    job["error"], job["status"] = item.get("message", "Testset generation failed"), "failed"
+                    return
+            error = "the stream ended before the testset was complete"
+        except Exception as e:
+            error = str(e)
+    job["error"], job["status"] = error, "failed"
+
+def cancel_testset_job(job_id):
+    response = api_client.delete(f"/admin/testset_jobs/{job_id}")
+    return response.status_code == 200
+
+def fetch_testset_files():
     """Fetch testset file history from the FastAPI server"""
-    response = requests.get(f"{API_BASE_URL}/testset_files")
+    response = api_client.get("/admin/testset_files")
     if response.status_code == 200:
         return response.json()
     else:
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Define constants
+RESPONSE_CACHE_DB = Path(__file__).parent.parent / "data" / "response_cache.db"
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+def get_connection():
+    """Return this thread's connection to the response cache"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(RESPONSE_CACHE_DB.parent, exist_ok=True)
+        conn = sqlite3.connect(RESPONSE_CACHE_DB, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        _local.conn = conn
+    return conn
+
+def normalize_query(query):
+    """Case- and whitespace-insensitive form of a query"""
+    return " ".join(query.lower().split())
+
+def make_key(query, fingerprint):
+    return hashlib.sha256(f"{fingerprint}\n{normalize_query(query)}".encode()).hexdigest()
+
+def get_many(keys):
+    """Return {key: response} for the cached keys and mark them as recently used"""
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+
+    conn = get_connection()
+    found = {}
+    # Stay below SQLite's bound-parameter limit
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        rows = conn.execute(
+            f"SELECT key, response FROM responses WHERE key IN ({', '.join('?' * len(chunk))})", chunk
+        ).fetchall()
+        found.update({key: json.loads(response) for key, response in rows})
+
+    if found:
+        now = time.time()
+        with _write_lock, conn:
+            conn.executemany("UPDATE responses SET last_access = ? WHERE key = ?", [(now, key) for key in found])
+    return found
+
+def put_many(items):
+    """Store {key: response} and evict least recently used entries beyond the size limit"""
+    if not items:
+        return
+
+    now = time.time()
+    rows = []
+    for key, response in items.items():
+        payload = json.dumps(response)
+        rows.append((key, payload, len(payload), now))
+
+    conn = get_connection()
+    with _write_lock, conn:
+        conn.executemany("INSERT OR REPLACE INTO responses (key, response, size, last_access) VALUES (?, ?, ?, ?)", rows)
+        _evict(conn)
+
+def _evict(conn):
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    if total <= RESPONSE_CACHE_MAX_BYTES:
+        return
+
+    # Walk from the least recently used entry until enough bytes are freed
+    excess, doomed = total - RESPONSE_CACHE_MAX_BYTES, []
+    for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+        doomed.append((key,))
+        excess -= size
+        if excess <= 0:
+            break
+    conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+def clear():
+    conn = get_connection()
+    with _write_lock, conn:
+        conn.execute("DELETE FROM responses")
+
+def stats():
+    """Number of cached responses and their total size in bytes"""
+    count, size = get_connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+    return {"entries": count, "bytes": size}
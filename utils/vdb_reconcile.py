@@ -0,0 +1,170 @@
+import json
+import os
+import time
+from utils.file_manager import list_files, add_files_to_vector_db, invalidate_files_cache
+
+# Milvus connection and the field of each chunk that holds its file ID.
+# The field may be a JSON path such as metadata["file_id"].
+MILVUS_URI = os.getenv("MILVUS_URI", "http://127.0.0.1:19530")
+MILVUS_TOKEN = os.getenv("MILVUS_TOKEN", "")
+MILVUS_COLLECTION = os.getenv("MILVUS_COLLECTION", "documents")
+MILVUS_FILE_ID_FIELD = os.getenv("MILVUS_FILE_ID_FIELD", "file_id")
+
+# Rows fetched per query iterator page, and file IDs per delete expression
+SCAN_BATCH_SIZE = int(os.getenv("RECONCILE_SCAN_BATCH_SIZE", "5000"))
+DELETE_BATCH_SIZE = int(os.getenv("RECONCILE_DELETE_BATCH_SIZE", "500"))
+
+# Error messages and example file IDs kept in a report; the counts cover all of them
+MAX_REPORTED_ERRORS = 100
+SAMPLE_IDS = 20
+
+class MilvusIndex:
+    """The chunks of one Milvus collection, seen through their file IDs"""
+
+    def __init__(self, uri=MILVUS_URI, collection=MILVUS_COLLECTION, file_id_field=MILVUS_FILE_ID_FIELD,
+                 token=MILVUS_TOKEN, scan_batch_size=SCAN_BATCH_SIZE, alias="reconcile"):
+        # pymilvus is only needed for reconciliation, not by the Streamlit app
+        from pymilvus import connections, Collection
+
+        connections.connect(alias=alias, uri=uri, token=token)
+        self.collection = Collection(collection, using=alias)
+        self.file_id_field = file_id_field
+        self.scan_batch_size = scan_batch_size
+        # metadata["file_id"] -> output field "metadata", key "file_id"
+        self.output_field, _, key = file_id_field.partition("[")
+        self.json_key = json.loads(key.rstrip("]")) if key else None
+
+    def _file_id(self, row):
+        value = row.get(self.output_field)
+        return value.get(self.json_key) if self.json_key else value
+
+    def chunk_counts(self):
+        """Number of chunks per file ID, scanning the collection page by page"""
+        iterator = self.collection.query_iterator(
+            batch_size=self.scan_batch_size, expr="", output_fields=[self.output_field]
+        )
+        counts = {}
+        try:
+            while True:
+                rows = iterator.next()
+                if not rows:
+                    break
+                for row in rows:
+                    file_id = self._file_id(row)
+                    if file_id is not None:
+                        counts[str(file_id)] = counts.get(str(file_id), 0) + 1
+        finally:
+            iterator.close()
+        return counts
+
+    def delete_files(self, file_ids):
+        """Delete every chunk of the given file IDs with one expression"""
+        self.collection.delete(expr=f"{self.file_id_field} in {json.dumps(list(file_ids))}")
+
+    def flush(self):
+        self.collection.flush()
+
+def diff(files_index, chunk_counts):
+    """Compare the files index with the chunks in the vector store.
+
+    The files index is the source of truth:
+      missing:  flagged in_vector_db but without chunks -> re-index
+      covered:  flagged without chunks, but identical content (same SHA-256) keeps
+                chunks under another file ID, like linked copies -> nothing to do
+      stale:    chunks exist but the file is not flagged -> delete the chunks
+      orphaned: chunks of files that are no longer in the index -> delete the chunks
+    Flagged files with identical content and no chunks at all are re-indexed once;
+    the others are covered by that file, as upload deduplication would have it.
+    """
+    flagged = {file_id for file_id, info in files_index.items() if info.get("in_vector_db")}
+    indexed = set(chunk_counts)
+    # Content whose chunks survive the repair: flagged files that have chunks
+    served = {files_index[file_id].get("sha256") for file_id in flagged & indexed} - {None}
+
+    missing, covered = [], []
+    for file_id in sorted(flagged - indexed):
+        sha256 = files_index[file_id].get("sha256")
+        if sha256 in served:
+            covered.append(file_id)
+            continue
+        missing.append(file_id)
+        if sha256:
+            served.add(sha256)
+
+    return {
+        "missing": missing,
+        "covered": covered,
+        "stale": sorted((indexed - flagged) & set(files_index)),
+        "orphaned": sorted(indexed - set(files_index)),
+    }
+
+def reconcile(index, apply=False, index_batch_size=None, delete_batch_size=DELETE_BATCH_SIZE, log=print):
+    """Diff the files index against the vector store and, with apply, repair the drift in batches.
+
+    Returns a report with counts per category, repairs and failures, and timings.
+    """
+    started = time.perf_counter()
+    invalidate_files_cache()
+    files_index = list_files()
+    chunk_counts = index.chunk_counts()
+    scanned = time.perf_counter()
+
+    drift = diff(files_index, chunk_counts)
+    report = {
+        "files": len(files_index),
+        "flagged": sum(1 for info in files_index.values() if info.get("in_vector_db")),
+        "indexed_files": len(chunk_counts),
+        "chunks": sum(chunk_counts.values()),
+        **{name: len(ids) for name, ids in drift.items()},
+        "applied": apply,
+        "reindexed": 0,
+        "reindex_failed": 0,
+        "deleted_files": 0,
+        "deleted_chunks": 0,
+        "delete_failed": 0,
+        "errors": [],
+        "samples": {name: ids[:SAMPLE_IDS] for name, ids in drift.items()},
+        "scan_seconds": scanned - started,
+    }
+    log(f"{report['files']} files ({report['flagged']} flagged), {report['indexed_files']} files "
+        f"with {report['chunks']} chunks in the vector store")
+    log(f"missing={report['missing']} covered={report['covered']} stale={report['stale']} "
+        f"orphaned={report['orphaned']}")
+
+    if not apply:
+        report["total_seconds"] = time.perf_counter() - started
+        return report
+
+    # Chunks of stale and orphaned files are deleted with one expression per batch
+    to_delete = drift["stale"] + drift["orphaned"]
+    for start in range(0, len(to_delete), delete_batch_size):
+        batch = to_delete[start:start + delete_batch_size]
+        try:
+            index.delete_files(batch)
+            report["deleted_files"] += len(batch)
+            report["deleted_chunks"] += sum(chunk_counts[file_id] for file_id in batch)
+        except Exception as e:
+            report["delete_failed"] += len(batch)
+            report["errors"].append(f"Delete of {len(batch)} files failed: {e}")
+        log(f"Deleted {report['deleted_files']}/{len(to_delete)} files")
+    if to_delete:
+        index.flush()
+
+    # Missing files are re-embedded by the backend through the batch endpoint. diff() left
+    # out content that keeps chunks under another file, so no dedup lookup is needed here
+    # (it would see the missing files' own in_vector_db flags and skip them all).
+    if drift["missing"]:
+        kwargs = {"batch_size": index_batch_size} if index_batch_size else {}
+        results = add_files_to_vector_db({file_id: files_index[file_id] for file_id in drift["missing"]},
+                                         dedup=False, **kwargs)
+        for file_id, result in results.items():
+            if result.get("status"):
+                report["reindexed"] += 1
+            else:
+                report["reindex_failed"] += 1
+                report["errors"].append(f"{file_id}: {result.get('message')}")
+        log(f"Re-indexed {report['reindexed']}/{len(drift['missing'])} files")
+
+    report["errors"] = report["errors"][:MAX_REPORTED_ERRORS]
+    report["total_seconds"] = time.perf_counter() - started
+    return report